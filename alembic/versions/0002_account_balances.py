@@ -0,0 +1,44 @@
+"""account balances
+
+Revision ID: 0002_account_balances
+Revises: 0001_init
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0002_account_balances"
+down_revision = "0001_init"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "account_balances",
+        sa.Column("account_id", sa.Integer(), sa.ForeignKey("accounts.id"), primary_key=True),
+        sa.Column("debits", sa.Numeric(28, 6), nullable=False),
+        sa.Column("credits", sa.Numeric(28, 6), nullable=False),
+        sa.Column("posting_count", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    # Backfill from existing postings so balances are correct right after upgrade.
+    op.execute(
+        """
+        INSERT INTO account_balances (account_id, debits, credits, posting_count, updated_at)
+        SELECT account_id,
+               COALESCE(SUM(CASE WHEN direction = 'DEBIT' THEN amount ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN direction = 'CREDIT' THEN amount ELSE 0 END), 0),
+               COUNT(*),
+               CURRENT_TIMESTAMP
+        FROM postings
+        GROUP BY account_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("account_balances")
@@ -0,0 +1,35 @@
+"""balance checkpoints
+
+Revision ID: 0003_balance_checkpoints
+Revises: 0002_account_balances
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0003_balance_checkpoints"
+down_revision = "0002_account_balances"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "balance_checkpoints",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("account_id", sa.Integer(), sa.ForeignKey("accounts.id"), nullable=False),
+        sa.Column("as_of", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("debits", sa.Numeric(28, 6), nullable=False),
+        sa.Column("credits", sa.Numeric(28, 6), nullable=False),
+        sa.Column("posting_count", sa.Integer(), nullable=False),
+        sa.UniqueConstraint("account_id", "as_of"),
+    )
+    op.create_index("ix_transactions_created_at", "transactions", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_created_at", table_name="transactions")
+    op.drop_table("balance_checkpoints")
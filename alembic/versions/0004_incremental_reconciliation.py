@@ -0,0 +1,42 @@
+"""incremental reconciliation
+
+Revision ID: 0004_incremental_reconciliation
+Revises: 0003_balance_checkpoints
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0004_incremental_reconciliation"
+down_revision = "0003_balance_checkpoints"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("reconciliation_runs") as batch:
+        batch.add_column(
+            sa.Column("mode", sa.String(length=16), nullable=False, server_default="FULL")
+        )
+        batch.add_column(sa.Column("watermark_json", sa.Text(), nullable=True))
+    op.create_table(
+        "reconciliation_open_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("side", sa.String(length=8), nullable=False),
+        sa.Column("asset", sa.String(length=16), nullable=False, index=True),
+        sa.Column("source_id", sa.String(length=64), nullable=False),
+        sa.Column("reference", sa.String(length=64), nullable=False),
+        sa.Column("amount", sa.Numeric(18, 6), nullable=False),
+        sa.Column("booked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("run_id", sa.Integer(), sa.ForeignKey("reconciliation_runs.id"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("reconciliation_open_items")
+    with op.batch_alter_table("reconciliation_runs") as batch:
+        batch.drop_column("watermark_json")
+        batch.drop_column("mode")
@@ -0,0 +1,28 @@
+"""reconciliation run progress
+
+Revision ID: 0005_reconciliation_progress
+Revises: 0004_incremental_reconciliation
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0005_reconciliation_progress"
+down_revision = "0004_incremental_reconciliation"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("reconciliation_runs") as batch:
+        batch.add_column(sa.Column("progress", sa.Integer(), nullable=False, server_default="0"))
+    op.create_index("ix_reconciliation_runs_status", "reconciliation_runs", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reconciliation_runs_status", table_name="reconciliation_runs")
+    with op.batch_alter_table("reconciliation_runs") as batch:
+        batch.drop_column("progress")
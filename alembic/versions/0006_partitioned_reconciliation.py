@@ -0,0 +1,30 @@
+"""per-account reconciliation open items
+
+Revision ID: 0006_partitioned_reconciliation
+Revises: 0005_reconciliation_progress
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0006_partitioned_reconciliation"
+down_revision = "0005_reconciliation_progress"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("reconciliation_open_items") as batch:
+        batch.add_column(sa.Column("account_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key(
+            "fk_reconciliation_open_items_account_id", "accounts", ["account_id"], ["id"]
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("reconciliation_open_items") as batch:
+        batch.drop_constraint("fk_reconciliation_open_items_account_id", type_="foreignkey")
+        batch.drop_column("account_id")
@@ -0,0 +1,45 @@
+"""persisted bank movements and sync cursors
+
+Revision ID: 0007_bank_movements
+Revises: 0006_partitioned_reconciliation
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0007_bank_movements"
+down_revision = "0006_partitioned_reconciliation"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "bank_movements",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("provider", sa.String(length=160), nullable=False),
+        sa.Column("reference", sa.String(length=64), nullable=False),
+        sa.Column("currency", sa.String(length=16), nullable=False),
+        sa.Column("amount", sa.Numeric(18, 6), nullable=False),
+        sa.Column("booked_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("synced_at", sa.DateTime(timezone=True), nullable=False),
+        sa.UniqueConstraint("provider", "reference"),
+    )
+    op.create_index(
+        "ix_bank_movements_provider_booked_at", "bank_movements", ["provider", "booked_at"]
+    )
+    op.create_table(
+        "bank_sync_cursors",
+        sa.Column("provider", sa.String(length=160), primary_key=True),
+        sa.Column("cursor", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("synced_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("bank_sync_cursors")
+    op.drop_index("ix_bank_movements_provider_booked_at", table_name="bank_movements")
+    op.drop_table("bank_movements")
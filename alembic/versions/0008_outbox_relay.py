@@ -0,0 +1,36 @@
+"""outbox relay leases and pending index
+
+Revision ID: 0008_outbox_relay
+Revises: 0007_bank_movements
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0008_outbox_relay"
+down_revision = "0007_bank_movements"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("events_outbox") as batch:
+        batch.add_column(sa.Column("claimed_by", sa.String(length=64), nullable=True))
+        batch.add_column(sa.Column("lease_until", sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        "ix_events_outbox_pending",
+        "events_outbox",
+        ["id"],
+        postgresql_where=sa.text("processed_at IS NULL"),
+        sqlite_where=sa.text("processed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_outbox_pending", table_name="events_outbox")
+    with op.batch_alter_table("events_outbox") as batch:
+        batch.drop_column("lease_until")
+        batch.drop_column("claimed_by")
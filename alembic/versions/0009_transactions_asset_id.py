@@ -0,0 +1,22 @@
+"""transactions (asset, id) index for keyset pagination
+
+Revision ID: 0009_transactions_asset_id
+Revises: 0008_outbox_relay
+Create Date: 2026-10-18
+
+"""
+
+from alembic import op
+
+revision = "0009_transactions_asset_id"
+down_revision = "0008_outbox_relay"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_transactions_asset_id", "transactions", ["asset", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_transactions_asset_id", table_name="transactions")
@@ -0,0 +1,26 @@
+"""transaction payload hash for idempotency conflicts
+
+Revision ID: 0010_transaction_payload_hash
+Revises: 0009_transactions_asset_id
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0010_transaction_payload_hash"
+down_revision = "0009_transactions_asset_id"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("transactions") as batch:
+        batch.add_column(sa.Column("payload_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("transactions") as batch:
+        batch.drop_column("payload_hash")
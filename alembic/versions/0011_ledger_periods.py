@@ -0,0 +1,56 @@
+"""ledger periods, opening balances and archived postings
+
+Revision ID: 0011_ledger_periods
+Revises: 0010_transaction_payload_hash
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0011_ledger_periods"
+down_revision = "0010_transaction_payload_hash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ledger_periods",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("start", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("end", sa.DateTime(timezone=True), nullable=False, unique=True),
+        sa.Column("closed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.Column("posting_count", sa.Integer(), nullable=False),
+        sa.Column("archive", sa.String(length=512), nullable=True),
+    )
+    op.create_table(
+        "period_opening_balances",
+        sa.Column("period_id", sa.Integer(), sa.ForeignKey("ledger_periods.id"), primary_key=True),
+        sa.Column("account_id", sa.Integer(), sa.ForeignKey("accounts.id"), primary_key=True),
+        sa.Column("debits", sa.Numeric(28, 6), nullable=False),
+        sa.Column("credits", sa.Numeric(28, 6), nullable=False),
+        sa.Column("posting_count", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "archived_postings",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("period_id", sa.Integer(), sa.ForeignKey("ledger_periods.id"), nullable=False),
+        sa.Column("transaction_id", sa.Integer(), sa.ForeignKey("transactions.id"), nullable=False),
+        sa.Column("account_id", sa.Integer(), sa.ForeignKey("accounts.id"), nullable=False),
+        sa.Column("direction", sa.String(length=6), nullable=False),
+        sa.Column("amount", sa.Numeric(18, 6), nullable=False),
+    )
+    op.create_index("ix_archived_postings_period_id", "archived_postings", ["period_id"])
+    op.create_index("ix_archived_postings_transaction_id", "archived_postings", ["transaction_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_archived_postings_transaction_id", table_name="archived_postings")
+    op.drop_index("ix_archived_postings_period_id", table_name="archived_postings")
+    op.drop_table("archived_postings")
+    op.drop_table("period_opening_balances")
+    op.drop_table("ledger_periods")
@@ -0,0 +1,37 @@
+"""unique reconciliation open item per source
+
+Revision ID: 0012_open_item_source_unique
+Revises: 0011_ledger_periods
+Create Date: 2026-10-18
+
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+revision = "0012_open_item_source_unique"
+down_revision = "0011_ledger_periods"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Concurrent incremental runs could record the same entry twice; keep the oldest row.
+    op.execute(
+        sa.text(
+            "DELETE FROM reconciliation_open_items WHERE id NOT IN ("
+            " SELECT min(id) FROM reconciliation_open_items"
+            " GROUP BY side, asset, coalesce(account_id, 0), source_id)"
+        )
+    )
+    op.create_index(
+        "uq_reconciliation_open_items_source",
+        "reconciliation_open_items",
+        ["side", "asset", sa.text("coalesce(account_id, 0)"), "source_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_reconciliation_open_items_source", table_name="reconciliation_open_items")
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi.responses import JSONResponse, Response
+
+from app.core.serialization import dumps
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class: routes with a ``response_model`` hand it already-serialized data."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class EncodedJSONResponse(Response):
+    """A body encoded by the service layer; FastAPI skips ``response_model`` validation."""
+
+    media_type = "application/json"
@@ -1,17 +1,40 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Header, HTTPException
+from datetime import datetime
 
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.responses import EncodedJSONResponse
 from app.core.logging import get_logger
 from app.schemas import (
+    AccountBalanceOut,
     AccountCreate,
     AccountOut,
-    ReconciliationSummary,
+    AccountTypeRollupOut,
+    PeriodOut,
+    ReconciliationRunOut,
+    TransactionBatchIn,
+    TransactionBatchOut,
     TransactionIn,
     TransactionOut,
+    TrialBalanceOut,
+)
+from app.services.balances import get_account_balance, list_balances
+from app.services.checkpoints import get_balance_as_of
+from app.services.export import FORMATS as EXPORT_FORMATS
+from app.services.export import export_postings
+from app.services.idempotency import IdempotencyConflict
+from app.services.jobs import JobQueueFull, enqueue_reconciliation, get_run, list_runs
+from app.services.ledger import (
+    create_account,
+    create_transaction,
+    create_transactions_batch,
+    list_accounts,
+    list_transactions_json,
 )
-from app.services.ledger import create_account, create_transaction, list_accounts, list_transactions
-from app.services.reconciliation import run_reconciliation
+from app.services.periods import list_periods, read_period
+from app.services.reports import account_type_rollup, trial_balance
 
 LOG = get_logger("routes")
 router = APIRouter()
@@ -30,6 +53,25 @@ def list_accounts_route():
     return list_accounts()
 
 
+@router.get("/accounts/{account_id}/balance", response_model=AccountBalanceOut)
+def account_balance_route(account_id: int, as_of: datetime | None = None):
+    if as_of is None:
+        balance = get_account_balance(account_id)
+    else:
+        try:
+            balance = get_balance_as_of(account_id, as_of)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+    if balance is None:
+        raise HTTPException(status_code=404, detail=f"Unknown account id: {account_id}")
+    return balance
+
+
+@router.get("/balances", response_model=list[AccountBalanceOut])
+def list_balances_route(asset: str | None = None):
+    return list_balances(asset=asset)
+
+
 @router.post("/transactions", response_model=TransactionOut)
 def create_transaction_route(
     payload: TransactionIn,
@@ -39,15 +81,129 @@ def create_transaction_route(
         raise HTTPException(status_code=400, detail="Missing Idempotency-Key header")
     try:
         return create_transaction(payload, idempotency_key=idempotency_key)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
+@router.post("/transactions/batch", response_model=TransactionBatchOut)
+def create_transactions_batch_route(payload: TransactionBatchIn):
+    return create_transactions_batch(payload.transactions)
+
+
 @router.get("/transactions", response_model=list[TransactionOut])
-def list_transactions_route(limit: int = 50):
-    return list_transactions(limit=limit)
+def list_transactions_route(
+    limit: int = 50,
+    cursor: str | None = None,
+    asset: str | None = None,
+    reference: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    try:
+        body, next_cursor = list_transactions_json(
+            limit=limit,
+            cursor=cursor,
+            asset=asset,
+            reference=reference,
+            created_from=created_from,
+            created_to=created_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    # The body stays a plain list (still documented by response_model, already encoded by the
+    # service); the next page's cursor travels in a header.
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return EncodedJSONResponse(body, headers=headers)
+
+
+@router.get("/reports/trial-balance", response_model=TrialBalanceOut)
+def trial_balance_route(
+    asset: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    try:
+        return trial_balance(asset=asset, created_from=created_from, created_to=created_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/reports/account-types", response_model=AccountTypeRollupOut)
+def account_type_rollup_route(
+    asset: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    try:
+        return account_type_rollup(asset=asset, created_from=created_from, created_to=created_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/export/postings")
+def export_postings_route(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv|parquet)$"),
+    asset: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    try:
+        body = export_postings(
+            format, asset=asset, created_from=created_from, created_to=created_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="postings.{format}"'},
+    )
+
+
+@router.get("/periods", response_model=list[PeriodOut])
+def list_periods_route():
+    return list_periods()
+
+
+@router.get("/periods/{period_id}/postings")
+def period_postings_route(
+    period_id: int,
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv|parquet)$"),
+):
+    """A closed period's postings, from ``postings``, the archive table or its archive file."""
+    try:
+        body = read_period(period_id, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"Unknown period: {period_id}")
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="period-{period_id}-postings.{format}"'
+        },
+    )
+
+
+@router.post("/reconciliation/run", response_model=ReconciliationRunOut, status_code=202)
+def reconciliation_run_route(mode: str = Query(default="full", pattern="^(full|incremental)$")):
+    try:
+        return enqueue_reconciliation(mode=mode)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e)) from e
+
+
+@router.get("/reconciliation/runs", response_model=list[ReconciliationRunOut])
+def reconciliation_runs_route(limit: int = 20):
+    return list_runs(limit=limit)
 
 
-@router.post("/reconciliation/run", response_model=ReconciliationSummary)
-def reconciliation_run_route():
-    return run_reconciliation()
+@router.get("/reconciliation/runs/{run_id}", response_model=ReconciliationRunOut)
+def reconciliation_run_status_route(run_id: int):
+    run = get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Unknown reconciliation run: {run_id}")
+    return run
@@ -0,0 +1,99 @@
+"""Async variants of the hot request-path routes, mounted ahead of ``routes`` when
+``settings.api_stack == "async"``. Paths, schemas and status codes are identical; anything
+not defined here (balances, batch, export) is still served by the sync router.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from fastapi import APIRouter, Header, HTTPException, Query
+
+from app.api.responses import EncodedJSONResponse
+from app.schemas import (
+    AccountCreate,
+    AccountOut,
+    ReconciliationRunOut,
+    TransactionIn,
+    TransactionOut,
+)
+from app.services import ledger_async, reconciliation_async
+from app.services.idempotency import IdempotencyConflict
+from app.services.jobs import JobQueueFull
+
+router = APIRouter()
+
+
+@router.post("/accounts", response_model=AccountOut)
+async def create_account_route(payload: AccountCreate):
+    try:
+        return await ledger_async.create_account(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/accounts", response_model=list[AccountOut])
+async def list_accounts_route():
+    return await ledger_async.list_accounts()
+
+
+@router.post("/transactions", response_model=TransactionOut)
+async def create_transaction_route(
+    payload: TransactionIn,
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key"),
+):
+    if not idempotency_key:
+        raise HTTPException(status_code=400, detail="Missing Idempotency-Key header")
+    try:
+        return await ledger_async.create_transaction(payload, idempotency_key=idempotency_key)
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get("/transactions", response_model=list[TransactionOut])
+async def list_transactions_route(
+    limit: int = 50,
+    cursor: str | None = None,
+    asset: str | None = None,
+    reference: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+):
+    try:
+        body, next_cursor = await ledger_async.list_transactions_json(
+            limit=limit,
+            cursor=cursor,
+            asset=asset,
+            reference=reference,
+            created_from=created_from,
+            created_to=created_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return EncodedJSONResponse(body, headers=headers)
+
+
+@router.post("/reconciliation/run", response_model=ReconciliationRunOut, status_code=202)
+async def reconciliation_run_route(
+    mode: str = Query(default="full", pattern="^(full|incremental)$"),
+):
+    try:
+        return await reconciliation_async.enqueue_reconciliation(mode=mode)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e)) from e
+
+
+@router.get("/reconciliation/runs", response_model=list[ReconciliationRunOut])
+async def reconciliation_runs_route(limit: int = 20):
+    return await reconciliation_async.list_runs(limit=limit)
+
+
+@router.get("/reconciliation/runs/{run_id}", response_model=ReconciliationRunOut)
+async def reconciliation_run_status_route(run_id: int):
+    run = await reconciliation_async.get_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Unknown reconciliation run: {run_id}")
+    return run
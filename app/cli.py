@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+from datetime import datetime
+
+
+def _cmd_balances(args: argparse.Namespace) -> int:
+    from app.services.balances import verify_balances
+
+    report = verify_balances(repair=args.action == "rebuild", chunk_size=args.chunk_size)
+    print(json.dumps(report.model_dump(mode="json"), indent=2))
+    return 1 if report.drift and not report.repaired else 0
+
+
+def _cmd_checkpoints(args: argparse.Namespace) -> int:
+    from app.services.checkpoints import build_checkpoints
+
+    while True:
+        written = build_checkpoints(until=args.until)
+        print(json.dumps({"checkpoints_written": written}))
+        if not args.loop:
+            return 0
+        time.sleep(args.loop)
+
+
+def _cmd_bank(args: argparse.Namespace) -> int:
+    from app.db.session import db_session
+    from app.services.bank_sync import feed_provider, sync_feed
+    from app.services.reconciliation import discover_partitions
+
+    while True:
+        with db_session() as s:
+            partitions = discover_partitions(s)
+        inserted = {
+            feed_provider(p.asset, p.account_name): sync_feed(p.asset, p.account_name)
+            for p in partitions
+        }
+        print(json.dumps({"inserted": inserted}))
+        if not args.loop:
+            return 0
+        time.sleep(args.loop)
+
+
+def _cmd_outbox(args: argparse.Namespace) -> int:
+    import threading
+
+    from prometheus_client import start_http_server
+
+    from app.services.outbox import OutboxRelay, make_sink, update_lag
+
+    if args.metrics_port:
+        start_http_server(args.metrics_port)
+    sink = make_sink(args.sink)
+    relays = [OutboxRelay(sink, batch_size=args.batch_size) for _ in range(args.workers)]
+    stop = threading.Event()
+    published = [0] * len(relays)
+
+    def work(i: int) -> None:
+        if args.drain:
+            while n := relays[i].run_once():
+                published[i] += n
+        else:
+            published[i] = relays[i].run(stop)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=work, args=(i,), daemon=True) for i in range(len(relays))]
+    for th in threads:
+        th.start()
+    try:
+        for th in threads:
+            th.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for th in threads:
+            th.join()
+    elapsed = time.perf_counter() - start
+    total = sum(published)
+    print(
+        json.dumps(
+            {
+                "published": total,
+                "seconds": round(elapsed, 3),
+                "events_per_sec": round(total / elapsed) if elapsed else 0,
+                "oldest_pending_seconds": round(update_lag(), 3),
+            }
+        )
+    )
+    return 0
+
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    from app.services.export import export_postings
+
+    chunks = export_postings(
+        args.format, asset=args.asset, created_from=args.created_from, created_to=args.created_to
+    )
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    return 0
+
+
+def _cmd_import(args: argparse.Namespace) -> int:
+    from app.services.importer import import_files
+
+    reports = import_files(
+        args.files,
+        workers=args.workers,
+        fmt=args.format,
+        chunk_size=args.chunk_size,
+        emit_events=not args.no_events,
+        resume=not args.restart,
+    )
+    for r in reports:
+        print(json.dumps({"summary": asdict(r)}))
+    return 1 if any(r.rejected for r in reports) else 0
+
+
+def _cmd_periods(args: argparse.Namespace) -> int:
+    from app.services.periods import archive_period, close_period, list_periods, read_period
+
+    if args.action == "list":
+        for period in list_periods():
+            print(json.dumps(period.model_dump()))
+        return 0
+    if args.action == "close":
+        if args.through is None:
+            print("periods close needs --through", file=sys.stderr)
+            return 2
+        print(json.dumps(close_period(args.through, archive=args.archive).model_dump()))
+        return 0
+    if args.period is None:
+        print(f"periods {args.action} needs --period", file=sys.stderr)
+        return 2
+    if args.action == "archive":
+        if args.archive is None:
+            print("periods archive needs --archive", file=sys.stderr)
+            return 2
+        period = archive_period(args.period, args.archive)
+        if period is None:
+            print(f"unknown period: {args.period}", file=sys.stderr)
+            return 1
+        print(json.dumps(period.model_dump()))
+        return 0
+    chunks = read_period(args.period, args.format)
+    if chunks is None:
+        print(f"unknown period: {args.period}", file=sys.stderr)
+        return 1
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="fp-ledger", description="FP ledger maintenance tasks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("balances", help="Verify or rebuild materialized account balances")
+    p.add_argument("action", choices=["verify", "rebuild"])
+    p.add_argument("--chunk-size", type=int, default=50_000, help="Postings per scan chunk")
+    p.set_defaults(func=_cmd_balances)
+
+    p = sub.add_parser("checkpoints", help="Build balance checkpoints since the last one")
+    p.add_argument("action", choices=["build"])
+    p.add_argument("--until", type=datetime.fromisoformat, default=None)
+    p.add_argument(
+        "--loop",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="Keep running, pausing between passes",
+    )
+    p.set_defaults(func=_cmd_checkpoints)
+
+    p = sub.add_parser("bank", help="Sync bank feeds into the local movement store")
+    p.add_argument("action", choices=["sync"])
+    p.add_argument(
+        "--loop",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+        help="Keep running, pausing between passes",
+    )
+    p.set_defaults(func=_cmd_bank)
+
+    p = sub.add_parser("outbox", help="Relay pending outbox events to a sink")
+    p.add_argument("action", choices=["relay"])
+    p.add_argument("--sink", default=None, help="memory or file:<path> (default: settings)")
+    p.add_argument("--workers", type=int, default=1, help="Relays running in parallel")
+    p.add_argument("--batch-size", type=int, default=None)
+    p.add_argument("--drain", action="store_true", help="Exit once the outbox is empty")
+    p.add_argument("--metrics-port", type=int, default=0, help="Serve Prometheus metrics")
+    p.set_defaults(func=_cmd_outbox)
+
+    p = sub.add_parser("import", help="Bulk-load transactions from CSV/NDJSON files")
+    p.add_argument("files", nargs="+", help="Input files; each one is a shard")
+    p.add_argument("--format", choices=["csv", "ndjson"], default=None, help="Default: extension")
+    p.add_argument("--chunk-size", type=int, default=None, help="Transactions per commit")
+    p.add_argument("--workers", type=int, default=1, help="Files imported in parallel")
+    p.add_argument("--no-events", action="store_true", help="Skip outbox events")
+    p.add_argument("--restart", action="store_true", help="Ignore saved progress")
+    p.set_defaults(func=_cmd_import)
+
+    p = sub.add_parser("export", help="Stream postings as NDJSON, CSV or Parquet")
+    p.add_argument("what", choices=["postings"])
+    p.add_argument("--format", choices=["ndjson", "csv", "parquet"], default="ndjson")
+    p.add_argument("--asset", default=None)
+    p.add_argument("--from", dest="created_from", type=datetime.fromisoformat, default=None)
+    p.add_argument("--to", dest="created_to", type=datetime.fromisoformat, default=None)
+    p.add_argument("--output", "-o", default="-", help="File path, or - for stdout")
+    p.set_defaults(func=_cmd_export)
+
+    p = sub.add_parser("periods", help="Close ledger periods and archive their postings")
+    p.add_argument("action", choices=["list", "close", "archive", "export"])
+    p.add_argument(
+        "--through",
+        type=datetime.fromisoformat,
+        default=None,
+        help="close: end of the period (exclusive)",
+    )
+    p.add_argument("--period", type=int, default=None, help="archive/export: period id")
+    p.add_argument("--archive", default=None, help="table or file:<dir>")
+    p.add_argument("--format", choices=["ndjson", "csv", "parquet"], default="ndjson")
+    p.add_argument("--output", "-o", default="-", help="File path, or - for stdout")
+    p.set_defaults(func=_cmd_periods)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
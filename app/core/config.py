@@ -7,8 +7,62 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_prefix="FP_", extra="ignore")
 
     database_url: str = "sqlite:///./app.db"
+    # Read replicas for lag-tolerant reads (read_session()); empty = read from the primary.
+    database_replica_urls: list[str] = []
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_replica_pool_size: int = 5  # per replica
+    db_replica_max_overflow: int = 10
+    # API routes: "sync" (threadpool + sync engine) or "async" (async engine, aiosqlite/asyncpg).
+    api_stack: str = "sync"
+    async_database_url: str | None = None  # default: database_url with its async driver
+    server_timing: bool = False  # add a Server-Timing header (db time, query count, total)
     mock_bank_base_url: str = "http://mock-bank:9000"
+    bank_connector: str = "mock"  # "http" fetches from mock_bank_base_url
+    bank_page_size: int = 1000
+    bank_fetch_concurrency: int = 8  # pages in flight, also the connection pool size
+    bank_max_retries: int = 3
+    bank_retry_backoff_seconds: float = 0.2
+    bank_timeout_seconds: float = 10.0
+    bank_sync_batch_size: int = 2000  # rows per upsert statement and commit
+    bank_sync_overlap_minutes: int = 60  # re-read before the cursor to catch late bookings
     reconciliation_window_days: int = 14
+    reconciliation_stream_batch_size: int = 10_000
+    # Max booked_at distance for amount matches; None disables the date check.
+    reconciliation_match_window_hours: float | None = 72
+    # "numpy" vectorizes amount-only matching (window disabled); needs the [fast] extra.
+    reconciliation_matcher: str = "python"
+    reconciliation_max_concurrent_runs: int = 2
+    # Partitions: "asset" (one per asset with cash accounts) or "account" (one per cash account).
+    reconciliation_partition_by: str = "asset"
+    reconciliation_assets: list[str] = []  # empty = every asset with a cash account
+    reconciliation_workers: int = 1  # >1 runs partitions in a process pool
+    reconciliation_max_pending_runs: int = 20  # queued + running, per process
+    # Runs still QUEUED/RUNNING this long after they started are failed at startup (orphans).
+    reconciliation_stale_run_hours: float = 6
+    # Sync bank feeds into bank_movements before each run; disable when `fp-ledger bank sync`
+    # runs on its own schedule.
+    reconciliation_sync_bank: bool = True
+    # Read partition inputs from a replica. Only safe when replica lag stays well below the
+    # time between a bank sync and the run (open items and synced movements must be visible).
+    reconciliation_read_replica: bool = False
+    account_cache_size: int = 4096
+    idempotency_store: str = "memory"  # or a redis:// URL shared by all API processes
+    idempotency_cache_size: int = 10_000
+    idempotency_cache_ttl_seconds: float = 3600
+    import_chunk_size: int = 5000  # transactions per committed import chunk
+    report_cache_size: int = 256  # cached report results (parameters x ledger version)
+    # Date-ranged report totals: "sql" groups postings in the database, "columnar" loads the
+    # range into compact columns and sums them in-process (see app.services.columnar).
+    report_engine: str = "sql"
+    export_batch_size: int = 5000  # rows per fetch, encoded chunk and Parquet row group
+    outbox_sink: str = "file:./outbox.ndjson"  # or "memory"
+    outbox_batch_size: int = 500
+    outbox_lease_seconds: float = 30  # SQLite claim lease; Postgres uses row locks
+    outbox_poll_seconds: float = 1.0
+    checkpoint_interval_hours: int = 24
+    # Transactions get created_at before they commit; leave room for in-flight writes.
+    checkpoint_settle_seconds: int = 300
 
 
 settings = Settings()
@@ -0,0 +1,21 @@
+"""Compact JSON encoding via orjson when it is installed (the ``[fast]`` extra).
+
+Without orjson the stdlib encoder is used with the same separators, so the bytes on the
+wire are identical either way.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
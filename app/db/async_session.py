@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+from app.db.session import DATABASE_URL
+
+# Async drivers for the sync URLs the rest of the service uses.
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_url(url: str | None = None) -> str:
+    """``settings.async_database_url`` if set, else the sync URL with its async driver.
+
+    ``sqlite:///x.db`` becomes ``sqlite+aiosqlite:///x.db`` and ``postgresql://...``
+    (any sync driver) becomes ``postgresql+asyncpg://...``.
+    """
+    url = url or settings.async_database_url or DATABASE_URL
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver for database URL: {parsed.get_backend_name()}")
+    if parsed.get_driver_name() in ("aiosqlite", "asyncpg", "psycopg"):
+        return url
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+_engine: AsyncEngine | None = None
+_sessionmaker: async_sessionmaker[AsyncSession] | None = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """Created on first use so the sync-only stack never needs an async driver installed."""
+    global _engine, _sessionmaker
+    if _engine is None:
+        _engine = create_async_engine(async_url())
+        instrument_engine(_engine.sync_engine)
+        _sessionmaker = async_sessionmaker(bind=_engine, autoflush=False, expire_on_commit=False)
+    return _engine
+
+
+async def dispose_async_engine() -> None:
+    global _engine, _sessionmaker
+    if _engine is not None:
+        await _engine.dispose()
+        _engine = _sessionmaker = None
+
+
+@asynccontextmanager
+async def async_db_session():
+    get_async_engine()
+    assert _sessionmaker is not None
+    db = _sessionmaker()
+    try:
+        yield db
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    finally:
+        await db.close()
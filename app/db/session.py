@@ -1,26 +1,85 @@
 from __future__ import annotations
 
+import itertools
+import threading
 from contextlib import contextmanager
+from contextvars import ContextVar
 
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
 from sqlalchemy.engine.url import make_url
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
 
 DATABASE_URL = settings.database_url  # tests set env DATABASE_URL before importing
 
-_connect_args: dict = {}
-try:
-    if make_url(DATABASE_URL).get_backend_name() == "sqlite":
-        _connect_args = {"check_same_thread": False}
-except Exception:
-    pass
 
-engine = create_engine(DATABASE_URL, future=True, connect_args=_connect_args)
+def get_sqlalchemy_url() -> str:
+    return DATABASE_URL
+
+
+def _make_engine(url: str, pool_size: int, max_overflow: int, pre_ping: bool = False) -> Engine:
+    kwargs: dict = {"pool_size": pool_size, "max_overflow": max_overflow}
+    try:
+        parsed = make_url(url)
+        if parsed.get_backend_name() == "sqlite":
+            kwargs["connect_args"] = {"check_same_thread": False}
+            if parsed.database in (None, "", ":memory:"):
+                kwargs = {"connect_args": kwargs["connect_args"]}  # single-connection pool
+    except Exception:
+        pass
+    return instrument_engine(create_engine(url, future=True, pool_pre_ping=pre_ping, **kwargs))
+
+
+engine = _make_engine(DATABASE_URL, settings.db_pool_size, settings.db_max_overflow)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False, class_=Session)
 
+# Read replicas, used round-robin by read_session(); empty means reads go to the primary.
+replica_engines: list[Engine] = []
+_replica_sessions: list[sessionmaker[Session]] = []
+_next_replica = itertools.count()
+_replica_lock = threading.Lock()
+_pin_primary: ContextVar[bool] = ContextVar("pin_primary", default=False)
+
+
+def configure_replicas(urls: list[str]) -> None:
+    """(Re)build the replica engines; existing ones are disposed."""
+    global replica_engines, _replica_sessions
+    engines = [
+        # Pre-ping: a replica may be restarted or failed over independently of the primary.
+        _make_engine(
+            url, settings.db_replica_pool_size, settings.db_replica_max_overflow, pre_ping=True
+        )
+        for url in urls
+    ]
+    with _replica_lock:
+        old, replica_engines = replica_engines, engines
+        _replica_sessions = [
+            sessionmaker(bind=e, autoflush=False, expire_on_commit=False, class_=Session)
+            for e in engines
+        ]
+    for e in old:
+        e.dispose()
+
+
+configure_replicas(settings.database_replica_urls)
+
+
+@contextmanager
+def pin_to_primary():
+    """Route every ``read_session()`` in this context to the primary (read-your-writes)."""
+    token = _pin_primary.set(True)
+    try:
+        yield
+    finally:
+        _pin_primary.reset(token)
+
+
+def primary_pinned() -> bool:
+    return _pin_primary.get()
+
 
 def get_session():
     db = SessionLocal()
@@ -30,6 +89,27 @@ def get_session():
         db.close()
 
 
+@contextmanager
+def read_session():
+    """Session for reads that tolerate replica lag, taken round-robin from the replicas.
+
+    Falls back to the primary when no replicas are configured or inside
+    ``pin_to_primary()``. Nothing is committed; the transaction is rolled back on exit.
+    """
+    with _replica_lock:
+        sessions = _replica_sessions
+    if not sessions or _pin_primary.get():
+        factory = SessionLocal
+    else:
+        factory = sessions[next(_next_replica) % len(sessions)]
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
 @contextmanager
 def db_session():
     db = SessionLocal()
@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(s: Session, table):
+    """Return an ``INSERT`` construct supporting ``ON CONFLICT`` for the session's dialect."""
+    name = s.get_bind().dialect.name
+    if name == "postgresql":
+        return postgresql.insert(table)
+    if name == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upsert not supported for dialect: {name}")
@@ -7,8 +7,20 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
 
+from app.api.responses import FastJSONResponse
 from app.api.routes import router
+from app.core.config import settings
+from app.core.instrumentation import (
+    DB_QUERIES,
+    DB_SECONDS,
+    route_label,
+    server_timing,
+    track_queries,
+)
 from app.core.logging import get_logger
+from app.db.session import pin_to_primary
+from app.services import jobs
+from app.services.connectors.http_bank import close_shared_connector
 
 LOG = get_logger("fp-ledger")
 REQ_COUNT = Counter("http_requests_total", "Total HTTP requests", ["method", "path", "status"])
@@ -18,28 +30,61 @@ REQ_LAT = Histogram("http_request_latency_seconds", "Latency", ["method", "path"
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     LOG.info("starting")
+    jobs.fail_stale_runs()
     yield
     LOG.info("stopping")
+    jobs.shutdown()
+    close_shared_connector()
+    if settings.api_stack == "async":
+        from app.db.async_session import dispose_async_engine
 
+        await dispose_async_engine()
 
-app = FastAPI(title="FP Ledger Reconciler", version="0.1.0", lifespan=lifespan)
+
+app = FastAPI(
+    title="FP Ledger Reconciler",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
+if settings.api_stack == "async":
+    from app.api.routes_async import router as async_router
+
+    # Registered first, so its routes win over the sync ones with the same path.
+    app.include_router(async_router)
 app.include_router(router)
 
 
+@app.middleware("http")
+async def read_primary_mw(request: Request, call_next):
+    # Clients that must read their own writes send X-Read-Primary: 1 to bypass the replicas.
+    if request.headers.get("x-read-primary", "").lower() in ("1", "true"):
+        with pin_to_primary():
+            return await call_next(request)
+    return await call_next(request)
+
+
 @app.middleware("http")
 async def metrics_mw(request: Request, call_next):
-    path = request.url.path
     method = request.method
-    start = time.time()
-    try:
-        resp = await call_next(request)
-        return resp
-    finally:
-        dur = time.time() - start
-        status = getattr(locals().get("resp", None), "status_code", 500)
-        # avoid high-cardinality labels: keep path as-is for this small demo
-        REQ_COUNT.labels(method=method, path=path, status=str(status)).inc()
-        REQ_LAT.labels(method=method, path=path).observe(dur)
+    start = time.perf_counter()
+    resp = None
+    with track_queries() as db:
+        try:
+            resp = await call_next(request)
+            return resp
+        finally:
+            dur = time.perf_counter() - start
+            status = resp.status_code if resp is not None else 500
+            # Route templates keep label cardinality bounded (ids stay out of the labels).
+            path = route_label(request.scope)
+            REQ_COUNT.labels(method=method, path=path, status=str(status)).inc()
+            REQ_LAT.labels(method=method, path=path).observe(dur)
+            # Streamed bodies query after this point; only the setup is counted for them.
+            DB_QUERIES.labels(method=method, route=path).observe(db.count)
+            DB_SECONDS.labels(method=method, route=path).observe(db.seconds)
+            if resp is not None and settings.server_timing:
+                resp.headers["Server-Timing"] = server_timing(db, dur)
 
 
 @app.get("/health")
@@ -3,7 +3,17 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from decimal import Decimal
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    UniqueConstraint,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -31,6 +41,8 @@ class Account(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Keyset pages filtered by asset seek on (asset, id).
+    __table_args__ = (Index("ix_transactions_asset_id", "asset", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     reference: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
@@ -39,8 +51,10 @@ class Transaction(Base):
     idempotency_key: Mapped[str] = mapped_column(
         String(128), unique=True, index=True, nullable=False
     )
+    # SHA-256 of the request payload, to reject a key reused for a different entry.
+    payload_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=utcnow, nullable=False
+        DateTime(timezone=True), default=utcnow, index=True, nullable=False
     )
 
     postings: Mapped[list[Posting]] = relationship(
@@ -64,8 +78,94 @@ class Posting(Base):
     account: Mapped[Account] = relationship(back_populates="postings")
 
 
+class AccountBalance(Base):
+    """Running totals per account, maintained in the same transaction as the postings."""
+
+    __tablename__ = "account_balances"
+
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), primary_key=True)
+    debits: Mapped[Decimal] = mapped_column(Numeric(28, 6), default=Decimal("0"), nullable=False)
+    credits: Mapped[Decimal] = mapped_column(Numeric(28, 6), default=Decimal("0"), nullable=False)
+    posting_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+
+
+class BalanceCheckpoint(Base):
+    """Cumulative account totals over postings whose transaction was created before ``as_of``."""
+
+    __tablename__ = "balance_checkpoints"
+    __table_args__ = (UniqueConstraint("account_id", "as_of"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), nullable=False)
+    as_of: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    debits: Mapped[Decimal] = mapped_column(Numeric(28, 6), nullable=False)
+    credits: Mapped[Decimal] = mapped_column(Numeric(28, 6), nullable=False)
+    posting_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class LedgerPeriod(Base):
+    """A closed (frozen) date range of the ledger: transactions created in ``[start, end)``.
+
+    Periods are contiguous; ``start`` is the previous period's ``end`` (None for the first).
+    """
+
+    __tablename__ = "ledger_periods"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    start: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    end: Mapped[datetime] = mapped_column(DateTime(timezone=True), unique=True, nullable=False)
+    closed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+    transaction_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    posting_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Where the period's postings live: None (still in postings), "table", or "file:<path>".
+    archive: Mapped[str | None] = mapped_column(String(512), nullable=True)
+
+
+class PeriodOpeningBalance(Base):
+    """Cumulative account totals at a period's ``end``: the opening balance of the next one."""
+
+    __tablename__ = "period_opening_balances"
+
+    period_id: Mapped[int] = mapped_column(ForeignKey("ledger_periods.id"), primary_key=True)
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), primary_key=True)
+    debits: Mapped[Decimal] = mapped_column(Numeric(28, 6), nullable=False)
+    credits: Mapped[Decimal] = mapped_column(Numeric(28, 6), nullable=False)
+    posting_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ArchivedPosting(Base):
+    """A posting moved out of ``postings`` when its period was archived; ids are kept."""
+
+    __tablename__ = "archived_postings"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    period_id: Mapped[int] = mapped_column(
+        ForeignKey("ledger_periods.id"), index=True, nullable=False
+    )
+    transaction_id: Mapped[int] = mapped_column(
+        ForeignKey("transactions.id"), index=True, nullable=False
+    )
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), nullable=False)
+    direction: Mapped[str] = mapped_column(String(6), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
+
+
 class EventOutbox(Base):
     __tablename__ = "events_outbox"
+    __table_args__ = (
+        # Only pending events are ever scanned by the relay.
+        Index(
+            "ix_events_outbox_pending",
+            "id",
+            postgresql_where=text("processed_at IS NULL"),
+            sqlite_where=text("processed_at IS NULL"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     event_type: Mapped[str] = mapped_column(String(64), nullable=False)
@@ -74,15 +174,90 @@ class EventOutbox(Base):
         DateTime(timezone=True), default=utcnow, nullable=False
     )
     processed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Relay lease, used where row locks with SKIP LOCKED are unavailable (SQLite).
+    claimed_by: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    lease_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class StoredBankMovement(Base):
+    """A bank feed movement kept locally so reconciliation never re-downloads the window."""
+
+    __tablename__ = "bank_movements"
+    __table_args__ = (
+        UniqueConstraint("provider", "reference"),
+        Index("ix_bank_movements_provider_booked_at", "provider", "booked_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    provider: Mapped[str] = mapped_column(
+        String(160), nullable=False
+    )  # feed key: connector:currency[:account]
+    reference: Mapped[str] = mapped_column(String(64), nullable=False)
+    currency: Mapped[str] = mapped_column(String(16), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
+    booked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    synced_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
+
+
+class BankSyncCursor(Base):
+    """Newest ``booked_at`` fetched so far from one bank feed."""
+
+    __tablename__ = "bank_sync_cursors"
+
+    provider: Mapped[str] = mapped_column(String(160), primary_key=True)
+    cursor: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    synced_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, nullable=False
+    )
 
 
 class ReconciliationRun(Base):
     __tablename__ = "reconciliation_runs"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    status: Mapped[str] = mapped_column(String(16), nullable=False)  # RUNNING/SUCCEEDED/FAILED
+    status: Mapped[str] = mapped_column(
+        String(16), index=True, nullable=False
+    )  # QUEUED/RUNNING/SUCCEEDED/FAILED
+    progress: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # percent
+    mode: Mapped[str] = mapped_column(
+        String(16), default="FULL", nullable=False
+    )  # FULL/INCREMENTAL
     started_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=utcnow, nullable=False
     )
     finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     summary_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # High-water marks reached by an incremental run, keyed by asset.
+    watermark_json: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class ReconciliationOpenItem(Base):
+    """A ledger or bank movement still unmatched after the last incremental run."""
+
+    __tablename__ = "reconciliation_open_items"
+    __table_args__ = (
+        # One open item per source and partition, even if two runs race past the same entry.
+        Index(
+            "uq_reconciliation_open_items_source",
+            "side",
+            "asset",
+            text("coalesce(account_id, 0)"),
+            "source_id",
+            unique=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    side: Mapped[str] = mapped_column(String(8), nullable=False)  # LEDGER/BANK
+    asset: Mapped[str] = mapped_column(String(16), index=True, nullable=False)
+    # Set when reconciling per cash account rather than per asset.
+    account_id: Mapped[int | None] = mapped_column(ForeignKey("accounts.id"), nullable=True)
+    source_id: Mapped[str] = mapped_column(
+        String(64), nullable=False
+    )  # transaction id or bank reference
+    reference: Mapped[str] = mapped_column(String(64), nullable=False)
+    amount: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
+    booked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    run_id: Mapped[int] = mapped_column(ForeignKey("reconciliation_runs.id"), nullable=False)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from datetime import datetime
 from decimal import Decimal
 
 from pydantic import BaseModel, Field
@@ -46,9 +47,127 @@ class TransactionOut(BaseModel):
     postings: list[PostingOut]
 
 
+class TransactionPage(BaseModel):
+    items: list[TransactionOut]
+    next_cursor: str | None = None  # opaque; absent on the last page
+
+
+class BatchTransactionIn(TransactionIn):
+    idempotency_key: str = Field(min_length=1, max_length=128)
+
+
+class ImportTransactionIn(BatchTransactionIn):
+    created_at: datetime | None = None  # historical timestamp; defaults to import time
+
+
+class TransactionBatchIn(BaseModel):
+    transactions: list[BatchTransactionIn] = Field(min_length=1, max_length=1000)
+
+
+class BatchItemResult(BaseModel):
+    idempotency_key: str
+    status: str  # created/replayed/rejected
+    transaction: TransactionOut | None = None
+    error: str | None = None
+
+
+class TransactionBatchOut(BaseModel):
+    created: int
+    replayed: int
+    rejected: int
+    results: list[BatchItemResult]
+
+
+class AccountBalanceOut(BaseModel):
+    account_id: int
+    account_name: str
+    asset: str
+    type: str
+    debits: Decimal
+    credits: Decimal
+    balance: Decimal  # debits - credits
+    posting_count: int
+    as_of: str | None = None
+
+
+class AssetTotal(BaseModel):
+    asset: str
+    debits: Decimal
+    credits: Decimal
+    balanced: bool  # debits == credits
+
+
+class TrialBalanceOut(BaseModel):
+    asset: str | None
+    created_from: str | None
+    created_to: str | None
+    # "<max transaction id>:<posting count>:<max account id>" the report was computed at
+    ledger_version: str
+    accounts: list[AccountBalanceOut]
+    totals: list[AssetTotal]
+
+
+class AccountTypeTotal(BaseModel):
+    asset: str
+    type: str
+    debits: Decimal
+    credits: Decimal
+    balance: Decimal  # debits - credits
+    account_count: int
+    posting_count: int
+
+
+class AccountTypeRollupOut(BaseModel):
+    asset: str | None
+    created_from: str | None
+    created_to: str | None
+    ledger_version: str
+    types: list[AccountTypeTotal]
+
+
+class BalanceDrift(BaseModel):
+    account_id: int
+    expected_debits: Decimal
+    expected_credits: Decimal
+    expected_count: int
+    stored_debits: Decimal
+    stored_credits: Decimal
+    stored_count: int
+
+
+class BalanceVerifyReport(BaseModel):
+    accounts_checked: int
+    postings_scanned: int
+    drift: list[BalanceDrift]
+    repaired: bool
+
+
 class ReconciliationSummary(BaseModel):
     matched: int
     missing_in_bank: int
     missing_in_ledger: int
     mismatched_amount: int
+    passes: dict[str, int] = {}
     notes: list[str] = []
+    partitions: dict[str, ReconciliationSummary] = {}
+
+
+class ReconciliationRunOut(BaseModel):
+    id: int
+    status: str
+    mode: str
+    progress: int
+    started_at: str
+    finished_at: str | None
+    summary: ReconciliationSummary | None = None
+    error: str | None = None
+
+
+class PeriodOut(BaseModel):
+    id: int
+    start: str | None  # None for the first period
+    end: str  # exclusive
+    closed_at: str
+    transaction_count: int
+    posting_count: int
+    archive: str | None  # None (postings still hot), "table" or "file:<path>"
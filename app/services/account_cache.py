@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from prometheus_client import Counter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Account
+
+CACHE_LOOKUPS = Counter("account_cache_lookups_total", "Account cache lookups", ["result"])
+
+
+@dataclass(frozen=True)
+class AccountRef:
+    id: int
+    name: str
+    asset: str
+
+
+class AccountCache:
+    """Process-local, size-bounded LRU of account name -> (id, asset).
+
+    Accounts are never renamed or deleted, so entries only need invalidating when an
+    account is created (a name that previously missed may now resolve).
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, AccountRef] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name: str) -> AccountRef | None:
+        with self._lock:
+            ref = self._data.get(name)
+            if ref is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(name)
+        CACHE_LOOKUPS.labels(result="miss" if ref is None else "hit").inc()
+        return ref
+
+    def put(self, ref: AccountRef) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[ref.name] = ref
+            self._data.move_to_end(ref.name)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, name: str | None = None) -> None:
+        with self._lock:
+            if name is None:
+                self._data.clear()
+            else:
+                self._data.pop(name, None)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+ACCOUNT_CACHE = AccountCache(settings.account_cache_size)
+
+
+def resolve_accounts(s: Session, names: Iterable[str]) -> dict[str, AccountRef]:
+    """Resolve account names through the cache, with one ``IN (...)`` query for all misses.
+
+    Unknown names are simply absent from the result.
+    """
+    found: dict[str, AccountRef] = {}
+    missing: list[str] = []
+    for name in set(names):
+        ref = ACCOUNT_CACHE.get(name)
+        if ref is None:
+            missing.append(name)
+        else:
+            found[name] = ref
+    if missing:
+        rows = s.execute(
+            select(Account.id, Account.name, Account.asset).where(Account.name.in_(missing))
+        )
+        for acc_id, name, asset in rows:
+            ref = AccountRef(id=acc_id, name=name, asset=asset)
+            ACCOUNT_CACHE.put(ref)
+            found[name] = ref
+    return found
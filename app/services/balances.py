@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.logging import get_logger
+from app.db.session import db_session
+from app.db.upsert import dialect_insert
+from app.models import (
+    Account,
+    AccountBalance,
+    LedgerPeriod,
+    PeriodOpeningBalance,
+    Posting,
+    utcnow,
+)
+from app.schemas import AccountBalanceOut, BalanceDrift, BalanceVerifyReport
+
+LOG = get_logger("balances")
+
+ZERO = Decimal("0")
+
+
+def apply_posting_deltas(s: Session, legs: Iterable[tuple[int, str, Decimal]]) -> None:
+    """Add (account_id, direction, amount) legs to the running balances.
+
+    Must be called in the same session as the postings are written so the balance update
+    commits or rolls back with them. Rows are upserted in account_id order to keep lock
+    ordering stable across concurrent writers.
+    """
+    deltas: dict[int, list] = defaultdict(lambda: [ZERO, ZERO, 0])
+    for account_id, direction, amount in legs:
+        d = deltas[account_id]
+        if direction == "DEBIT":
+            d[0] += amount
+        else:
+            d[1] += amount
+        d[2] += 1
+    if not deltas:
+        return
+
+    now = utcnow()
+    stmt = dialect_insert(s, AccountBalance).values(
+        [
+            {
+                "account_id": account_id,
+                "debits": debits,
+                "credits": credits,
+                "posting_count": count,
+                "updated_at": now,
+            }
+            for account_id, (debits, credits, count) in sorted(deltas.items())
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AccountBalance.account_id],
+        set_={
+            "debits": AccountBalance.debits + stmt.excluded.debits,
+            "credits": AccountBalance.credits + stmt.excluded.credits,
+            "posting_count": AccountBalance.posting_count + stmt.excluded.posting_count,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    s.execute(stmt)
+
+
+def _balance_query():
+    return (
+        select(
+            Account.id,
+            Account.name,
+            Account.asset,
+            Account.type,
+            func.coalesce(AccountBalance.debits, ZERO),
+            func.coalesce(AccountBalance.credits, ZERO),
+            func.coalesce(AccountBalance.posting_count, 0),
+        )
+        .select_from(Account)
+        .outerjoin(AccountBalance, AccountBalance.account_id == Account.id)
+    )
+
+
+def _balance_out(row) -> AccountBalanceOut:
+    acc_id, name, asset, acc_type, debits, credits, count = row
+    debits, credits = Decimal(debits), Decimal(credits)
+    return AccountBalanceOut(
+        account_id=acc_id,
+        account_name=name,
+        asset=asset,
+        type=acc_type,
+        debits=debits,
+        credits=credits,
+        balance=debits - credits,
+        posting_count=count,
+    )
+
+
+def get_account_balance(account_id: int) -> AccountBalanceOut | None:
+    with db_session() as s:
+        row = s.execute(_balance_query().where(Account.id == account_id)).first()
+        return _balance_out(row) if row else None
+
+
+def list_balances(asset: str | None = None) -> list[AccountBalanceOut]:
+    stmt = _balance_query().order_by(Account.id)
+    if asset:
+        stmt = stmt.where(Account.asset == asset)
+    with db_session() as s:
+        return [_balance_out(row) for row in s.execute(stmt)]
+
+
+def recompute_balances(s: Session, chunk_size: int = 50_000) -> tuple[dict[int, list], int]:
+    """Recompute per-account totals from postings, one posting-id range at a time.
+
+    Each chunk is aggregated in SQL, so memory is bounded by the number of accounts rather
+    than the number of postings. Postings moved out by archiving are represented by the
+    last archived period's opening balances, which the scan starts from.
+    """
+    expected: dict[int, list] = defaultdict(lambda: [ZERO, ZERO, 0])
+    last_archived = (
+        select(LedgerPeriod.id)
+        .where(LedgerPeriod.archive.is_not(None))
+        .order_by(LedgerPeriod.end.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    for ob in s.scalars(
+        select(PeriodOpeningBalance).where(PeriodOpeningBalance.period_id == last_archived)
+    ):
+        expected[ob.account_id] = [Decimal(ob.debits), Decimal(ob.credits), ob.posting_count]
+    max_id = s.scalar(select(func.max(Posting.id))) or 0
+    scanned = 0
+    lo = 0
+    while lo < max_id:
+        hi = lo + chunk_size
+        rows = s.execute(
+            select(Posting.account_id, Posting.direction, func.sum(Posting.amount), func.count())
+            .where(Posting.id > lo, Posting.id <= hi)
+            .group_by(Posting.account_id, Posting.direction)
+        )
+        for account_id, direction, total, count in rows:
+            e = expected[account_id]
+            e[0 if direction == "DEBIT" else 1] += Decimal(total)
+            e[2] += count
+            scanned += count
+        lo = hi
+    return expected, scanned
+
+
+def verify_balances(repair: bool = False, chunk_size: int = 50_000) -> BalanceVerifyReport:
+    """Compare stored balances with totals recomputed from postings; optionally repair them.
+
+    Run with ingestion paused when repairing: postings written while the scan is in
+    progress would be counted by the live update but missed by the recomputation.
+    """
+    with db_session() as s:
+        expected, scanned = recompute_balances(s, chunk_size=chunk_size)
+        stored = {
+            b.account_id: (b.debits, b.credits, b.posting_count)
+            for b in s.scalars(select(AccountBalance))
+        }
+
+        drift: list[BalanceDrift] = []
+        for account_id in sorted(set(expected) | set(stored)):
+            e_debits, e_credits, e_count = expected.get(account_id, (ZERO, ZERO, 0))
+            s_debits, s_credits, s_count = stored.get(account_id, (ZERO, ZERO, 0))
+            if (e_debits, e_credits, e_count) != (Decimal(s_debits), Decimal(s_credits), s_count):
+                drift.append(
+                    BalanceDrift(
+                        account_id=account_id,
+                        expected_debits=e_debits,
+                        expected_credits=e_credits,
+                        expected_count=e_count,
+                        stored_debits=s_debits,
+                        stored_credits=s_credits,
+                        stored_count=s_count,
+                    )
+                )
+
+        if repair and drift:
+            now = utcnow()
+            stmt = dialect_insert(s, AccountBalance).values(
+                [
+                    {
+                        "account_id": d.account_id,
+                        "debits": d.expected_debits,
+                        "credits": d.expected_credits,
+                        "posting_count": d.expected_count,
+                        "updated_at": now,
+                    }
+                    for d in drift
+                ]
+            )
+            s.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[AccountBalance.account_id],
+                    set_={
+                        "debits": stmt.excluded.debits,
+                        "credits": stmt.excluded.credits,
+                        "posting_count": stmt.excluded.posting_count,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                )
+            )
+
+        if drift:
+            LOG.warning(f"balance drift: accounts={len(drift)} repaired={repair}")
+        return BalanceVerifyReport(
+            accounts_checked=len(set(expected) | set(stored)),
+            postings_scanned=scanned,
+            drift=drift,
+            repaired=repair and bool(drift),
+        )
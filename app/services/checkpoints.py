@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import FromClause, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import db_session
+from app.models import (
+    Account,
+    ArchivedPosting,
+    BalanceCheckpoint,
+    LedgerPeriod,
+    PeriodOpeningBalance,
+    Posting,
+    Transaction,
+    utcnow,
+)
+from app.schemas import AccountBalanceOut
+
+LOG = get_logger("checkpoints")
+
+ZERO = Decimal("0")
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_COMMIT_EVERY = 30  # boundaries per commit during a long catch-up
+
+
+def as_utc(dt: datetime) -> datetime:
+    """Normalize to aware UTC; naive values (as returned by SQLite) are already UTC."""
+    return dt.replace(tzinfo=UTC) if dt.tzinfo is None else dt.astimezone(UTC)
+
+
+def _floor(dt: datetime, interval: timedelta) -> datetime:
+    return _EPOCH + ((as_utc(dt) - _EPOCH) // interval) * interval
+
+
+def closed_through(s: Session) -> datetime | None:
+    """End of the last closed period; nothing created before it may change."""
+    end = s.scalar(select(func.max(LedgerPeriod.end)))
+    return as_utc(end) if end else None
+
+
+def archived_end():
+    """Scalar subquery: end of the last archived period (NULL when nothing is archived).
+
+    Archiving goes in period order, so every posting created before it has left ``postings``.
+    """
+    return (
+        select(func.max(LedgerPeriod.end))
+        .where(LedgerPeriod.archive.is_not(None))
+        .scalar_subquery()
+    )
+
+
+_POSTING_COLUMNS = ("id", "transaction_id", "account_id", "direction", "amount")
+
+
+def posting_source(
+    s: Session, created_from: datetime | None = None, created_to: datetime | None = None
+) -> FromClause:
+    """Where the postings of transactions created in ``[created_from, created_to)`` live.
+
+    The ``postings`` table unless the range reaches into archived periods; then postings and
+    ``archived_postings`` combined. Raises ``ValueError`` for periods archived to a file,
+    which are only read whole (``periods.read_period``).
+    """
+    stmt = select(LedgerPeriod.end, LedgerPeriod.archive).where(LedgerPeriod.archive.is_not(None))
+    if created_from is not None:
+        stmt = stmt.where(LedgerPeriod.end > created_from)
+    if created_to is not None:
+        stmt = stmt.where((LedgerPeriod.start.is_(None)) | (LedgerPeriod.start < created_to))
+    archived = s.execute(stmt.order_by(LedgerPeriod.end)).all()
+    if not archived:
+        return Posting.__table__
+    for end, archive in archived:
+        if archive != "table":
+            raise ValueError(
+                f"Range reaches the period ending {as_utc(end).isoformat()}, archived to "
+                f"{archive}; read it with `fp-ledger periods export`"
+            )
+    hot = select(*(Posting.__table__.c[c] for c in _POSTING_COLUMNS))
+    cold = select(*(ArchivedPosting.__table__.c[c] for c in _POSTING_COLUMNS))
+    return hot.union_all(cold).subquery("postings_all")
+
+
+def _period_totals(
+    s: Session,
+    start: datetime | None,
+    end: datetime,
+    account_id: int | None = None,
+    source: FromClause | None = None,
+):
+    """Sum postings per (account, direction) for transactions created in ``[start, end)``.
+
+    ``source`` defaults to the ``postings`` table (see ``posting_source``).
+    """
+    p = (Posting.__table__ if source is None else source).c
+    stmt = (
+        select(p.account_id, p.direction, func.sum(p.amount), func.count())
+        .join(Transaction, Transaction.id == p.transaction_id)
+        .where(Transaction.created_at < end)
+        .group_by(p.account_id, p.direction)
+    )
+    if start is not None:
+        stmt = stmt.where(Transaction.created_at >= start)
+    if account_id is not None:
+        stmt = stmt.where(p.account_id == account_id)
+    return s.execute(stmt)
+
+
+def _latest_checkpoints(s: Session, at: datetime) -> dict[int, list]:
+    latest = (
+        select(BalanceCheckpoint.account_id, func.max(BalanceCheckpoint.as_of).label("as_of"))
+        .where(BalanceCheckpoint.as_of <= at)
+        .group_by(BalanceCheckpoint.account_id)
+        .subquery()
+    )
+    rows = s.scalars(
+        select(BalanceCheckpoint).join(
+            latest,
+            (BalanceCheckpoint.account_id == latest.c.account_id)
+            & (BalanceCheckpoint.as_of == latest.c.as_of),
+        )
+    )
+    return {cp.account_id: [cp.debits, cp.credits, cp.posting_count] for cp in rows}
+
+
+def build_checkpoints(until: datetime | None = None, interval: timedelta | None = None) -> int:
+    """Write checkpoints for every closed interval since the last one; returns rows written.
+
+    Each interval costs one grouped query over the postings created in it, and a checkpoint
+    row is only written for accounts whose totals changed, so as-of lookups read the latest
+    checkpoint at or before the requested instant.
+    """
+    interval = interval or timedelta(hours=settings.checkpoint_interval_hours)
+    if until is None:
+        until = utcnow() - timedelta(seconds=settings.checkpoint_settle_seconds)
+    until = as_utc(until)
+
+    written = 0
+    with db_session() as s:
+        last = s.scalar(select(func.max(BalanceCheckpoint.as_of)))
+        if last is None:
+            first = s.scalar(select(func.min(Transaction.created_at)))
+            if first is None:
+                return 0
+            boundary = _floor(first, interval)
+            running: dict[int, list] = {}
+        else:
+            boundary = as_utc(last)
+            running = _latest_checkpoints(s, boundary)
+
+        steps = 0
+        while boundary + interval <= until:
+            nxt = boundary + interval
+            changed: set[int] = set()
+            for account_id, direction, total, count in _period_totals(s, boundary, nxt):
+                r = running.setdefault(account_id, [ZERO, ZERO, 0])
+                r[0 if direction == "DEBIT" else 1] += Decimal(total)
+                r[2] += count
+                changed.add(account_id)
+            if changed:
+                s.add_all(
+                    BalanceCheckpoint(
+                        account_id=account_id,
+                        as_of=nxt,
+                        debits=running[account_id][0],
+                        credits=running[account_id][1],
+                        posting_count=running[account_id][2],
+                    )
+                    for account_id in sorted(changed)
+                )
+                written += len(changed)
+            boundary = nxt
+            steps += 1
+            if steps % _COMMIT_EVERY == 0:
+                s.commit()
+
+    LOG.info(f"checkpoints built: rows={written} through={boundary.isoformat()}")
+    return written
+
+
+def get_balance_as_of(account_id: int, as_of: datetime) -> AccountBalanceOut | None:
+    """Balance including every transaction created at or before ``as_of``.
+
+    Reads the nearest checkpoint at or before ``as_of`` and adds only the postings after it.
+    Closing a period writes checkpoints at its end, so an archived stretch is only read when
+    ``as_of`` falls inside it. Raises ``ValueError`` if that stretch was archived to a file.
+    """
+    as_of = as_utc(as_of)
+    with db_session() as s:
+        acc = s.get(Account, account_id)
+        if acc is None:
+            return None
+        cp = s.scalar(
+            select(BalanceCheckpoint)
+            .where(BalanceCheckpoint.account_id == account_id, BalanceCheckpoint.as_of <= as_of)
+            .order_by(BalanceCheckpoint.as_of.desc())
+            .limit(1)
+        )
+        debits, credits, count = (
+            (cp.debits, cp.credits, cp.posting_count) if cp else (ZERO, ZERO, 0)
+        )
+        start = as_utc(cp.as_of) if cp else None
+        # Accounts without postings at a close get no checkpoint there; start them from the
+        # last archived period's opening balance (zero when they have no row) instead of
+        # scanning archived postings.
+        period = s.scalar(
+            select(LedgerPeriod)
+            .where(LedgerPeriod.archive.is_not(None), LedgerPeriod.end <= as_of)
+            .order_by(LedgerPeriod.end.desc())
+            .limit(1)
+        )
+        if period is not None and (start is None or start < as_utc(period.end)):
+            opening = s.get(PeriodOpeningBalance, (period.id, account_id))
+            debits, credits, count = (
+                (opening.debits, opening.credits, opening.posting_count)
+                if opening
+                else (ZERO, ZERO, 0)
+            )
+            start = as_utc(period.end)
+        # Checkpoints are exclusive of their boundary, the as-of instant is inclusive.
+        end = as_of + timedelta(microseconds=1)
+        source = posting_source(s, start, end)
+        for _, direction, total, n in _period_totals(
+            s, start, end, account_id=account_id, source=source
+        ):
+            if direction == "DEBIT":
+                debits += Decimal(total)
+            else:
+                credits += Decimal(total)
+            count += n
+        return AccountBalanceOut(
+            account_id=acc.id,
+            account_name=acc.name,
+            asset=acc.asset,
+            type=acc.type,
+            debits=debits,
+            credits=credits,
+            balance=debits - credits,
+            posting_count=count,
+            as_of=as_of.isoformat(),
+        )
@@ -0,0 +1,214 @@
+"""Compact columnar read model for scans done in Python (reconciliation, reports).
+
+Rows are kept as parallel ``array`` columns (8 bytes per integer or float) instead of one
+tuple, ``Decimal`` and ``datetime`` per row. Account names are interned once in an
+``AccountTable``, so each posting only stores a 4-byte account code. Columns are filled
+chunk by chunk from Core ``select`` tuples streamed with ``yield_per``, so a load never
+holds more than one chunk of row objects. ``numpy()`` views the same buffers as NumPy
+arrays without copying (optional ``numpy`` dependency, ``pip install -e ".[fast]"``).
+
+Posting amounts are signed integers at the posting scale (micro-units, 10**-6; debits
+positive, credits negative), so totals stay exact. Movement amounts for matching use the
+same scale, through ``matching.to_minor``.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import Result, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Account, Transaction
+from app.services.checkpoints import as_utc, posting_source
+from app.services.matching import to_minor
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_US = timedelta(microseconds=1)
+
+
+def to_micro(amount: Decimal) -> int:
+    """Exact integer micro-units of an amount with at most six decimals."""
+    return int(Decimal(amount).scaleb(6))
+
+
+def from_micro(value: int) -> Decimal:
+    return Decimal(value).scaleb(-6)
+
+
+def _epoch_us(dt: datetime) -> int:
+    return (as_utc(dt) - _EPOCH) // _US
+
+
+@dataclass
+class AccountTable:
+    """Accounts interned to dense codes ``0..n-1``; posting columns store the code."""
+
+    ids: array = field(default_factory=lambda: array("q"))
+    names: list[str] = field(default_factory=list)
+    assets: list[str] = field(default_factory=list)
+    types: list[str] = field(default_factory=list)
+    _codes: dict[int, int] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def load(cls, s: Session) -> AccountTable:
+        table = cls()
+        for acc_id, name, asset, acc_type in s.execute(
+            select(Account.id, Account.name, Account.asset, Account.type).order_by(Account.id)
+        ):
+            table._codes[acc_id] = len(table.ids)
+            table.ids.append(acc_id)
+            table.names.append(name)
+            table.assets.append(sys.intern(asset))
+            table.types.append(sys.intern(acc_type))
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def code(self, account_id: int) -> int:
+        return self._codes[account_id]
+
+
+@dataclass
+class PostingColumns:
+    """One entry per posting, in (transaction id, posting id) order."""
+
+    accounts: AccountTable
+    transaction_id: array = field(default_factory=lambda: array("q"))
+    account: array = field(default_factory=lambda: array("i"))  # AccountTable code
+    amount: array = field(default_factory=lambda: array("q"))  # signed micro-units
+    created_at: array = field(default_factory=lambda: array("q"))  # POSIX microseconds
+
+    def __len__(self) -> int:
+        return len(self.transaction_id)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the posting columns (the account table is shared and small)."""
+        cols = (self.transaction_id, self.account, self.amount, self.created_at)
+        return sum(c.itemsize * len(c) for c in cols)
+
+    def extend(self, rows: Sequence[Sequence]) -> None:
+        """Append (transaction_id, account_id, direction, amount, created_at) rows."""
+        code = self.accounts.code
+        self.transaction_id.extend(r[0] for r in rows)
+        self.account.extend(code(r[1]) for r in rows)
+        self.amount.extend(to_micro(r[3]) if r[2] == "DEBIT" else -to_micro(r[3]) for r in rows)
+        self.created_at.extend(_epoch_us(r[4]) for r in rows)
+
+    def numpy(self) -> dict:
+        import numpy as np
+
+        return {
+            "transaction_id": np.frombuffer(self.transaction_id, dtype=np.int64),
+            "account": np.frombuffer(self.account, dtype=np.int32),
+            "amount": np.frombuffer(self.amount, dtype=np.int64),
+            "created_at": np.frombuffer(self.created_at, dtype=np.int64),
+        }
+
+
+def load_postings(
+    s: Session,
+    asset: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    chunk_size: int | None = None,
+) -> PostingColumns:
+    """Postings of transactions created in ``[created_from, created_to)``, as columns.
+
+    Reads archived postings too when the range reaches table-archived periods (see
+    ``checkpoints.posting_source``).
+    """
+    chunk_size = chunk_size or settings.export_batch_size
+    cols = PostingColumns(AccountTable.load(s))
+    p = posting_source(s, created_from, created_to).c
+    stmt = (
+        select(p.transaction_id, p.account_id, p.direction, p.amount, Transaction.created_at)
+        .join(Transaction, Transaction.id == p.transaction_id)
+        .order_by(p.transaction_id, p.id)
+    )
+    if asset is not None:
+        stmt = stmt.where(Transaction.asset == asset)
+    if created_from is not None:
+        stmt = stmt.where(Transaction.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Transaction.created_at < created_to)
+    for chunk in s.execute(stmt.execution_options(yield_per=chunk_size)).partitions():
+        cols.extend(chunk)
+    return cols
+
+
+def account_totals(cols: PostingColumns) -> dict[int, tuple[int, int, int]]:
+    """Account id -> (debits, credits, posting count), amounts in micro-units."""
+    ids = cols.accounts.ids
+    try:
+        import numpy as np
+    except ImportError:
+        totals: dict[int, list[int]] = {}
+        for code, amount in zip(cols.account, cols.amount, strict=True):
+            t = totals.setdefault(code, [0, 0, 0])
+            t[0 if amount > 0 else 1] += abs(amount)
+            t[2] += 1
+        return {ids[code]: (d, c, n) for code, (d, c, n) in totals.items()}
+
+    arr = cols.numpy()
+    codes, amounts = arr["account"], arr["amount"]
+    size = len(cols.accounts)
+    debit = amounts > 0
+    debits = np.zeros(size, dtype=np.int64)
+    credits = np.zeros(size, dtype=np.int64)
+    np.add.at(debits, codes[debit], amounts[debit])
+    np.add.at(credits, codes[~debit], -amounts[~debit])
+    counts = np.bincount(codes, minlength=size)
+    return {
+        ids[code]: (int(debits[code]), int(credits[code]), int(counts[code]))
+        for code in np.flatnonzero(counts)
+    }
+
+
+@dataclass
+class MovementColumns:
+    """Matching input: reference, amount in micro-units and POSIX timestamp per movement."""
+
+    references: list[str] = field(default_factory=list)
+    amount_minor: array = field(default_factory=lambda: array("q"))
+    ts: array = field(default_factory=lambda: array("d"))
+
+    def __len__(self) -> int:
+        return len(self.amount_minor)
+
+    def extend(self, rows: Sequence[Sequence]) -> None:
+        """Append (reference, amount, booked_at) rows."""
+        self.references.extend(r[0] for r in rows)
+        self.amount_minor.extend(to_minor(Decimal(r[1])) for r in rows)
+        self.ts.extend(as_utc(r[2]).timestamp() for r in rows)
+
+    def rows(self) -> Iterator[tuple[str, int, float]]:
+        return zip(self.references, self.amount_minor, self.ts, strict=True)
+
+    def numpy(self) -> tuple:
+        """The three columns ``matching_np.match_arrays`` takes for one side; references
+        stay a list."""
+        import numpy as np
+
+        return (
+            self.references,
+            np.frombuffer(self.amount_minor, dtype=np.int64),
+            np.frombuffer(self.ts, dtype=np.float64),
+        )
+
+
+def load_movements(result: Result) -> MovementColumns:
+    """Fill ``MovementColumns`` from a (reference, amount, booked_at) result, one
+    ``yield_per`` partition at a time."""
+    cols = MovementColumns()
+    for chunk in result.partitions():
+        cols.extend(chunk)
+    return cols
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import threading
+from collections.abc import AsyncIterator, Iterator
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.services.connectors.mock_bank import BankMovement
+
+LOG = get_logger("http_bank")
+
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+_DONE = object()
+
+
+class _RetryableStatus(Exception):
+    pass
+
+
+def _parse(line: str) -> BankMovement:
+    row = json.loads(line)
+    return BankMovement(
+        reference=row["reference"],
+        booked_at=datetime.fromisoformat(row["booked_at"]),
+        amount=Decimal(row["amount"]),
+        currency=row["currency"],
+    )
+
+
+class HttpBankConnector:
+    """Bank feed client on a pooled, keep-alive ``httpx.AsyncClient``.
+
+    Pages are NDJSON (one movement per line) and parsed line by line as they stream in.
+    Page 1 reports the page count in ``X-Total-Pages``; the remaining pages are fetched by
+    ``concurrency`` workers sharing the connection pool, and movements are yielded page by
+    page as each one completes (not in page order).
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        *,
+        page_size: int | None = None,
+        concurrency: int | None = None,
+        max_retries: int | None = None,
+        backoff_seconds: float | None = None,
+        timeout_seconds: float | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.page_size = page_size or settings.bank_page_size
+        self.concurrency = concurrency or settings.bank_fetch_concurrency
+        self.max_retries = settings.bank_max_retries if max_retries is None else max_retries
+        self.backoff_seconds = (
+            settings.bank_retry_backoff_seconds if backoff_seconds is None else backoff_seconds
+        )
+        self._client = httpx.AsyncClient(
+            base_url=base_url or settings.mock_bank_base_url,
+            timeout=timeout_seconds or settings.bank_timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=self.concurrency, max_keepalive_connections=self.concurrency
+            ),
+            transport=transport,
+        )
+
+    async def __aenter__(self) -> HttpBankConnector:
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _fetch_page(
+        self, currency: str, page: int, params: dict
+    ) -> tuple[list[BankMovement], int]:
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._client.stream(
+                    "GET",
+                    f"/v1/accounts/{currency}/movements",
+                    params={**params, "page": page, "page_size": self.page_size},
+                ) as resp:
+                    if resp.status_code in _RETRYABLE_STATUS and attempt < self.max_retries:
+                        raise _RetryableStatus(f"HTTP {resp.status_code}")
+                    resp.raise_for_status()
+                    total_pages = int(resp.headers.get("X-Total-Pages", "1"))
+                    rows = [_parse(line) async for line in resp.aiter_lines() if line]
+                    return rows, total_pages
+            except (httpx.TransportError, _RetryableStatus) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self.backoff_seconds * 2**attempt * (1 + random.random())
+                LOG.warning(f"bank page {page} failed ({e}); retry {attempt + 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def iter_movements(
+        self, currency: str, since: datetime | None = None, account: str | None = None
+    ) -> AsyncIterator[BankMovement]:
+        """Yield movements booked after ``since`` (all of them when ``None``)."""
+        params: dict = {}
+        if since is not None:
+            params["since"] = since.isoformat()
+        if account is not None:
+            params["account"] = account
+
+        rows, total_pages = await self._fetch_page(currency, 1, params)
+        for row in rows:
+            yield row
+        if total_pages <= 1:
+            return
+
+        pages = iter(range(2, total_pages + 1))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        async def worker() -> None:
+            try:
+                for page in pages:  # shared iterator: each page is taken by one worker
+                    page_rows, _ = await self._fetch_page(currency, page, params)
+                    await queue.put(page_rows)
+            except Exception as e:
+                await queue.put(e)
+            finally:
+                await queue.put(_DONE)
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(min(self.concurrency, total_pages - 1))
+        ]
+        try:
+            running = len(workers)
+            while running:
+                item = await queue.get()
+                if item is _DONE:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    for row in item:
+                        yield row
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+_shared_lock = threading.Lock()
+_shared: tuple[asyncio.AbstractEventLoop, HttpBankConnector] | None = None
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
+
+
+def _shared_connector() -> tuple[asyncio.AbstractEventLoop, HttpBankConnector]:
+    """The process-wide connector and the background event loop that drives it.
+
+    Both are created on first use and kept until ``close_shared_connector``, so keep-alive
+    connections are reused from one sync to the next.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=_run_loop, args=(loop,), name="http-bank", daemon=True).start()
+            _shared = loop, asyncio.run_coroutine_threadsafe(_new_connector(), loop).result()
+        return _shared
+
+
+def close_shared_connector() -> None:
+    """Close the shared connector's connections and stop its loop (app shutdown)."""
+    global _shared
+    with _shared_lock:
+        shared, _shared = _shared, None
+    if shared is not None:
+        loop, connector = shared
+        asyncio.run_coroutine_threadsafe(connector.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def fetch_bank_feed(
+    currency: str,
+    days: int = 14,
+    account: str | None = None,
+    since: datetime | None = None,
+    connector: HttpBankConnector | None = None,
+) -> Iterator[BankMovement]:
+    """Synchronous view over ``HttpBankConnector.iter_movements`` for worker threads/processes.
+
+    Each item is awaited on the shared connector's background loop, so movements still stream
+    page by page and concurrent syncs share one connection pool. A ``connector`` passed in is
+    driven on the same loop and left open for the caller to close. ``days`` bounds the window
+    when no explicit ``since`` is given.
+    """
+    if since is None:
+        since = datetime.now(UTC) - timedelta(days=days)
+    loop, shared = _shared_connector()
+    agen = (connector or shared).iter_movements(currency, since=since, account=account)
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+            except StopAsyncIteration:
+                break
+    finally:
+        asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
+
+
+async def _new_connector() -> HttpBankConnector:
+    # Created inside the loop that will drive it.
+    return HttpBankConnector()
@@ -14,14 +14,15 @@ class BankMovement:
     currency: str
 
 
-def get_bank_feed(currency: str, days: int = 14) -> list[BankMovement]:
+def get_bank_feed(currency: str, days: int = 14, account: str | None = None) -> list[BankMovement]:
     """Mock bank feed generator.
 
     In a real system this would call an external provider (bank APIs, aggregators, etc.).
-    We generate deterministic-ish data for demos.
+    We generate deterministic-ish data for demos. ``account`` selects the feed of a single
+    bank account instead of the whole currency.
     """
     now = datetime.now(UTC)
-    random.seed(currency + str(days))
+    random.seed(currency + str(days) + (f":{account}" if account else ""))
     out: list[BankMovement] = []
     for i in range(15):
         amt = Decimal(str(random.choice([25, 50, 75, 100, 150, 200]))) * Decimal("1.00")
@@ -0,0 +1,101 @@
+"""Local stand-in for the bank API that ``HttpBankConnector`` talks to.
+
+Serves ``GET /v1/accounts/{currency}/movements`` as paginated NDJSON generated on the fly,
+so feeds of any size cost no memory and are identical across requests. Movement ``i`` is
+booked ``i`` seconds after the feed's anchor, which makes ``since`` a constant-time offset.
+
+    python -m app.services.connectors.standin_bank --rows 1000000 --port 9000
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+_AMOUNTS = [25, 50, 75, 100, 150, 200]
+_CHUNK_ROWS = 256  # lines per body chunk
+
+
+def movement(currency: str, account: str | None, i: int, anchor: datetime) -> dict:
+    """The ``i``-th movement of a feed; deterministic in (currency, account, i, anchor)."""
+    digest = hashlib.blake2b(f"{currency}:{account}:{i}".encode(), digest_size=2).digest()
+    amount = Decimal(_AMOUNTS[digest[0] % len(_AMOUNTS)])
+    if digest[1] < 90:  # ~35% outgoing
+        amount = -amount
+    return {
+        "reference": f"BANK-{i:09d}",
+        "booked_at": (anchor + timedelta(seconds=i)).isoformat(),
+        "amount": f"{amount:.2f}",
+        "currency": currency,
+    }
+
+
+def create_app(rows: int = 10_000, fail_every: int = 0, anchor: datetime | None = None) -> FastAPI:
+    """Stand-in bank with ``rows`` movements per feed.
+
+    By default the feed ends at startup, one movement per second. ``fail_every=n`` answers
+    every n-th request with a 503 to exercise client retries.
+    """
+    if anchor is None:
+        anchor = datetime.now(UTC).replace(microsecond=0) - timedelta(seconds=rows)
+    app = FastAPI(title="stand-in bank")
+    calls = {"n": 0}
+
+    @app.get("/v1/accounts/{currency}/movements")
+    def movements(
+        currency: str,
+        page: int = Query(1, ge=1),
+        page_size: int = Query(1000, ge=1, le=50_000),
+        since: datetime | None = None,
+        account: str | None = None,
+    ):
+        calls["n"] += 1
+        if fail_every and calls["n"] % fail_every == 0:
+            raise HTTPException(status_code=503, detail="try again")
+
+        first = 0
+        if since is not None:
+            since = since.replace(tzinfo=UTC) if since.tzinfo is None else since
+            first = max(0, math.floor((since - anchor).total_seconds()) + 1)
+        available = max(0, rows - first)
+        total_pages = max(1, -(-available // page_size))
+        start = first + (page - 1) * page_size
+        stop = min(rows, start + page_size)
+
+        def body():
+            for chunk in range(start, stop, _CHUNK_ROWS):
+                yield "".join(
+                    json.dumps(movement(currency, account, i, anchor)) + "\n"
+                    for i in range(chunk, min(stop, chunk + _CHUNK_ROWS))
+                )
+
+        return StreamingResponse(
+            body(),
+            media_type="application/x-ndjson",
+            headers={"X-Total-Pages": str(total_pages), "X-Total-Count": str(available)},
+        )
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve a synthetic paginated bank feed.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--fail-every", type=int, default=0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.rows, args.fail_every), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
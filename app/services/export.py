@@ -0,0 +1,223 @@
+"""Streaming posting export for warehouse loads.
+
+Rows come straight from a server-side cursor (``yield_per``) as plain tuples and are encoded
+chunk by chunk, so memory stays flat regardless of how many postings are exported. Parquet
+output needs the optional ``pyarrow`` dependency (``pip install -e ".[export]"``).
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import Iterator
+from datetime import datetime
+from itertools import islice
+
+from sqlalchemy import FromClause, Select, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import db_session
+from app.models import Account, Posting, Transaction
+from app.services.checkpoints import as_utc, posting_source
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+COLUMNS = (
+    "posting_id",
+    "transaction_id",
+    "reference",
+    "description",
+    "asset",
+    "created_at",
+    "account_id",
+    "account_name",
+    "direction",
+    "amount",
+)
+
+
+def postings_stmt(
+    source: FromClause | None = None,
+    asset: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> Select:
+    """Posting rows (see ``COLUMNS``) in posting id order, read from ``source``.
+
+    ``source`` is anything with the ``postings`` columns (default: the ``postings`` table).
+    ``created_from`` is inclusive, ``created_to`` exclusive (transaction ``created_at``).
+    """
+    p = (Posting.__table__ if source is None else source).c
+    stmt = (
+        select(
+            p.id,
+            p.transaction_id,
+            Transaction.reference,
+            Transaction.description,
+            Transaction.asset,
+            Transaction.created_at,
+            p.account_id,
+            Account.name,
+            p.direction,
+            p.amount,
+        )
+        .join(Transaction, Transaction.id == p.transaction_id)
+        .join(Account, Account.id == p.account_id)
+        .order_by(p.id)
+    )
+    if asset is not None:
+        stmt = stmt.where(Transaction.asset == asset)
+    if created_from is not None:
+        stmt = stmt.where(Transaction.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Transaction.created_at < created_to)
+    return stmt
+
+
+def stream_rows(s: Session, stmt: Select, batch_size: int | None = None) -> Iterator[list[tuple]]:
+    """Run ``stmt`` with a server-side cursor and yield its rows in batches of tuples."""
+    batch_size = batch_size or settings.export_batch_size
+    rows = iter(s.execute(stmt.execution_options(yield_per=batch_size)))
+    while batch := list(islice(rows, batch_size)):
+        yield [tuple(r) for r in batch]
+
+
+def iter_postings(
+    asset: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    batch_size: int | None = None,
+) -> Iterator[list[tuple]]:
+    """Yield batches of posting rows (see ``COLUMNS``) in posting id order.
+
+    ``created_from`` is inclusive, ``created_to`` exclusive (transaction ``created_at``).
+    Postings of periods archived to the ``archived_postings`` table are included.
+    """
+    with db_session() as s:
+        source = posting_source(s, created_from, created_to)
+        stmt = postings_stmt(source, asset, created_from, created_to)
+        yield from stream_rows(s, stmt, batch_size)
+
+
+def _ndjson(batches: Iterator[list[tuple]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(
+            json.dumps(
+                {
+                    "posting_id": r[0],
+                    "transaction_id": r[1],
+                    "reference": r[2],
+                    "description": r[3],
+                    "asset": r[4],
+                    "created_at": as_utc(r[5]).isoformat(),
+                    "account_id": r[6],
+                    "account_name": r[7],
+                    "direction": r[8],
+                    "amount": str(r[9]),
+                }
+            )
+            + "\n"
+            for r in batch
+        ).encode()
+
+
+def _csv(batches: Iterator[list[tuple]]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(COLUMNS)
+    for batch in batches:
+        writer.writerows((*r[:5], as_utc(r[5]).isoformat(), *r[6:]) for r in batch)
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode()
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink handing back whatever pyarrow has written since the last ``take``."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def take(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def _parquet(batches: Iterator[list[tuple]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            ("posting_id", pa.int64()),
+            ("transaction_id", pa.int64()),
+            ("reference", pa.string()),
+            ("description", pa.string()),
+            ("asset", pa.string()),
+            ("created_at", pa.timestamp("us", tz="UTC")),
+            ("account_id", pa.int64()),
+            ("account_name", pa.string()),
+            ("direction", pa.string()),
+            ("amount", pa.decimal128(18, 6)),
+        ]
+    )
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        # One row group per batch; its bytes are streamed out as soon as it is written.
+        for batch in batches:
+            cols = list(zip(*batch, strict=True))
+            cols[5] = [as_utc(v) for v in cols[5]]
+            writer.write_table(
+                pa.Table.from_pydict(dict(zip(schema.names, cols, strict=True)), schema)
+            )
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def encode(fmt: str, batches: Iterator[list[tuple]]) -> Iterator[bytes]:
+    """Encode posting row batches; raises ``ValueError`` for an unknown or unavailable format."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ValueError('Parquet export needs pyarrow: pip install -e ".[export]"') from e
+    return {"ndjson": _ndjson, "csv": _csv, "parquet": _parquet}[fmt](batches)
+
+
+def export_postings(
+    fmt: str,
+    asset: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> Iterator[bytes]:
+    """Encoded export stream; raises ``ValueError`` for an unknown or unavailable format, or
+    a range reaching into a period archived to a file."""
+    with db_session() as s:
+        posting_source(s, created_from, created_to)  # fail before the stream starts
+    batches = iter_postings(asset=asset, created_from=created_from, created_to=created_to)
+    return encode(fmt, batches)
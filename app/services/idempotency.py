@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Protocol
+
+from prometheus_client import Counter
+
+from app.core.config import settings
+from app.schemas import TransactionIn
+
+REPLAY_LOOKUPS = Counter(
+    "idempotency_cache_lookups_total", "Idempotency replay cache lookups", ["result"]
+)
+
+
+class IdempotencyConflict(ValueError):
+    """An idempotency key was reused with a different payload."""
+
+
+def payload_hash(payload: TransactionIn) -> str:
+    """SHA-256 over the fields that define a journal entry, with amounts normalized.
+
+    Fields added by subclasses (idempotency key, import timestamps) do not take part, so the
+    same entry hashes alike whether it arrives alone, in a batch or through an import.
+    """
+    canonical = [
+        payload.reference,
+        payload.description,
+        payload.asset,
+        [[p.account_name, p.direction, str(p.amount.normalize())] for p in payload.postings],
+    ]
+    return hashlib.sha256(json.dumps(canonical, separators=(",", ":")).encode()).hexdigest()
+
+
+def check_replay(key: str, stored_hash: str | None, request_hash: str) -> None:
+    # Rows written before payload hashes were recorded cannot be checked.
+    if stored_hash is not None and stored_hash != request_hash:
+        raise IdempotencyConflict(f"Idempotency key {key!r} was already used with another payload")
+
+
+@dataclass(frozen=True)
+class CachedReplay:
+    payload_hash: str
+    response_json: str  # serialized TransactionOut
+
+
+class IdempotencyStore(Protocol):
+    def get(self, key: str) -> CachedReplay | None: ...
+
+    def put(self, key: str, entry: CachedReplay) -> None: ...
+
+
+class InMemoryIdempotencyStore:
+    """Process-local LRU with a per-entry TTL."""
+
+    def __init__(self, maxsize: int, ttl_seconds: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self._data: OrderedDict[str, tuple[float, CachedReplay]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedReplay | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: CachedReplay) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, entry)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisIdempotencyStore:
+    """Shared store for several API processes; needs the optional ``redis`` package."""
+
+    def __init__(self, url: str, ttl_seconds: float) -> None:
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = int(ttl_seconds)
+
+    def get(self, key: str) -> CachedReplay | None:
+        raw = self._redis.get(f"fp:idem:{key}")
+        if raw is None:
+            return None
+        digest, _, body = raw.decode().partition("\n")
+        return CachedReplay(digest, body)
+
+    def put(self, key: str, entry: CachedReplay) -> None:
+        self._redis.set(
+            f"fp:idem:{key}", f"{entry.payload_hash}\n{entry.response_json}", ex=self.ttl
+        )
+
+
+def make_store(spec: str | None = None) -> IdempotencyStore:
+    """``memory`` (default) or a ``redis://`` URL."""
+    spec = spec or settings.idempotency_store
+    if spec == "memory":
+        return InMemoryIdempotencyStore(
+            settings.idempotency_cache_size, settings.idempotency_cache_ttl_seconds
+        )
+    if spec.startswith(("redis://", "rediss://")):
+        return RedisIdempotencyStore(spec, settings.idempotency_cache_ttl_seconds)
+    raise ValueError(f"Unknown idempotency store: {spec}")
+
+
+REPLAY_CACHE: IdempotencyStore = make_store()
+
+
+def cached_replay(key: str, request_hash: str) -> str | None:
+    """Serialized response for a cached key; raises ``IdempotencyConflict`` on a mismatch."""
+    entry = REPLAY_CACHE.get(key)
+    if entry is None:
+        REPLAY_LOOKUPS.labels(result="miss").inc()
+        return None
+    try:
+        check_replay(key, entry.payload_hash, request_hash)
+    except IdempotencyConflict:
+        REPLAY_LOOKUPS.labels(result="conflict").inc()
+        raise
+    REPLAY_LOOKUPS.labels(result="hit").inc()
+    return entry.response_json
+
+
+def remember(key: str, request_hash: str, response_json: str) -> None:
+    REPLAY_CACHE.put(key, CachedReplay(request_hash, response_json))
@@ -0,0 +1,401 @@
+"""Bulk import of historical journal entries from CSV or NDJSON files.
+
+NDJSON: one transaction per line, shaped like ``ImportTransactionIn``.
+CSV: one posting per row with columns ``idempotency_key, reference, description, asset,
+created_at, account_name, direction, amount``; consecutive rows sharing an idempotency key
+form one transaction.
+
+Entries are validated like the API does (balanced, known accounts, matching asset) and
+existing idempotency keys are replayed, or rejected when the stored entry differs. Each chunk is written in one database transaction:
+``COPY`` on Postgres, ``executemany`` elsewhere. Running balances are updated in the same
+transaction and checkpoints after the earliest imported ``created_at`` are dropped so
+``fp-ledger checkpoints build`` recomputes them. Entries dated inside a closed period are
+rejected. After every committed chunk the number of input lines consumed is saved next to
+the file, so an interrupted import resumes there.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import multiprocessing
+import os
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from itertools import groupby
+
+from pydantic import ValidationError
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import db_session
+from app.models import BalanceCheckpoint, EventOutbox, Posting, Transaction, utcnow
+from app.schemas import ImportTransactionIn
+from app.services.account_cache import AccountRef, resolve_accounts
+from app.services.balances import apply_posting_deltas
+from app.services.checkpoints import as_utc, closed_through
+from app.services.idempotency import IdempotencyConflict, check_replay, payload_hash
+from app.services.ledger import _check_balanced, _outbox_payload, _resolve_legs
+
+LOG = get_logger("importer")
+
+CSV_COLUMNS = (
+    "idempotency_key",
+    "reference",
+    "description",
+    "asset",
+    "created_at",
+    "account_name",
+    "direction",
+    "amount",
+)
+_MAX_ERRORS = 20  # rejection messages kept per file
+
+
+@dataclass
+class ChunkReport:
+    file: str
+    chunk: int
+    lines: int  # input lines consumed so far
+    created: int
+    replayed: int
+    rejected: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return (self.created + self.replayed + self.rejected) / self.seconds if self.seconds else 0
+
+
+@dataclass
+class ImportReport:
+    file: str
+    created: int = 0
+    replayed: int = 0
+    rejected: int = 0
+    resumed_from_line: int = 0
+    seconds: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+
+# (input lines consumed once this record is read, raw entry: a dict or an NDJSON line)
+Record = tuple[int, dict | str]
+
+
+def _ndjson_records(f: io.TextIOBase, skip: int) -> Iterator[Record]:
+    # Lines are parsed during validation, so malformed JSON rejects just that line.
+    for n, line in enumerate(f, start=1):
+        if n <= skip or not line.strip():
+            continue
+        yield n, line
+
+
+def _csv_records(f: io.TextIOBase, skip: int) -> Iterator[Record]:
+    reader = csv.DictReader(f)
+    missing = set(CSV_COLUMNS) - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"CSV is missing columns: {sorted(missing)}")
+    numbered = ((n, row) for n, row in enumerate(reader, start=1) if n > skip)
+    for key, group in groupby(numbered, key=lambda nr: nr[1]["idempotency_key"]):
+        rows = list(group)
+        head = rows[0][1]
+        yield (
+            rows[-1][0],
+            {
+                "idempotency_key": key,
+                "reference": head["reference"],
+                "description": head["description"] or None,
+                "asset": head["asset"],
+                "created_at": head["created_at"] or None,
+                "postings": [
+                    {
+                        "account_name": r["account_name"],
+                        "direction": r["direction"],
+                        "amount": r["amount"],
+                    }
+                    for _, r in rows
+                ],
+            },
+        )
+
+
+def _progress_path(path: str) -> str:
+    return path + ".import-progress"
+
+
+def _load_progress(path: str) -> int:
+    try:
+        with open(_progress_path(path), encoding="utf-8") as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return 0
+    # A changed input file invalidates the saved position.
+    if state.get("size") != os.path.getsize(path):
+        return 0
+    return int(state["lines"])
+
+
+def _save_progress(path: str, lines: int) -> None:
+    tmp = _progress_path(path) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"lines": lines, "size": os.path.getsize(path)}, f)
+    os.replace(tmp, _progress_path(path))
+
+
+def _bulk_insert(s: Session, model, rows: list[dict]) -> None:
+    if not rows:
+        return
+    conn = s.connection()
+    if conn.dialect.name != "postgresql":
+        s.execute(insert(model), rows)  # executemany
+        return
+    columns = list(rows[0])
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for r in rows:
+        writer.writerow(
+            [v.isoformat() if isinstance(v, datetime) else v for v in (r[c] for c in columns)]
+        )
+    buf.seek(0)
+    with conn.connection.dbapi_connection.cursor() as cur:
+        cur.copy_expert(
+            f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf
+        )
+
+
+def _write_chunk(
+    s: Session,
+    entries: list[tuple[ImportTransactionIn, list[tuple[AccountRef, str, Decimal]]]],
+    emit_events: bool,
+) -> int:
+    if not entries:
+        return 0
+    now = utcnow()
+    created_at = [as_utc(e.created_at) if e.created_at else now for e, _ in entries]
+    _bulk_insert(
+        s,
+        Transaction,
+        [
+            {
+                "reference": e.reference,
+                "description": e.description,
+                "asset": e.asset,
+                "idempotency_key": e.idempotency_key,
+                "payload_hash": payload_hash(e),
+                "created_at": ts,
+            }
+            for (e, _), ts in zip(entries, created_at, strict=True)
+        ],
+    )
+    keys = [e.idempotency_key for e, _ in entries]
+    ids = {
+        key: tx_id
+        for key, tx_id in s.execute(
+            select(Transaction.idempotency_key, Transaction.id).where(
+                Transaction.idempotency_key.in_(keys)
+            )
+        )
+    }
+    _bulk_insert(
+        s,
+        Posting,
+        [
+            {
+                "transaction_id": ids[e.idempotency_key],
+                "account_id": acct.id,
+                "direction": direction,
+                "amount": amount,
+            }
+            for e, legs in entries
+            for acct, direction, amount in legs
+        ],
+    )
+    apply_posting_deltas(
+        s, ((acct.id, d, amount) for _, legs in entries for acct, d, amount in legs)
+    )
+    if emit_events:
+        _bulk_insert(
+            s,
+            EventOutbox,
+            [
+                {
+                    "event_type": "transaction.created",
+                    "payload_json": _outbox_payload(ids[e.idempotency_key], e.reference, e.asset),
+                    "created_at": now,
+                }
+                for e, _ in entries
+            ],
+        )
+    s.execute(delete(BalanceCheckpoint).where(BalanceCheckpoint.as_of > min(created_at)))
+    return len(entries)
+
+
+def _import_chunk(
+    records: list[Record], report: ImportReport, emit_events: bool
+) -> tuple[int, int, int]:
+    """Validate and write one chunk; returns (created, replayed, rejected)."""
+    rejected = 0
+    replayed = 0
+
+    def reject(line: int, err: Exception) -> None:
+        nonlocal rejected
+        rejected += 1
+        if len(report.errors) < _MAX_ERRORS:
+            report.errors.append(f"line {line}: {err}")
+
+    valid: dict[str, tuple[int, ImportTransactionIn, str]] = {}
+    first: dict[str, str] = {}  # key -> payload hash of its first occurrence
+    repeats: list[tuple[int, str]] = []  # (line, key) of later occurrences of the same entry
+    outcome: dict[str, str] = {}  # key -> created/replayed/rejected of its first occurrence
+    for line, raw in records:
+        try:
+            entry = (
+                ImportTransactionIn.model_validate_json(raw)
+                if isinstance(raw, str)
+                else ImportTransactionIn.model_validate(raw)
+            )
+        except (ValidationError, ValueError) as e:
+            reject(line, e)
+            continue
+        key = entry.idempotency_key
+        digest = payload_hash(entry)
+        if key in first:
+            try:
+                check_replay(key, first[key], digest)
+                repeats.append((line, key))
+            except IdempotencyConflict as e:
+                reject(line, e)
+            continue
+        first[key] = digest
+        try:
+            _check_balanced(entry)
+        except ValueError as e:
+            outcome[key] = "rejected"
+            reject(line, e)
+            continue
+        valid[key] = (line, entry, digest)
+
+    with db_session() as s:
+        existing = dict(
+            s.execute(
+                select(Transaction.idempotency_key, Transaction.payload_hash).where(
+                    Transaction.idempotency_key.in_(list(valid))
+                )
+            ).all()
+        )
+        fresh = []
+        for key, (line, e, digest) in valid.items():
+            if key not in existing:
+                fresh.append((line, e))
+                continue
+            # Same check as the API: a reused key must carry the same entry.
+            try:
+                check_replay(key, existing[key], digest)
+                outcome[key] = "replayed"
+                replayed += 1
+            except IdempotencyConflict as err:
+                outcome[key] = "rejected"
+                reject(line, err)
+        accounts = resolve_accounts(s, {p.account_name for _, e in fresh for p in e.postings})
+        closed = closed_through(s)
+        entries = []
+        for line, e in fresh:
+            try:
+                if closed is not None and e.created_at and as_utc(e.created_at) < closed:
+                    raise ValueError(
+                        f"created_at is before {closed.isoformat()}, in a closed period"
+                    )
+                entries.append((e, _resolve_legs(e, accounts)))
+                outcome[e.idempotency_key] = "created"
+            except ValueError as err:
+                outcome[e.idempotency_key] = "rejected"
+                reject(line, err)
+        created = _write_chunk(s, entries, emit_events)
+
+    # A repeated key shares the outcome of its first occurrence, like the batch API.
+    for line, key in repeats:
+        if outcome[key] == "rejected":
+            reject(line, ValueError(f"the first entry with key {key!r} was rejected"))
+        else:
+            replayed += 1
+    return created, replayed, rejected
+
+
+def import_file(
+    path: str,
+    fmt: str | None = None,
+    chunk_size: int | None = None,
+    emit_events: bool = True,
+    resume: bool = True,
+    on_chunk: Callable[[ChunkReport], None] | None = None,
+) -> ImportReport:
+    """Import one file; ``fmt`` defaults to the file extension (``.csv`` or ``.ndjson``)."""
+    fmt = fmt or ("csv" if path.endswith(".csv") else "ndjson")
+    if fmt not in ("csv", "ndjson"):
+        raise ValueError(f"Unsupported import format: {fmt}")
+    chunk_size = chunk_size or settings.import_chunk_size
+    skip = _load_progress(path) if resume else 0
+    report = ImportReport(file=path, resumed_from_line=skip)
+    start = time.perf_counter()
+
+    with open(path, encoding="utf-8", newline="") as f:
+        records = _csv_records(f, skip) if fmt == "csv" else _ndjson_records(f, skip)
+        chunk_no = 0
+        while True:
+            chunk: list[Record] = []
+            for rec in records:
+                chunk.append(rec)
+                if len(chunk) >= chunk_size:
+                    break
+            if not chunk:
+                break
+            chunk_no += 1
+            t0 = time.perf_counter()
+            created, replayed, rejected = _import_chunk(chunk, report, emit_events)
+            lines = chunk[-1][0]
+            _save_progress(path, lines)
+            report.created += created
+            report.replayed += replayed
+            report.rejected += rejected
+            if on_chunk:
+                on_chunk(
+                    ChunkReport(
+                        path, chunk_no, lines, created, replayed, rejected, time.perf_counter() - t0
+                    )
+                )
+
+    report.seconds = time.perf_counter() - start
+    LOG.info(
+        f"import done: file={path} created={report.created} replayed={report.replayed} "
+        f"rejected={report.rejected} seconds={report.seconds:.1f}"
+    )
+    return report
+
+
+def _print_chunk(c: ChunkReport) -> None:
+    out = asdict(c) | {"seconds": round(c.seconds, 3), "rows_per_sec": round(c.rows_per_sec)}
+    print(json.dumps(out), flush=True)
+
+
+def _import_shard(path: str, kwargs: dict) -> ImportReport:
+    return import_file(path, on_chunk=_print_chunk, **kwargs)
+
+
+def import_files(paths: list[str], workers: int = 1, **kwargs) -> list[ImportReport]:
+    """Import several files (shards), up to ``workers`` at a time in separate processes.
+
+    Per-chunk progress is printed as JSON lines by whichever process handles the shard.
+    """
+    if workers <= 1 or len(paths) <= 1:
+        return [import_file(p, on_chunk=_print_chunk, **kwargs) for p in paths]
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        return list(pool.map(_import_shard, paths, [kwargs] * len(paths)))
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import json
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import db_session
+from app.models import ReconciliationRun
+from app.schemas import ReconciliationRunOut, ReconciliationSummary
+from app.services.reconciliation import create_run, run_reconciliation, shutdown_pool
+
+LOG = get_logger("jobs")
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_pending: dict[Future, int] = {}  # future -> run id
+_UNFINISHED = ("QUEUED", "RUNNING")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.reconciliation_max_concurrent_runs,
+            thread_name_prefix="reconciliation",
+        )
+    return _executor
+
+
+def _fail_runs(error: str, *where) -> int:
+    """Mark matching QUEUED/RUNNING runs FAILED with ``error``; returns how many."""
+    with db_session() as s:
+        return s.execute(
+            update(ReconciliationRun)
+            .where(ReconciliationRun.status.in_(_UNFINISHED), *where)
+            .values(
+                status="FAILED",
+                finished_at=datetime.now(UTC),
+                summary_json=json.dumps({"error": error}),
+            )
+        ).rowcount
+
+
+def _execute(run_id: int, mode: str) -> None:
+    try:
+        run_reconciliation(mode=mode, run_id=run_id)
+    except Exception as e:
+        # Failures inside the run are recorded by run_reconciliation; this catches the rest
+        # (e.g. the run row could not be switched to RUNNING) so the run never stays open.
+        LOG.error(f"reconciliation job failed: run_id={run_id} error={e}", exc_info=True)
+        try:
+            _fail_runs(str(e), ReconciliationRun.id == run_id)
+        except Exception:
+            LOG.error(f"could not mark run {run_id} failed", exc_info=True)
+
+
+def enqueue_reconciliation(mode: str = "full") -> ReconciliationRunOut:
+    """Create a QUEUED run and hand it to the background executor.
+
+    At most ``reconciliation_max_concurrent_runs`` execute at once; beyond
+    ``reconciliation_max_pending_runs`` waiting or running jobs, ``JobQueueFull`` is raised.
+    """
+    with _lock:
+        if len(_pending) >= settings.reconciliation_max_pending_runs:
+            raise JobQueueFull(f"Too many pending reconciliation runs ({len(_pending)})")
+        run_id = create_run(mode)
+        fut = _get_executor().submit(_execute, run_id, mode)
+        _pending[fut] = run_id
+    fut.add_done_callback(_forget)
+    LOG.info(f"reconciliation queued: run_id={run_id} mode={mode}")
+    run = get_run(run_id)
+    assert run
+    return run
+
+
+def _forget(fut: Future) -> None:
+    with _lock:
+        _pending.pop(fut, None)
+
+
+def shutdown(wait: bool = False) -> None:
+    """Stop the executor; runs that never started are marked FAILED as cancelled."""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+        queued = dict(_pending)
+    # Outside the lock: cancelling runs the futures' done callbacks, which take it.
+    if executor is not None:
+        executor.shutdown(wait=wait, cancel_futures=True)
+    cancelled = [run_id for fut, run_id in queued.items() if fut.cancelled()]
+    if cancelled:
+        _fail_runs("cancelled at shutdown", ReconciliationRun.id.in_(cancelled))
+        LOG.info(f"reconciliation runs cancelled at shutdown: {cancelled}")
+    shutdown_pool()
+
+
+def fail_stale_runs() -> int:
+    """Mark runs left QUEUED or RUNNING by a process that died as FAILED.
+
+    Only runs started more than ``reconciliation_stale_run_hours`` ago are touched, so runs
+    of other live processes sharing the database are left alone. Called at app startup.
+    """
+    cutoff = datetime.now(UTC) - timedelta(hours=settings.reconciliation_stale_run_hours)
+    n = _fail_runs(
+        "abandoned: the process running it stopped", ReconciliationRun.started_at < cutoff
+    )
+    if n:
+        LOG.warning(f"stale reconciliation runs marked failed: {n}")
+    return n
+
+
+def _as_iso(dt: datetime | None) -> str | None:
+    return dt.astimezone(UTC).isoformat() if dt else None
+
+
+def _run_out(run: ReconciliationRun) -> ReconciliationRunOut:
+    summary = error = None
+    if run.summary_json:
+        data = json.loads(run.summary_json)
+        if run.status == "FAILED":
+            error = data.get("error")
+        else:
+            summary = ReconciliationSummary(**data)
+    return ReconciliationRunOut(
+        id=run.id,
+        status=run.status,
+        mode=run.mode,
+        progress=run.progress,
+        started_at=_as_iso(run.started_at),
+        finished_at=_as_iso(run.finished_at),
+        summary=summary,
+        error=error,
+    )
+
+
+def get_run(run_id: int) -> ReconciliationRunOut | None:
+    with db_session() as s:
+        run = s.get(ReconciliationRun, run_id)
+        return _run_out(run) if run else None
+
+
+def list_runs(limit: int = 20) -> list[ReconciliationRunOut]:
+    limit = max(1, min(limit, 200))
+    with db_session() as s:
+        runs = s.scalars(
+            select(ReconciliationRun).order_by(ReconciliationRun.id.desc()).limit(limit)
+        )
+        return [_run_out(r) for r in runs]
@@ -1,19 +1,39 @@
 from __future__ import annotations
 
+import base64
 import json
 from datetime import UTC, datetime
 from decimal import Decimal
 
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 
 from app.core.logging import get_logger
-from app.db.session import db_session
-from app.models import Account, EventOutbox, Posting, Transaction
-from app.schemas import AccountCreate, AccountOut, PostingOut, TransactionIn, TransactionOut
+from app.core.serialization import dumps
+from app.db.session import db_session, read_session
+from app.models import Account, EventOutbox, Posting, Transaction, utcnow
+from app.schemas import (
+    AccountCreate,
+    AccountOut,
+    BatchItemResult,
+    BatchTransactionIn,
+    PostingOut,
+    TransactionBatchOut,
+    TransactionIn,
+    TransactionOut,
+    TransactionPage,
+)
+from app.services.account_cache import ACCOUNT_CACHE, AccountRef, resolve_accounts
+from app.services.balances import apply_posting_deltas
+from app.services.checkpoints import archived_end
+from app.services.idempotency import cached_replay, check_replay, payload_hash, remember
 
 LOG = get_logger("ledger")
 
+# Matches the scale of Posting.amount, so freshly built responses serialize like replayed ones.
+_AMOUNT_QUANT = Decimal("0.000001")
+
 
 def _as_iso(dt: datetime) -> str:
     return dt.astimezone(UTC).isoformat()
@@ -27,17 +47,18 @@ def create_account(payload: AccountCreate) -> AccountOut:
         acc = Account(name=payload.name, asset=payload.asset, type=payload.type)
         s.add(acc)
         s.flush()
-        return AccountOut(id=acc.id, name=acc.name, asset=acc.asset, type=acc.type)
+        out = AccountOut(id=acc.id, name=acc.name, asset=acc.asset, type=acc.type)
+    ACCOUNT_CACHE.invalidate(payload.name)
+    return out
 
 
 def list_accounts() -> list[AccountOut]:
-    with db_session() as s:
+    with read_session() as s:
         rows = s.scalars(select(Account).order_by(Account.id)).all()
         return [AccountOut(id=a.id, name=a.name, asset=a.asset, type=a.type) for a in rows]
 
 
-def create_transaction(payload: TransactionIn, idempotency_key: str) -> TransactionOut:
-    # Validate balanced double-entry
+def _check_balanced(payload: TransactionIn) -> None:
     total_debits = sum((p.amount for p in payload.postings if p.direction == "DEBIT"), Decimal("0"))
     total_credits = sum(
         (p.amount for p in payload.postings if p.direction == "CREDIT"), Decimal("0")
@@ -45,58 +66,312 @@ def create_transaction(payload: TransactionIn, idempotency_key: str) -> Transact
     if total_debits != total_credits:
         raise ValueError(f"Transaction not balanced: debits={total_debits} credits={total_credits}")
 
+
+def _outbox_payload(tx_id: int, reference: str, asset: str) -> str:
+    return json.dumps({"transaction_id": tx_id, "reference": reference, "asset": asset})
+
+
+def create_transaction(payload: TransactionIn, idempotency_key: str) -> TransactionOut:
+    """Post a journal entry, or replay the stored result for a known idempotency key.
+
+    Recent replays are answered from the replay cache without a database round trip. Reusing
+    a key with a different payload raises ``IdempotencyConflict``.
+    """
+    # Validate balanced double-entry
+    _check_balanced(payload)
+    digest = payload_hash(payload)
+    cached = cached_replay(idempotency_key, digest)
+    if cached is not None:
+        return TransactionOut.model_validate_json(cached)
+
     with db_session() as s:
         existing = s.scalar(
-            select(Transaction).where(Transaction.idempotency_key == idempotency_key)
+            select(Transaction)
+            .options(joinedload(Transaction.postings).joinedload(Posting.account))
+            .where(Transaction.idempotency_key == idempotency_key)
         )
         if existing:
-            existing = s.scalar(
-                select(Transaction)
-                .options(joinedload(Transaction.postings).joinedload(Posting.account))
-                .where(Transaction.id == existing.id)
+            check_replay(idempotency_key, existing.payload_hash, digest)
+            out = _tx_out(existing)
+        else:
+            tx = Transaction(
+                reference=payload.reference,
+                description=payload.description,
+                asset=payload.asset,
+                idempotency_key=idempotency_key,
+                payload_hash=digest,
+                created_at=utcnow(),
             )
-            assert existing
-            return _tx_out(existing)
-
-        tx = Transaction(
-            reference=payload.reference,
-            description=payload.description,
-            asset=payload.asset,
-            idempotency_key=idempotency_key,
-        )
-        s.add(tx)
-        s.flush()
+            s.add(tx)
+            s.flush()
 
-        # Attach postings
-        for p in payload.postings:
-            acct = s.scalar(select(Account).where(Account.name == p.account_name))
-            if not acct:
-                raise ValueError(f"Unknown account: {p.account_name}")
-            if acct.asset != payload.asset:
-                raise ValueError(
-                    f"Asset mismatch for {acct.name}: account={acct.asset} tx={payload.asset}"
+            # Attach postings (accounts resolved via the cache, at most one query for misses)
+            accounts = resolve_accounts(s, (p.account_name for p in payload.postings))
+            legs = _resolve_legs(payload, accounts)
+            for acct, direction, amount in legs:
+                tx.postings.append(Posting(account_id=acct.id, direction=direction, amount=amount))
+            apply_posting_deltas(
+                s, ((acct.id, direction, amount) for acct, direction, amount in legs)
+            )
+
+            # Outbox event (for downstream processing)
+            s.add(
+                EventOutbox(
+                    event_type="transaction.created",
+                    payload_json=_outbox_payload(tx.id, tx.reference, tx.asset),
                 )
-            tx.postings.append(Posting(account_id=acct.id, direction=p.direction, amount=p.amount))
-
-        # Outbox event (for downstream processing)
-        s.add(
-            EventOutbox(
-                event_type="transaction.created",
-                payload_json=json.dumps(
-                    {"transaction_id": tx.id, "reference": tx.reference, "asset": tx.asset}
-                ),
             )
-        )
-        s.flush()
-        s.refresh(tx)
+            s.flush()
+            out = _created_out(tx.id, payload, tx.created_at, legs)
+    # Only cached once committed.
+    remember(idempotency_key, digest, out.model_dump_json())
+    return out
+
 
-        tx = s.scalar(
+def _transactions_by_key(s: Session, keys: list[str]) -> dict[str, Transaction]:
+    txs = (
+        s.scalars(
             select(Transaction)
             .options(joinedload(Transaction.postings).joinedload(Posting.account))
-            .where(Transaction.id == tx.id)
+            .where(Transaction.idempotency_key.in_(keys))
         )
-        assert tx
-        return _tx_out(tx)
+        .unique()
+        .all()
+    )
+    return {tx.idempotency_key: tx for tx in txs}
+
+
+def _replay_result(tx: Transaction, digest: str) -> BatchItemResult:
+    """Outcome of a batch entry whose key is already in the ledger."""
+    try:
+        check_replay(tx.idempotency_key, tx.payload_hash, digest)
+    except ValueError as e:
+        return BatchItemResult(idempotency_key=tx.idempotency_key, status="rejected", error=str(e))
+    return BatchItemResult(
+        idempotency_key=tx.idempotency_key, status="replayed", transaction=_tx_out(tx)
+    )
+
+
+def _insert_entries(
+    s: Session,
+    items: list[BatchTransactionIn],
+    digests: dict[int, str],
+    entries: list[tuple[int, list[tuple[AccountRef, str, Decimal]]]],
+    now: datetime,
+) -> list[int]:
+    """Bulk insert the entries' transactions, postings, balance deltas and outbox events;
+    returns the new transaction ids in entry order."""
+    tx_ids = s.scalars(
+        insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+        [
+            {
+                "reference": items[i].reference,
+                "description": items[i].description,
+                "asset": items[i].asset,
+                "idempotency_key": items[i].idempotency_key,
+                "payload_hash": digests[i],
+                "created_at": now,
+            }
+            for i, _ in entries
+        ],
+    ).all()
+    s.execute(
+        insert(Posting),
+        [
+            {
+                "transaction_id": tx_id,
+                "account_id": acct.id,
+                "direction": direction,
+                "amount": amount,
+            }
+            for tx_id, (_, legs) in zip(tx_ids, entries, strict=True)
+            for acct, direction, amount in legs
+        ],
+    )
+    apply_posting_deltas(
+        s,
+        ((acct.id, direction, amount) for _, legs in entries for acct, direction, amount in legs),
+    )
+    s.execute(
+        insert(EventOutbox),
+        [
+            {
+                "event_type": "transaction.created",
+                "payload_json": _outbox_payload(tx_id, items[i].reference, items[i].asset),
+                "created_at": now,
+            }
+            for tx_id, (i, _) in zip(tx_ids, entries, strict=True)
+        ],
+    )
+    return list(tx_ids)
+
+
+def create_transactions_batch(items: list[BatchTransactionIn]) -> TransactionBatchOut:
+    """Ingest many journal entries in a single database transaction.
+
+    Idempotency keys and account names are each resolved with one query, and transactions,
+    postings and outbox events are written with bulk inserts. Entries are independent: a
+    rejected entry does not prevent the others from being written. A key repeated within the
+    batch is written once and reported as replayed for the later occurrences, or rejected
+    when their payload differs from the first one.
+    """
+    results: list[BatchItemResult | None] = [None] * len(items)
+    first_index: dict[str, int] = {}
+    digests: dict[int, str] = {}
+    pending: list[int] = []
+    for i, item in enumerate(items):
+        key = item.idempotency_key
+        if key in first_index:
+            continue
+        first_index[key] = i
+        try:
+            _check_balanced(item)
+            digests[i] = payload_hash(item)
+            cached = cached_replay(key, digests[i])
+        except ValueError as e:
+            results[i] = BatchItemResult(idempotency_key=key, status="rejected", error=str(e))
+            continue
+        if cached is not None:
+            results[i] = BatchItemResult(
+                idempotency_key=key,
+                status="replayed",
+                transaction=TransactionOut.model_validate_json(cached),
+            )
+            continue
+        pending.append(i)
+
+    with db_session() as s:
+        existing: dict[str, Transaction] = {}
+        if pending:
+            existing = _transactions_by_key(s, [items[i].idempotency_key for i in pending])
+
+        names = {
+            p.account_name
+            for i in pending
+            if items[i].idempotency_key not in existing
+            for p in items[i].postings
+        }
+        accounts = resolve_accounts(s, names)
+
+        to_create: list[tuple[int, list[tuple[AccountRef, str, Decimal]]]] = []
+        for i in pending:
+            item = items[i]
+            key = item.idempotency_key
+            if key in existing:
+                results[i] = _replay_result(existing[key], digests[i])
+                continue
+            try:
+                legs = _resolve_legs(item, accounts)
+            except ValueError as e:
+                results[i] = BatchItemResult(idempotency_key=key, status="rejected", error=str(e))
+                continue
+            to_create.append((i, legs))
+
+        written = to_create
+        tx_ids: list[int] = []
+        if to_create:
+            now = utcnow()
+            try:
+                with s.begin_nested():
+                    tx_ids = _insert_entries(s, items, digests, to_create, now)
+            except IntegrityError:
+                # A concurrent request committed one of these keys after the lookup above.
+                # Write entry by entry so only the clashing ones turn into replays.
+                written, tx_ids = [], []
+                for entry in to_create:
+                    i = entry[0]
+                    try:
+                        with s.begin_nested():
+                            tx_ids += _insert_entries(s, items, digests, [entry], now)
+                    except IntegrityError:
+                        key = items[i].idempotency_key
+                        winner = _transactions_by_key(s, [key]).get(key)
+                        if winner is None:
+                            raise
+                        results[i] = _replay_result(winner, digests[i])
+                        continue
+                    written.append(entry)
+            for tx_id, (i, legs) in zip(tx_ids, written, strict=True):
+                item = items[i]
+                results[i] = BatchItemResult(
+                    idempotency_key=item.idempotency_key,
+                    status="created",
+                    transaction=_created_out(tx_id, item, now, legs),
+                )
+
+    for i in pending:
+        r = results[i]
+        if r is not None and r.transaction is not None:
+            remember(r.idempotency_key, digests[i], r.transaction.model_dump_json())
+
+    # Later occurrences of a key share the outcome of the first one, if they carry the same
+    # entry; like a retried request, a different payload is a conflict.
+    for i, item in enumerate(items):
+        if results[i] is not None:
+            continue
+        j = first_index[item.idempotency_key]
+        try:
+            check_replay(
+                item.idempotency_key, digests.get(j) or payload_hash(items[j]), payload_hash(item)
+            )
+        except ValueError as e:
+            results[i] = BatchItemResult(
+                idempotency_key=item.idempotency_key, status="rejected", error=str(e)
+            )
+            continue
+        first = results[j]
+        assert first
+        status = "rejected" if first.status == "rejected" else "replayed"
+        results[i] = first.model_copy(update={"status": status})
+
+    out = [r for r in results if r is not None]
+    LOG.info(f"batch ingested: size={len(items)} created={len(written)}")
+    return TransactionBatchOut(
+        created=sum(1 for r in out if r.status == "created"),
+        replayed=sum(1 for r in out if r.status == "replayed"),
+        rejected=sum(1 for r in out if r.status == "rejected"),
+        results=out,
+    )
+
+
+def _resolve_legs(
+    payload: TransactionIn, accounts: dict[str, AccountRef]
+) -> list[tuple[AccountRef, str, Decimal]]:
+    legs = []
+    for p in payload.postings:
+        acct = accounts.get(p.account_name)
+        if not acct:
+            raise ValueError(f"Unknown account: {p.account_name}")
+        if acct.asset != payload.asset:
+            raise ValueError(
+                f"Asset mismatch for {acct.name}: account={acct.asset} tx={payload.asset}"
+            )
+        legs.append((acct, p.direction, p.amount))
+    return legs
+
+
+def _created_out(
+    tx_id: int,
+    payload: TransactionIn,
+    created_at: datetime,
+    legs: list[tuple[AccountRef, str, Decimal]],
+) -> TransactionOut:
+    """Response for a just-written entry, shaped like one read back from the database."""
+    return TransactionOut(
+        id=tx_id,
+        reference=payload.reference,
+        description=payload.description,
+        asset=payload.asset,
+        created_at=_as_iso(created_at),
+        postings=[
+            PostingOut(
+                account_name=acct.name,
+                direction=direction,
+                amount=amount.quantize(_AMOUNT_QUANT),
+            )
+            for acct, direction, amount in legs
+        ],
+    )
 
 
 def _tx_out(tx: Transaction) -> TransactionOut:
@@ -114,17 +389,152 @@ def _tx_out(tx: Transaction) -> TransactionOut:
     )
 
 
-def list_transactions(limit: int = 50) -> list[TransactionOut]:
-    limit = max(1, min(limit, 500))
-    with db_session() as s:
-        txs = (
-            s.scalars(
-                select(Transaction)
-                .options(joinedload(Transaction.postings).joinedload(Posting.account))
-                .order_by(Transaction.id.desc())
-                .limit(limit)
+def _encode_cursor(tx_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": tx_id}).encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        tx_id = json.loads(raw)["id"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(tx_id, int):
+        raise ValueError("Invalid cursor")
+    return tx_id
+
+
+def _page_ids_stmt(
+    limit: int,
+    cursor: str | None,
+    asset: str | None,
+    reference: str | None,
+    created_from: datetime | None,
+    created_to: datetime | None,
+):
+    # Transactions of archived periods no longer have their postings here; leave them out.
+    archived = archived_end()
+    stmt = (
+        select(Transaction.id)
+        .where(or_(archived.is_(None), Transaction.created_at >= archived))
+        .order_by(Transaction.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        stmt = stmt.where(Transaction.id < _decode_cursor(cursor))
+    if asset is not None:
+        stmt = stmt.where(Transaction.asset == asset)
+    if reference is not None:
+        stmt = stmt.where(Transaction.reference == reference)
+    if created_from is not None:
+        stmt = stmt.where(Transaction.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Transaction.created_at < created_to)
+    return stmt
+
+
+def _transactions_by_id_stmt(ids: list[int]):
+    return (
+        select(Transaction)
+        .options(joinedload(Transaction.postings).joinedload(Posting.account))
+        .where(Transaction.id.in_(ids))
+        .order_by(Transaction.id.desc())
+    )
+
+
+def _transaction_rows_stmt(ids: list[int]):
+    return (
+        select(
+            Transaction.id,
+            Transaction.reference,
+            Transaction.description,
+            Transaction.asset,
+            Transaction.created_at,
+            Account.name,
+            Posting.direction,
+            Posting.amount,
+        )
+        .outerjoin(Posting, Posting.transaction_id == Transaction.id)
+        .outerjoin(Account, Account.id == Posting.account_id)
+        .where(Transaction.id.in_(ids))
+        .order_by(Transaction.id.desc(), Posting.id)
+    )
+
+
+def _encode_transactions(rows) -> bytes:
+    """JSON array of ``TransactionOut`` built from joined (transaction, posting) tuples.
+
+    ``rows`` are ordered by transaction and then posting id; the output matches what the
+    ``TransactionOut`` response model would produce, field for field.
+    """
+    items: list[dict] = []
+    current: dict | None = None
+    for tx_id, reference, description, asset, created_at, name, direction, amount in rows:
+        if current is None or current["id"] != tx_id:
+            current = {
+                "id": tx_id,
+                "reference": reference,
+                "description": description,
+                "asset": asset,
+                "created_at": _as_iso(created_at),
+                "postings": [],
+            }
+            items.append(current)
+        if name is not None:
+            current["postings"].append(
+                {"account_name": name, "direction": direction, "amount": str(amount)}
             )
-            .unique()
-            .all()
+    return dumps(items)
+
+
+def list_transactions_json(
+    limit: int = 50,
+    cursor: str | None = None,
+    asset: str | None = None,
+    reference: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> tuple[bytes, str | None]:
+    """``list_transactions`` encoded straight to JSON bytes, plus the next cursor.
+
+    Rows are fetched as plain tuples and encoded without ORM or Pydantic objects, which
+    dominate the cost of large pages on the model path.
+    """
+    limit = max(1, min(limit, 500))
+    stmt = _page_ids_stmt(limit, cursor, asset, reference, created_from, created_to)
+    with read_session() as s:
+        ids = s.scalars(stmt).all()
+        has_more = len(ids) > limit
+        ids = ids[:limit]
+        body = _encode_transactions(s.execute(_transaction_rows_stmt(ids)))
+    return body, _encode_cursor(ids[-1]) if has_more else None
+
+
+def list_transactions(
+    limit: int = 50,
+    cursor: str | None = None,
+    asset: str | None = None,
+    reference: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> TransactionPage:
+    """Newest-first page of transactions, keyset-paginated on ``Transaction.id``.
+
+    ``cursor`` is the ``next_cursor`` of the previous page. Each page seeks to ``id < cursor``
+    on the primary key (or ``(asset, id)``/``reference`` index when filtered) and reads at
+    most ``limit + 1`` rows, so walking the whole ledger costs O(n) in total.
+    ``created_from`` is inclusive, ``created_to`` exclusive. Transactions of archived periods
+    are not listed (see ``periods.read_period``). Served from a read replica when
+    configured; wrap in ``pin_to_primary()`` to see a write made just before.
+    """
+    limit = max(1, min(limit, 500))
+    stmt = _page_ids_stmt(limit, cursor, asset, reference, created_from, created_to)
+    with read_session() as s:
+        ids = s.scalars(stmt).all()
+        has_more = len(ids) > limit
+        ids = ids[:limit]
+        txs = s.scalars(_transactions_by_id_stmt(ids)).unique().all()
+        return TransactionPage(
+            items=[_tx_out(tx) for tx in txs],
+            next_cursor=_encode_cursor(ids[-1]) if has_more else None,
         )
-        return [_tx_out(tx) for tx in txs]
@@ -0,0 +1,122 @@
+"""Async counterparts of the ``ledger`` API functions, used by the ``async`` API stack.
+
+Validation, hashing, response building and statements are shared with ``ledger``; helpers
+written against a sync ``Session`` (account resolution, balance upserts) run through
+``AsyncSession.run_sync`` so both stacks write exactly the same rows.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from app.db.async_session import async_db_session
+from app.models import Account, EventOutbox, Posting, Transaction, utcnow
+from app.schemas import AccountCreate, AccountOut, TransactionIn, TransactionOut
+from app.services.account_cache import ACCOUNT_CACHE, resolve_accounts
+from app.services.balances import apply_posting_deltas
+from app.services.idempotency import cached_replay, check_replay, payload_hash, remember
+from app.services.ledger import (
+    _check_balanced,
+    _created_out,
+    _encode_cursor,
+    _encode_transactions,
+    _outbox_payload,
+    _page_ids_stmt,
+    _resolve_legs,
+    _transaction_rows_stmt,
+    _tx_out,
+)
+
+
+async def create_account(payload: AccountCreate) -> AccountOut:
+    async with async_db_session() as s:
+        exists = await s.scalar(select(Account).where(Account.name == payload.name))
+        if exists:
+            raise ValueError(f"Account already exists: {payload.name}")
+        acc = Account(name=payload.name, asset=payload.asset, type=payload.type)
+        s.add(acc)
+        await s.flush()
+        out = AccountOut(id=acc.id, name=acc.name, asset=acc.asset, type=acc.type)
+    ACCOUNT_CACHE.invalidate(payload.name)
+    return out
+
+
+async def list_accounts() -> list[AccountOut]:
+    async with async_db_session() as s:
+        rows = (await s.scalars(select(Account).order_by(Account.id))).all()
+        return [AccountOut(id=a.id, name=a.name, asset=a.asset, type=a.type) for a in rows]
+
+
+async def create_transaction(payload: TransactionIn, idempotency_key: str) -> TransactionOut:
+    """See ``ledger.create_transaction``."""
+    _check_balanced(payload)
+    digest = payload_hash(payload)
+    cached = cached_replay(idempotency_key, digest)
+    if cached is not None:
+        return TransactionOut.model_validate_json(cached)
+
+    async with async_db_session() as s:
+        existing = await s.scalar(
+            select(Transaction)
+            .options(joinedload(Transaction.postings).joinedload(Posting.account))
+            .where(Transaction.idempotency_key == idempotency_key)
+        )
+        if existing:
+            check_replay(idempotency_key, existing.payload_hash, digest)
+            out = _tx_out(existing)
+        else:
+            accounts = await s.run_sync(
+                resolve_accounts, [p.account_name for p in payload.postings]
+            )
+            legs = _resolve_legs(payload, accounts)
+            # Postings are attached before the flush; nothing may lazy-load under asyncio.
+            tx = Transaction(
+                reference=payload.reference,
+                description=payload.description,
+                asset=payload.asset,
+                idempotency_key=idempotency_key,
+                payload_hash=digest,
+                created_at=utcnow(),
+                postings=[
+                    Posting(account_id=acct.id, direction=direction, amount=amount)
+                    for acct, direction, amount in legs
+                ],
+            )
+            s.add(tx)
+            await s.flush()
+            await s.run_sync(
+                apply_posting_deltas,
+                [(acct.id, direction, amount) for acct, direction, amount in legs],
+            )
+            s.add(
+                EventOutbox(
+                    event_type="transaction.created",
+                    payload_json=_outbox_payload(tx.id, tx.reference, tx.asset),
+                )
+            )
+            await s.flush()
+            out = _created_out(tx.id, payload, tx.created_at, legs)
+    remember(idempotency_key, digest, out.model_dump_json())
+    return out
+
+
+async def list_transactions_json(
+    limit: int = 50,
+    cursor: str | None = None,
+    asset: str | None = None,
+    reference: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> tuple[bytes, str | None]:
+    """See ``ledger.list_transactions_json``."""
+    limit = max(1, min(limit, 500))
+    stmt = _page_ids_stmt(limit, cursor, asset, reference, created_from, created_to)
+    async with async_db_session() as s:
+        ids = (await s.scalars(stmt)).all()
+        has_more = len(ids) > limit
+        ids = ids[:limit]
+        body = _encode_transactions(await s.execute(_transaction_rows_stmt(ids)))
+    return body, _encode_cursor(ids[-1]) if has_more else None
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Any
+
+# Decimal places of the ledger's Numeric(18, 6) amounts. Matching at that scale keeps
+# sub-cent amounts of any asset apart; 18 digits still fit in an int64.
+AMOUNT_EXPONENT = 6
+
+
+def to_minor(amount: Decimal) -> int:
+    """Signed amount in integer units of the storage scale (10**-6), rounded half-to-even."""
+    return int(Decimal(amount).scaleb(AMOUNT_EXPONENT).to_integral_value(ROUND_HALF_EVEN))
+
+
+@dataclass(frozen=True, slots=True)
+class MatchItem:
+    key: Any  # caller's handle, returned untouched in the unmatched lists
+    reference: str
+    amount_minor: int
+    ts: float  # booked_at as POSIX seconds
+
+    @classmethod
+    def of(cls, key: Any, reference: str, amount: Decimal, booked_at: datetime) -> MatchItem:
+        return cls(key, reference, to_minor(amount), booked_at.timestamp())
+
+
+@dataclass
+class MatchResult:
+    by_reference: int = 0
+    by_amount: int = 0
+    mismatched_amount: int = 0
+    # MatchItems from ``match``; input indices from ``match_columns`` and the NumPy matcher.
+    unmatched_ledger: list = field(default_factory=list)
+    unmatched_bank: list = field(default_factory=list)
+
+    @property
+    def matched(self) -> int:
+        return self.by_reference + self.by_amount
+
+    def passes(self) -> dict[str, int]:
+        return {
+            "reference": self.by_reference,
+            "reference_amount_mismatch": self.mismatched_amount,
+            "amount_window": self.by_amount,
+        }
+
+
+def match(
+    ledger: list[MatchItem], bank: list[MatchItem], window_seconds: float | None
+) -> MatchResult:
+    """Two-pass matcher, O(n log n) overall.
+
+    1. Exact ``reference`` match through a hash index on the bank side. A pair whose amounts
+       differ is consumed and counted as ``mismatched_amount``.
+    2. Remaining items are grouped by amount; within a group both sides are sorted by
+       timestamp and paired with a two-pointer sweep when they are at most
+       ``window_seconds`` apart (``None`` pairs oldest-first regardless of date).
+    """
+    result = match_columns(
+        [m.reference for m in ledger],
+        [m.amount_minor for m in ledger],
+        [m.ts for m in ledger],
+        [m.reference for m in bank],
+        [m.amount_minor for m in bank],
+        [m.ts for m in bank],
+        window_seconds,
+    )
+    result.unmatched_ledger = [ledger[i] for i in result.unmatched_ledger]
+    result.unmatched_bank = [bank[j] for j in result.unmatched_bank]
+    return result
+
+
+def match_columns(
+    l_refs: Sequence[str],
+    l_amounts: Sequence[int],
+    l_ts: Sequence[float],
+    b_refs: Sequence[str],
+    b_amounts: Sequence[int],
+    b_ts: Sequence[float],
+    window_seconds: float | None,
+) -> MatchResult:
+    """``match`` over parallel columns (lists or ``array``s), one entry per item.
+
+    No per-item objects are built; the unmatched lists hold indices into the columns.
+    """
+    result = MatchResult()
+
+    by_ref: dict[str, deque[int]] = defaultdict(deque)
+    for j in sorted(range(len(b_amounts)), key=b_ts.__getitem__):
+        by_ref[b_refs[j]].append(j)
+    used = bytearray(len(b_amounts))
+    rest_ledger: list[int] = []
+    for i, ref in enumerate(l_refs):
+        candidates = by_ref.get(ref)
+        if not candidates:
+            rest_ledger.append(i)
+            continue
+        j = candidates.popleft()
+        used[j] = 1
+        if b_amounts[j] == l_amounts[i]:
+            result.by_reference += 1
+        else:
+            result.mismatched_amount += 1
+
+    ledger_groups: dict[int, list[int]] = defaultdict(list)
+    for i in rest_ledger:
+        ledger_groups[l_amounts[i]].append(i)
+    bank_groups: dict[int, list[int]] = defaultdict(list)
+    for j, amount in enumerate(b_amounts):
+        if not used[j]:
+            bank_groups[amount].append(j)
+
+    for amount, bs in bank_groups.items():
+        if amount not in ledger_groups:
+            result.unmatched_bank.extend(bs)
+    for amount, ls in ledger_groups.items():
+        bs = bank_groups.get(amount)
+        if not bs:
+            result.unmatched_ledger.extend(ls)
+            continue
+        ls.sort(key=l_ts.__getitem__)
+        bs.sort(key=b_ts.__getitem__)
+        if window_seconds is None:
+            n = min(len(ls), len(bs))
+            result.by_amount += n
+            result.unmatched_ledger.extend(ls[n:])
+            result.unmatched_bank.extend(bs[n:])
+            continue
+        i = j = 0
+        while i < len(ls) and j < len(bs):
+            delta = l_ts[ls[i]] - b_ts[bs[j]]
+            if abs(delta) <= window_seconds:
+                result.by_amount += 1
+                i += 1
+                j += 1
+            elif delta > 0:  # bank item is too old for this and every later ledger item
+                result.unmatched_bank.append(bs[j])
+                j += 1
+            else:
+                result.unmatched_ledger.append(ls[i])
+                i += 1
+        result.unmatched_ledger.extend(ls[i:])
+        result.unmatched_bank.extend(bs[j:])
+    return result
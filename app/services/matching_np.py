@@ -0,0 +1,126 @@
+"""NumPy implementation of the matcher for the amount-only (no date window) configuration.
+
+Amounts are int64 units of the storage scale (``matching.to_minor``) and references are
+interned to integer codes, so both passes reduce to sorts, ``unique(return_counts)`` and
+``searchsorted``. Results are identical to ``app.services.matching.match(...,
+window_seconds=None)``; like ``matching.match_columns``, the unmatched lists hold indices
+into the inputs instead of ``MatchItem`` objects.
+
+Requires the optional ``numpy`` dependency (``pip install -e ".[fast]"``).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from itertools import chain
+
+import numpy as np
+
+from app.services.matching import MatchResult
+
+
+def _rank_within_groups(sorted_codes: np.ndarray) -> np.ndarray:
+    """Position of each element inside its run of equal codes (input must be sorted)."""
+    n = len(sorted_codes)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    run_lengths = np.diff(np.r_[starts, n])
+    return np.arange(n, dtype=np.int64) - np.repeat(starts, run_lengths)
+
+
+def _counts_in(vals: np.ndarray, other_vals: np.ndarray, other_counts: np.ndarray) -> np.ndarray:
+    """For each of the sorted unique ``vals``, its count on the other side (0 if absent)."""
+    if len(other_vals) == 0:
+        return np.zeros(len(vals), dtype=np.int64)
+    pos = np.minimum(np.searchsorted(other_vals, vals), len(other_vals) - 1)
+    return np.where(other_vals[pos] == vals, other_counts[pos], 0)
+
+
+def _pair_by_group(l_codes, l_idx, b_codes, b_idx):
+    """Pair the k-th ledger item of each group with the k-th bank item of the same group.
+
+    ``l_idx``/``b_idx`` list the items sorted by group, in priority order within a group.
+    Returns (ledger_idx, bank_idx) of the pairs, as indices into the original arrays.
+    """
+    l_rank = _rank_within_groups(l_codes[l_idx])
+    b_rank = _rank_within_groups(b_codes[b_idx])
+    width = np.int64(max(len(l_idx), len(b_idx)) + 1)
+    l_key = l_codes[l_idx].astype(np.int64) * width + l_rank
+    b_key = b_codes[b_idx].astype(np.int64) * width + b_rank
+    _, li, bi = np.intersect1d(l_key, b_key, assume_unique=True, return_indices=True)
+    return l_idx[li], b_idx[bi]
+
+
+def columns(rows: list[tuple[str, int, float]]) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """Split (reference, amount_minor, ts) rows into the three columns ``match_arrays`` takes."""
+    refs = [r[0] for r in rows]
+    amounts = np.fromiter((r[1] for r in rows), dtype=np.int64, count=len(rows))
+    ts = np.fromiter((r[2] for r in rows), dtype=np.float64, count=len(rows))
+    return refs, amounts, ts
+
+
+def _reference_codes(l_refs: Sequence[str], b_refs: Sequence[str]) -> np.ndarray:
+    """One int64 code per reference, ledger side first; equal references share a code.
+
+    Interning through a dict keeps references as Python strings instead of copying them into
+    a fixed-width unicode array sized by the longest one.
+    """
+    index: dict[str, int] = {}
+    return np.fromiter(
+        (index.setdefault(r, len(index)) for r in chain(l_refs, b_refs)),
+        dtype=np.int64,
+        count=len(l_refs) + len(b_refs),
+    )
+
+
+def match_arrays(
+    l_refs: Sequence[str],
+    l_amounts: np.ndarray,
+    l_ts: np.ndarray,
+    b_refs: Sequence[str],
+    b_amounts: np.ndarray,
+    b_ts: np.ndarray,
+) -> MatchResult:
+    """Vectorized reference pass followed by an amount multiset pass."""
+    l_amounts = np.asarray(l_amounts, dtype=np.int64)
+    b_amounts = np.asarray(b_amounts, dtype=np.int64)
+    n_l, n_b = len(l_amounts), len(b_amounts)
+    result = MatchResult()
+
+    # Pass 1: reference. Ledger keeps input order, bank is ordered by timestamp.
+    codes = _reference_codes(l_refs, b_refs)
+    l_codes, b_codes = codes[:n_l], codes[n_l:]
+    l_pair, b_pair = _pair_by_group(
+        l_codes,
+        np.argsort(l_codes, kind="stable"),
+        b_codes,
+        np.lexsort((b_ts, b_codes)),
+    )
+    same = l_amounts[l_pair] == b_amounts[b_pair]
+    result.by_reference = int(same.sum())
+    result.mismatched_amount = int(len(same) - result.by_reference)
+
+    l_rest = np.ones(n_l, dtype=bool)
+    l_rest[l_pair] = False
+    b_rest = np.ones(n_b, dtype=bool)
+    b_rest[b_pair] = False
+    l_rest_idx = np.flatnonzero(l_rest)
+    b_rest_idx = np.flatnonzero(b_rest)
+
+    # Pass 2: amount multiset, oldest first inside each amount.
+    la, ba = l_amounts[l_rest_idx], b_amounts[b_rest_idx]
+    l_sorted = l_rest_idx[np.lexsort((l_ts[l_rest_idx], la))]
+    b_sorted = b_rest_idx[np.lexsort((b_ts[b_rest_idx], ba))]
+    l_vals, l_counts = np.unique(la, return_counts=True)
+    b_vals, b_counts = np.unique(ba, return_counts=True)
+
+    l_limit = np.repeat(_counts_in(l_vals, b_vals, b_counts), l_counts)
+    b_limit = np.repeat(_counts_in(b_vals, l_vals, l_counts), b_counts)
+    l_matched = _rank_within_groups(l_amounts[l_sorted]) < l_limit
+    b_matched = _rank_within_groups(b_amounts[b_sorted]) < b_limit
+
+    result.by_amount = int(l_matched.sum())
+    result.unmatched_ledger = l_sorted[~l_matched]
+    result.unmatched_bank = b_sorted[~b_matched]
+    return result
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Protocol
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import db_session, engine
+from app.models import EventOutbox, utcnow
+from app.services.checkpoints import as_utc
+
+LOG = get_logger("outbox")
+
+PUBLISHED = Counter("outbox_events_published_total", "Outbox events delivered to the sink")
+BATCH_SECONDS = Histogram("outbox_batch_seconds", "Claim + publish + mark time per batch")
+DELIVERY_LAG = Histogram(
+    "outbox_delivery_lag_seconds",
+    "Time from event creation to delivery",
+    buckets=(0.05, 0.1, 0.5, 1, 5, 15, 60, 300, 1800, float("inf")),
+)
+OLDEST_PENDING = Gauge("outbox_oldest_pending_seconds", "Age of the oldest undelivered event")
+
+
+@dataclass(frozen=True, slots=True)
+class OutboxEvent:
+    id: int
+    event_type: str
+    payload_json: str
+    created_at: datetime
+
+
+class OutboxSink(Protocol):
+    def publish(self, events: list[OutboxEvent]) -> None:
+        """Deliver a batch; raising leaves the whole batch pending for a retry."""
+        ...
+
+
+class InMemorySink:
+    def __init__(self) -> None:
+        self.events: list[OutboxEvent] = []
+        self._lock = threading.Lock()
+
+    def publish(self, events: list[OutboxEvent]) -> None:
+        with self._lock:
+            self.events.extend(events)
+
+
+class NdjsonFileSink:
+    """Appends one JSON object per event; the stored payload is embedded without re-parsing."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def publish(self, events: list[OutboxEvent]) -> None:
+        lines = "".join(
+            f'{{"id":{e.id},"event_type":{json.dumps(e.event_type)},'
+            f'"created_at":"{as_utc(e.created_at).isoformat()}","payload":{e.payload_json}}}\n'
+            for e in events
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def make_sink(spec: str | None = None) -> OutboxSink:
+    """Build a sink from ``memory`` or ``file:<path>`` (default ``settings.outbox_sink``)."""
+    spec = spec or settings.outbox_sink
+    if spec == "memory":
+        return InMemorySink()
+    if spec.startswith("file:"):
+        return NdjsonFileSink(spec.removeprefix("file:"))
+    raise ValueError(f"Unknown outbox sink: {spec}")
+
+
+_COLUMNS = (
+    EventOutbox.id,
+    EventOutbox.event_type,
+    EventOutbox.payload_json,
+    EventOutbox.created_at,
+)
+
+
+class OutboxRelay:
+    """Moves pending ``events_outbox`` rows to a sink, in id order, one batch at a time.
+
+    Postgres: the batch is selected ``FOR UPDATE SKIP LOCKED`` and stays locked while it is
+    published, so concurrent relays take disjoint batches; a crash releases the locks.
+    SQLite (no row locks): the batch is leased by stamping ``claimed_by``/``lease_until`` in a
+    single ``UPDATE ... RETURNING`` (SQLite serializes writers), and an expired lease makes
+    the events claimable again. Either way the batch is marked processed by one ``UPDATE``
+    after the sink accepts it; delivery is at-least-once if a relay dies mid-batch.
+    """
+
+    def __init__(
+        self,
+        sink: OutboxSink,
+        worker_id: str | None = None,
+        batch_size: int | None = None,
+        lease_seconds: float | None = None,
+    ) -> None:
+        self.sink = sink
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.batch_size = batch_size or settings.outbox_batch_size
+        self.lease = timedelta(seconds=lease_seconds or settings.outbox_lease_seconds)
+
+    def run_once(self) -> int:
+        """Deliver at most one batch; returns the number of events published."""
+        start = time.perf_counter()
+        if engine.dialect.name == "postgresql":
+            with db_session() as s:
+                n = self._locked_batch(s)
+        else:
+            n = self._leased_batch()
+        if n:
+            PUBLISHED.inc(n)
+            BATCH_SECONDS.observe(time.perf_counter() - start)
+        return n
+
+    def _deliver(self, events: list[OutboxEvent]) -> None:
+        self.sink.publish(events)
+        now = utcnow()
+        for e in events:
+            DELIVERY_LAG.observe(max(0.0, (now - as_utc(e.created_at)).total_seconds()))
+
+    def _locked_batch(self, s: Session) -> int:
+        rows = s.execute(
+            select(*_COLUMNS)
+            .where(EventOutbox.processed_at.is_(None))
+            .order_by(EventOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            return 0
+        events = [OutboxEvent(*r) for r in rows]
+        self._deliver(events)  # an exception rolls back and releases the locks
+        s.execute(
+            update(EventOutbox)
+            .where(EventOutbox.id.in_([e.id for e in events]))
+            .values(processed_at=utcnow())
+        )
+        return len(events)
+
+    def _leased_batch(self) -> int:
+        now = utcnow()
+        claimable = (
+            select(EventOutbox.id)
+            .where(
+                EventOutbox.processed_at.is_(None),
+                (EventOutbox.lease_until.is_(None)) | (EventOutbox.lease_until < now),
+            )
+            .order_by(EventOutbox.id)
+            .limit(self.batch_size)
+            .scalar_subquery()
+        )
+        with db_session() as s:
+            rows = s.execute(
+                update(EventOutbox)
+                .where(EventOutbox.id.in_(claimable))
+                .values(claimed_by=self.worker_id, lease_until=now + self.lease)
+                .returning(*_COLUMNS)
+            ).all()
+        if not rows:
+            return 0
+        events = sorted((OutboxEvent(*r) for r in rows), key=lambda e: e.id)
+        mine = (EventOutbox.id.in_([e.id for e in events])) & (
+            EventOutbox.claimed_by == self.worker_id
+        )
+        try:
+            self._deliver(events)
+        except Exception:
+            with db_session() as s:
+                s.execute(update(EventOutbox).where(mine).values(claimed_by=None, lease_until=None))
+            raise
+        with db_session() as s:
+            s.execute(
+                update(EventOutbox)
+                .where(mine, EventOutbox.processed_at.is_(None))
+                .values(processed_at=utcnow(), lease_until=None)
+            )
+        return len(events)
+
+    def run(self, stop: threading.Event | None = None, poll_seconds: float | None = None) -> int:
+        """Drain continuously until ``stop`` is set; sleeps only when the outbox is empty."""
+        stop = stop or threading.Event()
+        poll = settings.outbox_poll_seconds if poll_seconds is None else poll_seconds
+        total = 0
+        while not stop.is_set():
+            try:
+                n = self.run_once()
+            except Exception as e:
+                LOG.error(f"outbox relay {self.worker_id} failed: {e}", exc_info=True)
+                n = 0
+            total += n
+            if n < self.batch_size:
+                update_lag()
+                stop.wait(poll)
+        return total
+
+
+def update_lag() -> float:
+    """Refresh ``outbox_oldest_pending_seconds`` from the database and return it."""
+    with db_session() as s:
+        oldest = s.scalar(
+            select(func.min(EventOutbox.created_at)).where(EventOutbox.processed_at.is_(None))
+        )
+    lag = max(0.0, (utcnow() - as_utc(oldest)).total_seconds()) if oldest else 0.0
+    OLDEST_PENDING.set(lag)
+    return lag
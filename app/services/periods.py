@@ -0,0 +1,267 @@
+"""Period close: freeze a date range of the ledger, roll it up and optionally archive it.
+
+Closing ``[start, end)`` (``start`` being the previous close) writes one
+``period_opening_balances`` row per account with its cumulative totals at ``end``, plus a
+balance checkpoint at ``end``, so as-of balances never scan a closed period again. Nothing
+may be written into a closed period: the importer rejects entries dated in it and full
+reconciliation only reads what was created since the last close.
+
+Archiving moves a closed period's postings out of ``postings``:
+  - ``table``: into ``archived_postings`` (same ids); date-ranged reports, as-of balances
+    and exports still read them from there
+  - ``file:<dir>``: into a gzip NDJSON file in the export format, read back whole with
+    ``read_period``
+Transaction rows stay, so idempotency keys keep replaying. Periods are archived in order,
+so every posting created before the last archived period's end has left ``postings``.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.db.session import db_session
+from app.db.upsert import dialect_insert
+from app.models import (
+    ArchivedPosting,
+    BalanceCheckpoint,
+    LedgerPeriod,
+    PeriodOpeningBalance,
+    Posting,
+    Transaction,
+    utcnow,
+)
+from app.schemas import PeriodOut
+from app.services.checkpoints import ZERO, _period_totals, as_utc
+from app.services.export import _ndjson, encode, postings_stmt, stream_rows
+
+LOG = get_logger("periods")
+
+
+def _period_out(p: LedgerPeriod) -> PeriodOut:
+    return PeriodOut(
+        id=p.id,
+        start=as_utc(p.start).isoformat() if p.start else None,
+        end=as_utc(p.end).isoformat(),
+        closed_at=as_utc(p.closed_at).isoformat(),
+        transaction_count=p.transaction_count,
+        posting_count=p.posting_count,
+        archive=p.archive,
+    )
+
+
+def _check_target(target: str) -> None:
+    if target != "table" and not (target.startswith("file:") and len(target) > len("file:")):
+        raise ValueError(f"Unsupported archive target: {target} (use table or file:<dir>)")
+
+
+def _created_in(start: datetime | None, end: datetime):
+    cond = Transaction.created_at < end
+    return cond if start is None else cond & (Transaction.created_at >= start)
+
+
+def list_periods() -> list[PeriodOut]:
+    with db_session() as s:
+        return [_period_out(p) for p in s.scalars(select(LedgerPeriod).order_by(LedgerPeriod.end))]
+
+
+def close_period(end: datetime, archive: str | None = None) -> PeriodOut:
+    """Close everything created before ``end`` that is not closed yet; optionally archive it.
+
+    ``end`` must be older than ``checkpoint_settle_seconds`` so no in-flight transaction can
+    still land in the period. Raises ``ValueError`` when it is too recent or not after the
+    last close.
+    """
+    end = as_utc(end)
+    settled = utcnow() - timedelta(seconds=settings.checkpoint_settle_seconds)
+    if end > settled:
+        raise ValueError(
+            f"Period end must be before {settled.isoformat()}; writes may be in flight"
+        )
+    if archive is not None:
+        _check_target(archive)
+
+    with db_session() as s:
+        prev = s.scalar(select(LedgerPeriod).order_by(LedgerPeriod.end.desc()).limit(1))
+        start = as_utc(prev.end) if prev else None
+        if start is not None and end <= start:
+            raise ValueError(f"Period end must be after the last close ({start.isoformat()})")
+
+        totals: dict[int, list] = {}
+        if prev is not None:
+            for ob in s.scalars(
+                select(PeriodOpeningBalance).where(PeriodOpeningBalance.period_id == prev.id)
+            ):
+                totals[ob.account_id] = [Decimal(ob.debits), Decimal(ob.credits), ob.posting_count]
+        postings = 0
+        for account_id, direction, total, count in _period_totals(s, start, end):
+            t = totals.setdefault(account_id, [ZERO, ZERO, 0])
+            t[0 if direction == "DEBIT" else 1] += Decimal(total)
+            t[2] += count
+            postings += count
+
+        period = LedgerPeriod(
+            start=start,
+            end=end,
+            transaction_count=s.scalar(
+                select(func.count()).select_from(Transaction).where(_created_in(start, end))
+            ),
+            posting_count=postings,
+        )
+        s.add(period)
+        s.flush()
+        if totals:
+            rows = [
+                {"account_id": a, "debits": d, "credits": c, "posting_count": n}
+                for a, (d, c, n) in sorted(totals.items())
+            ]
+            s.execute(insert(PeriodOpeningBalance), [r | {"period_id": period.id} for r in rows])
+            stmt = dialect_insert(s, BalanceCheckpoint).values([r | {"as_of": end} for r in rows])
+            s.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[BalanceCheckpoint.account_id, BalanceCheckpoint.as_of],
+                    set_={
+                        "debits": stmt.excluded.debits,
+                        "credits": stmt.excluded.credits,
+                        "posting_count": stmt.excluded.posting_count,
+                    },
+                )
+            )
+        if archive is not None:
+            _archive(s, period, archive)
+        out = _period_out(period)
+
+    LOG.info(
+        f"period closed: id={out.id} end={out.end} transactions={out.transaction_count} "
+        f"postings={out.posting_count} archive={out.archive}"
+    )
+    return out
+
+
+def archive_period(period_id: int, target: str) -> PeriodOut | None:
+    """Move a closed period's postings to ``target``; ``None`` for an unknown period.
+
+    Hot postings can go to ``table`` or ``file:<dir>``, table-archived ones on to a file.
+    Earlier periods must be archived first.
+    """
+    _check_target(target)
+    with db_session() as s:
+        period = s.get(LedgerPeriod, period_id)
+        if period is None:
+            return None
+        if period.archive is not None and (period.archive != "table" or target == "table"):
+            raise ValueError(f"Period {period_id} is already archived to {period.archive}")
+        _archive(s, period, target)
+        out = _period_out(period)
+    LOG.info(f"period archived: id={out.id} archive={out.archive}")
+    return out
+
+
+def _archive(s: Session, period: LedgerPeriod, target: str) -> None:
+    earlier = s.scalar(
+        select(func.count())
+        .select_from(LedgerPeriod)
+        .where(LedgerPeriod.end < period.end, LedgerPeriod.archive.is_(None))
+    )
+    if earlier:
+        raise ValueError(f"Archive the {earlier} earlier period(s) before period {period.id}")
+    start = as_utc(period.start) if period.start else None
+    end = as_utc(period.end)
+    tx_ids = select(Transaction.id).where(_created_in(start, end))
+    if target == "table":
+        s.execute(
+            insert(ArchivedPosting).from_select(
+                ["id", "period_id", "transaction_id", "account_id", "direction", "amount"],
+                select(
+                    Posting.id,
+                    literal(period.id),
+                    Posting.transaction_id,
+                    Posting.account_id,
+                    Posting.direction,
+                    Posting.amount,
+                ).where(Posting.transaction_id.in_(tx_ids)),
+            )
+        )
+        s.execute(delete(Posting).where(Posting.transaction_id.in_(tx_ids)))
+        period.archive = "table"
+        return
+
+    cold = period.archive == "table"
+    source = ArchivedPosting.__table__ if cold else None
+    path = _write_file(s, postings_stmt(source, created_from=start, created_to=end), target, period)
+    if cold:
+        s.execute(delete(ArchivedPosting).where(ArchivedPosting.period_id == period.id))
+    else:
+        s.execute(delete(Posting).where(Posting.transaction_id.in_(tx_ids)))
+    period.archive = f"file:{path}"
+
+
+def _write_file(s: Session, stmt, target: str, period: LedgerPeriod) -> str:
+    directory = target[len("file:") :]
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(
+        directory, f"postings-{period.id}-{as_utc(period.end):%Y%m%dT%H%M%SZ}.ndjson.gz"
+    )
+    # Rows are deleted only after the file is complete; a failed run leaves just the .tmp.
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wb") as f:
+        for chunk in _ndjson(stream_rows(s, stmt)):
+            f.write(chunk)
+    os.replace(tmp, path)
+    return os.path.abspath(path)
+
+
+def iter_period_postings(period: PeriodOut, batch_size: int | None = None) -> Iterator[list[tuple]]:
+    """Batches of the period's posting rows (export ``COLUMNS``) wherever they live."""
+    if period.archive and period.archive.startswith("file:"):
+        yield from _read_file(period.archive[len("file:") :], batch_size)
+        return
+    source = ArchivedPosting.__table__ if period.archive == "table" else None
+    start = datetime.fromisoformat(period.start) if period.start else None
+    stmt = postings_stmt(source, created_from=start, created_to=datetime.fromisoformat(period.end))
+    with db_session() as s:
+        yield from stream_rows(s, stmt, batch_size)
+
+
+def _read_file(path: str, batch_size: int | None = None) -> Iterator[list[tuple]]:
+    batch_size = batch_size or settings.export_batch_size
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        while lines := list(islice(f, batch_size)):
+            batch = []
+            for line in lines:
+                r = json.loads(line)
+                batch.append(
+                    (
+                        r["posting_id"],
+                        r["transaction_id"],
+                        r["reference"],
+                        r["description"],
+                        r["asset"],
+                        datetime.fromisoformat(r["created_at"]),
+                        r["account_id"],
+                        r["account_name"],
+                        r["direction"],
+                        Decimal(r["amount"]),
+                    )
+                )
+            yield batch
+
+
+def read_period(period_id: int, fmt: str = "ndjson") -> Iterator[bytes] | None:
+    """The period's postings encoded like an export; ``None`` for an unknown period."""
+    with db_session() as s:
+        period = s.get(LedgerPeriod, period_id)
+        if period is None:
+            return None
+        out = _period_out(period)
+    return encode(fmt, iter_period_postings(out))
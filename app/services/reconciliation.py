@@ -1,102 +1,560 @@
 from __future__ import annotations
 
 import json
-from collections import defaultdict
-from datetime import UTC, datetime
+import multiprocessing
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
 
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+from prometheus_client import Histogram
+from sqlalchemy import case, delete, func, select, text, update
+from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.logging import get_logger
-from app.db.session import db_session
-from app.models import Posting, ReconciliationRun, Transaction
+from app.db.session import db_session, engine, read_session
+from app.db.upsert import dialect_insert
+from app.models import (
+    Account,
+    Posting,
+    ReconciliationOpenItem,
+    ReconciliationRun,
+    StoredBankMovement,
+    Transaction,
+)
 from app.schemas import ReconciliationSummary
-from app.services.connectors.mock_bank import get_bank_feed
+from app.services.bank_sync import stored_movements, stored_movements_stmt, sync_feed
+from app.services.checkpoints import as_utc, closed_through
+from app.services.columnar import MovementColumns, load_movements
+from app.services.matching import MatchItem, MatchResult, match, match_columns
 
 LOG = get_logger("reconciliation")
 
+# Partition stages are summed over partitions, so with workers > 1 they can exceed wall time.
+STAGE_SECONDS = Histogram(
+    "reconciliation_stage_seconds",
+    "Time per reconciliation stage (load, fetch_bank, match, persist)",
+    ["stage"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 15, 60, 300, 1800, float("inf")),
+)
 
-def run_reconciliation() -> ReconciliationSummary:
-    """Compare internal cash movements to a bank feed.
+Progress = Callable[[int], None]
+Stages = dict[str, float]
 
-    This demo uses **amount-based multiset matching**:
-      - internal: net movement of any account whose name includes 'cash'
-      - bank: movements from the mock feed
-    In production you'd match on identifiers, timestamps, rails, fees, and use richer heuristics.
+
+@contextmanager
+def _timed(stages: Stages, stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[stage] = stages.get(stage, 0.0) + time.perf_counter() - start
+
+
+# Incremental runs read and advance shared watermarks; never run two at once. The thread
+# lock covers this process, the Postgres advisory lock every process sharing the database.
+_INCREMENTAL_LOCK = threading.Lock()
+_INCREMENTAL_LOCK_KEY = 0x66705F72_65636F6E  # "fp_recon"
+
+
+@contextmanager
+def _incremental_guard() -> Iterator[None]:
+    with _INCREMENTAL_LOCK:
+        if engine.dialect.name != "postgresql":
+            # No cross-process lock here; the open items' unique index still prevents duplicates.
+            yield
+            return
+        # Session-level lock on a connection of its own, held across the run's transactions.
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _INCREMENTAL_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": _INCREMENTAL_LOCK_KEY}
+                )
+
+
+@dataclass(frozen=True)
+class CashMovement:
+    transaction_id: int
+    reference: str
+    created_at: datetime
+    amount: Decimal
+
+
+@dataclass(frozen=True)
+class OpenItem:
+    side: str  # LEDGER/BANK
+    source_id: str  # transaction id or bank reference
+    reference: str
+    amount: Decimal
+    booked_at: datetime
+    open_id: int | None = None  # set when loaded from reconciliation_open_items
+
+
+def _cash_movements_stmt(
+    asset: str,
+    after_tx_id: int = 0,
+    account_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+):
+    """(reference, net amount, created_at, transaction id) per transaction that moves cash.
+
+    ``account_id`` restricts the netting to that one cash account; ``since`` and ``until`` to
+    transactions created in ``[since, until)``.
+
+    The netting happens in the database (one GROUP BY over postings joined to cash accounts)
+    and rows are streamed with a server-side cursor, so memory does not grow with the ledger.
     """
-    with db_session() as s:
-        run = ReconciliationRun(status="RUNNING")
-        s.add(run)
-        s.flush()
+    net = func.sum(case((Posting.direction == "DEBIT", Posting.amount), else_=-Posting.amount))
+    stmt = (
+        select(Transaction.reference, net, Transaction.created_at, Transaction.id)
+        .join(Posting, Posting.transaction_id == Transaction.id)
+        .join(Account, Account.id == Posting.account_id)
+        .where(
+            Transaction.asset == asset,
+            Transaction.id > after_tx_id,
+            func.lower(Account.name).contains("cash")
+            if account_id is None
+            else Posting.account_id == account_id,
+        )
+        .group_by(Transaction.id, Transaction.reference, Transaction.created_at)
+        .having(net != 0)
+        .order_by(Transaction.id)
+        .execution_options(yield_per=settings.reconciliation_stream_batch_size)
+    )
+    if since is not None:
+        stmt = stmt.where(Transaction.created_at >= since)
+    if until is not None:
+        stmt = stmt.where(Transaction.created_at < until)
+    return stmt
+
+
+def _cash_movements(
+    s: Session,
+    asset: str,
+    after_tx_id: int = 0,
+    account_id: int | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> Iterator[CashMovement]:
+    """Yield the net cash movement of every transaction that moves cash (see
+    ``_cash_movements_stmt``)."""
+    stmt = _cash_movements_stmt(asset, after_tx_id, account_id, since, until)
+    for reference, amount, created_at, tx_id in s.execute(stmt):
+        yield CashMovement(tx_id, reference, as_utc(created_at), Decimal(amount))
+
+
+def _window_seconds() -> float | None:
+    hours = settings.reconciliation_match_window_hours
+    return None if hours is None else hours * 3600
 
+
+def _summary(result: MatchResult, notes: list[str]) -> ReconciliationSummary:
+    return ReconciliationSummary(
+        matched=result.matched,
+        missing_in_bank=len(result.unmatched_ledger),
+        missing_in_ledger=len(result.unmatched_bank),
+        mismatched_amount=result.mismatched_amount,
+        passes=result.passes(),
+        notes=notes,
+    )
+
+
+def _match_item(o: OpenItem) -> MatchItem:
+    return MatchItem.of(o, o.reference, o.amount, o.booked_at)
+
+
+def _match_columns(ledger: MovementColumns, bank: MovementColumns) -> tuple[MatchResult, str]:
+    """Match two sides; returns the result and the matcher used."""
+    window = _window_seconds()
+    if settings.reconciliation_matcher == "numpy" and window is None:
         try:
-            txs = (
-                s.scalars(
-                    select(Transaction)
-                    .options(joinedload(Transaction.postings).joinedload(Posting.account))
-                    .where(Transaction.asset == "USD")
+            from app.services.matching_np import match_arrays
+        except ImportError:
+            LOG.warning("numpy matcher requested but numpy is not installed; using python")
+        else:
+            return match_arrays(*ledger.numpy(), *bank.numpy()), "numpy"
+    result = match_columns(
+        ledger.references,
+        ledger.amount_minor,
+        ledger.ts,
+        bank.references,
+        bank.amount_minor,
+        bank.ts,
+        window,
+    )
+    return result, "python"
+
+
+@dataclass(frozen=True)
+class Partition:
+    """A slice of the reconciliation: one asset, optionally narrowed to one cash account."""
+
+    asset: str
+    account_id: int | None = None
+    account_name: str | None = None
+
+    @property
+    def key(self) -> str:
+        return self.asset if self.account_id is None else f"{self.asset}:{self.account_id}"
+
+
+@dataclass
+class PartitionResult:
+    partition: Partition
+    summary: ReconciliationSummary
+    # Incremental runs only: changes to apply to the open set, and the new watermark.
+    closed_open_ids: list[int] = field(default_factory=list)
+    added_open_items: list[OpenItem] = field(default_factory=list)
+    watermark: dict | None = None
+    # Seconds spent loading inputs and matching; measured where the partition ran.
+    stages: Stages = field(default_factory=dict)
+
+
+def discover_partitions(s: Session) -> list[Partition]:
+    """One partition per asset holding a cash account, or per cash account when
+    ``reconciliation_partition_by`` is "account". ``reconciliation_assets`` restricts assets."""
+    stmt = (
+        select(Account.id, Account.name, Account.asset)
+        .where(func.lower(Account.name).contains("cash"))
+        .order_by(Account.asset, Account.id)
+    )
+    if settings.reconciliation_assets:
+        stmt = stmt.where(Account.asset.in_(settings.reconciliation_assets))
+    rows = s.execute(stmt).all()
+    if settings.reconciliation_partition_by == "account":
+        return [Partition(asset, acc_id, name) for acc_id, name, asset in rows]
+    return [Partition(asset) for asset in dict.fromkeys(asset for _, _, asset in rows)]
+
+
+def _bank_rows(s: Session, partition: Partition, **filters) -> Iterator[StoredBankMovement]:
+    return stored_movements(s, partition.asset, partition.account_name, **filters)
+
+
+def _reconcile_full(s: Session, partition: Partition) -> PartitionResult:
+    stages: Stages = {}
+    with _timed(stages, "load"):
+        # Closed periods were reconciled before they were closed; only open ones are read.
+        closed = closed_through(s)
+        # Both sides are kept as compact columns, filled straight from row tuples.
+        ledger = load_movements(
+            s.execute(
+                _cash_movements_stmt(partition.asset, account_id=partition.account_id, since=closed)
+            )
+        )
+        since = datetime.now(UTC) - timedelta(days=settings.reconciliation_window_days)
+        if closed is not None:
+            since = max(since, closed)
+        bank_stmt = stored_movements_stmt(partition.asset, partition.account_name, since=since)
+        bank = load_movements(
+            s.execute(
+                bank_stmt.with_only_columns(
+                    StoredBankMovement.reference,
+                    StoredBankMovement.amount,
+                    StoredBankMovement.booked_at,
                 )
-                .unique()
-                .all()
             )
+        )
+    with _timed(stages, "match"):
+        result, matcher = _match_columns(ledger, bank)
+    return PartitionResult(
+        partition,
+        _summary(
+            result,
+            notes=[
+                f"internal_cash_movements={len(ledger)} bank_movements={len(bank)} matcher={matcher}"
+            ],
+        ),
+        stages=stages,
+    )
 
-            internal_amounts: list[float] = []
-            for tx in txs:
-                net = 0.0
-                for p in tx.postings:
-                    if "cash" in p.account.name.lower():
-                        amt = float(p.amount)
-                        net += amt if p.direction == "DEBIT" else -amt
-                if abs(net) > 1e-9:
-                    internal_amounts.append(net)
-
-            bank = get_bank_feed("USD", days=14)
-            bank_amounts = [float(b.amount) for b in bank]
-
-            def multiset(xs):
-                m = defaultdict(int)
-                for x in xs:
-                    m[round(x, 2)] += 1
-                return m
-
-            im = multiset(internal_amounts)
-            bm = multiset(bank_amounts)
-
-            matched = 0
-            missing_in_bank = 0
-            missing_in_ledger = 0
-
-            for amt, cnt in im.items():
-                m = min(cnt, bm.get(amt, 0))
-                matched += m
-                if cnt > m:
-                    missing_in_bank += cnt - m
-
-            for amt, cnt in bm.items():
-                m = min(cnt, im.get(amt, 0))
-                if cnt > m:
-                    missing_in_ledger += cnt - m
-
-            summary = ReconciliationSummary(
-                matched=matched,
-                missing_in_bank=missing_in_bank,
-                missing_in_ledger=missing_in_ledger,
-                mismatched_amount=0,
-                notes=[
-                    "Matching is amount-based (demo). Upgrade to reference/date/rail matching heuristics.",
-                    f"internal_cash_movements={len(internal_amounts)} bank_movements={len(bank_amounts)}",
-                ],
+
+def _last_watermarks(s: Session) -> dict[str, dict]:
+    raw = s.scalar(
+        select(ReconciliationRun.watermark_json)
+        .where(
+            ReconciliationRun.mode == "INCREMENTAL",
+            ReconciliationRun.status == "SUCCEEDED",
+        )
+        .order_by(ReconciliationRun.id.desc())
+        .limit(1)
+    )
+    return json.loads(raw) if raw else {}
+
+
+def _reconcile_incremental(s: Session, partition: Partition, mark: dict) -> PartitionResult:
+    """Match entries past the partition's watermarks against its persisted open set.
+
+    Nothing is written here; the caller applies the returned open-set changes so that all
+    partitions of a run commit together. Ledger entries are only taken once they are older
+    than ``checkpoint_settle_seconds``: ids are assigned before commit, so a lower id can
+    still become visible after a higher one and would fall behind the watermark.
+    """
+    last_tx_id = mark.get("ledger_tx_id", 0)
+    last_bank_id = mark.get("bank_movement_id", 0)
+    # Watermarks written before the bank store existed only carry a booked_at.
+    legacy_booked = mark.get("bank_booked_at") if "bank_movement_id" not in mark else None
+    legacy_booked_at = as_utc(datetime.fromisoformat(legacy_booked)) if legacy_booked else None
+
+    settled = datetime.now(UTC) - timedelta(seconds=settings.checkpoint_settle_seconds)
+
+    stages: Stages = {}
+    with _timed(stages, "load"):
+        new_ledger = [
+            OpenItem("LEDGER", str(m.transaction_id), m.reference, m.amount, m.created_at)
+            for m in _cash_movements(
+                s,
+                partition.asset,
+                after_tx_id=last_tx_id,
+                account_id=partition.account_id,
+                until=settled,
+            )
+        ]
+        new_bank: list[OpenItem] = []
+        for b in _bank_rows(s, partition, after_id=last_bank_id):
+            last_bank_id = max(last_bank_id, b.id)
+            if legacy_booked_at is None or as_utc(b.booked_at) > legacy_booked_at:
+                new_bank.append(
+                    OpenItem("BANK", b.reference, b.reference, b.amount, as_utc(b.booked_at))
+                )
+        open_items = [
+            OpenItem(o.side, o.source_id, o.reference, o.amount, as_utc(o.booked_at), o.id)
+            for o in s.scalars(
+                select(ReconciliationOpenItem).where(
+                    ReconciliationOpenItem.asset == partition.asset,
+                    ReconciliationOpenItem.account_id.is_(None)
+                    if partition.account_id is None
+                    else ReconciliationOpenItem.account_id == partition.account_id,
+                )
             )
+        ]
+    with _timed(stages, "match"):
+        result = match(
+            [_match_item(o) for o in open_items if o.side == "LEDGER"]
+            + [_match_item(o) for o in new_ledger],
+            [_match_item(o) for o in open_items if o.side == "BANK"]
+            + [_match_item(o) for o in new_bank],
+            _window_seconds(),
+        )
+    rest = [m.key for m in result.unmatched_ledger] + [m.key for m in result.unmatched_bank]
+    still_open = {o.open_id for o in rest if o.open_id is not None}
+
+    return PartitionResult(
+        partition,
+        _summary(
+            result,
+            notes=[
+                f"new_ledger={len(new_ledger)} new_bank={len(new_bank)} "
+                f"open_before={len(open_items)} open_after={len(rest)}"
+            ],
+        ),
+        closed_open_ids=[o.open_id for o in open_items if o.open_id not in still_open],
+        added_open_items=[o for o in rest if o.open_id is None],
+        watermark={
+            "ledger_tx_id": max([last_tx_id] + [int(o.source_id) for o in new_ledger]),
+            "bank_movement_id": last_bank_id,
+        },
+        stages=stages,
+    )
+
+
+def reconcile_partition(partition: Partition, mode: str, mark: dict) -> PartitionResult:
+    """Reconcile one partition in its own read-only session; safe to run in a worker process."""
+    session = read_session if settings.reconciliation_read_replica else db_session
+    with session() as s:
+        if mode == "incremental":
+            return _reconcile_incremental(s, partition, mark)
+        return _reconcile_full(s, partition)
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs threads and holds pooled DB connections is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.reconciliation_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _reconcile_partitions(
+    partitions: list[Partition], mode: str, marks: dict[str, dict], progress: Progress
+) -> list[PartitionResult]:
+    results: list[PartitionResult] = []
+
+    def done(r: PartitionResult) -> None:
+        results.append(r)
+        progress(10 + 80 * len(results) // len(partitions))
+
+    if settings.reconciliation_workers <= 1 or len(partitions) <= 1:
+        for p in partitions:
+            done(reconcile_partition(p, mode, marks.get(p.key, {})))
+    else:
+        pool = _get_pool()
+        futures = [
+            pool.submit(reconcile_partition, p, mode, marks.get(p.key, {})) for p in partitions
+        ]
+        for fut in as_completed(futures):
+            done(fut.result())
+    return sorted(results, key=lambda r: r.partition.key)
+
+
+def _merge(results: list[PartitionResult], mode: str) -> ReconciliationSummary:
+    passes: Counter[str] = Counter()
+    for r in results:
+        passes.update(r.summary.passes)
+    head = (
+        "Incremental run: new entries matched against the open set."
+        if mode == "incremental"
+        else "Matching passes: exact reference, then amount within the booked_at window."
+    )
+    return ReconciliationSummary(
+        matched=sum(r.summary.matched for r in results),
+        missing_in_bank=sum(r.summary.missing_in_bank for r in results),
+        missing_in_ledger=sum(r.summary.missing_in_ledger for r in results),
+        mismatched_amount=sum(r.summary.mismatched_amount for r in results),
+        passes=dict(passes),
+        notes=[head] + [f"{r.partition.key}: {n}" for r in results for n in r.summary.notes],
+        partitions={r.partition.key: r.summary for r in results},
+    )
+
+
+def _apply_incremental(
+    s: Session, run: ReconciliationRun, results: list[PartitionResult], marks: dict[str, dict]
+) -> dict[str, dict]:
+    closed = [i for r in results for i in r.closed_open_ids]
+    if closed:
+        s.execute(delete(ReconciliationOpenItem).where(ReconciliationOpenItem.id.in_(closed)))
+    added = [
+        {
+            "side": o.side,
+            "asset": r.partition.asset,
+            "account_id": r.partition.account_id,
+            "source_id": o.source_id,
+            "reference": o.reference,
+            "amount": o.amount,
+            "booked_at": o.booked_at,
+            "run_id": run.id,
+        }
+        for r in results
+        for o in r.added_open_items
+    ]
+    if added:
+        # A duplicate means another process already recorded the entry; keep that row.
+        s.execute(dialect_insert(s, ReconciliationOpenItem).on_conflict_do_nothing(), added)
+    return marks | {r.partition.key: r.watermark for r in results}
 
+
+def create_run(mode: str, status: str = "QUEUED") -> int:
+    with db_session() as s:
+        run = ReconciliationRun(status=status, mode=mode.upper(), progress=0)
+        s.add(run)
+        s.flush()
+        return run.id
+
+
+def _update_run(run_id: int, **values) -> None:
+    with db_session() as s:
+        s.execute(update(ReconciliationRun).where(ReconciliationRun.id == run_id).values(**values))
+
+
+def run_reconciliation(mode: str = "full", run_id: int | None = None) -> ReconciliationSummary:
+    """Compare internal cash movements to a bank feed.
+
+    The run is split into partitions (see ``discover_partitions``), reconciled in parallel
+    across ``reconciliation_workers`` processes and merged into one summary. Within a
+    partition, matching runs in two passes (see ``app.services.matching``):
+      - internal: net movement of any account whose name includes 'cash'
+      - bank: movements stored in ``bank_movements``, synced from the ``bank_connector`` feed
+        first unless ``reconciliation_sync_bank`` is off
+      - pass 1 pairs items with the same reference, pass 2 pairs equal amounts booked within
+        ``reconciliation_match_window_hours`` of each other
+
+    ``mode="incremental"`` only processes ledger and bank entries past the previous
+    incremental run's watermarks, matching them against the items it left unmatched.
+
+    ``run_id`` picks up a run created ahead of time (e.g. a queued job); otherwise a new run
+    row is created. Status and progress are committed as the run advances; a run waiting for
+    another incremental run stays QUEUED until it gets the guard.
+    """
+    if run_id is None:
+        run_id = create_run(mode)
+    if mode == "incremental":
+        with _incremental_guard():
+            return _run(mode, run_id)
+    return _run(mode, run_id)
+
+
+def _observe_stages(run_id: int, stages: Stages) -> None:
+    for stage, seconds in stages.items():
+        STAGE_SECONDS.labels(stage=stage).observe(seconds)
+    timings = " ".join(f"{stage}={seconds:.3f}s" for stage, seconds in stages.items())
+    LOG.info(f"reconciliation stages: run_id={run_id} {timings}")
+
+
+def _run(mode: str, run_id: int) -> ReconciliationSummary:
+    def progress(pct: int) -> None:
+        _update_run(run_id, progress=pct)
+
+    # started_at is reset here so it excludes time spent queued or waiting for the guard.
+    _update_run(run_id, status="RUNNING", started_at=datetime.now(UTC))
+    stages: Stages = {}
+    try:
+        with _timed(stages, "load"), db_session() as s:
+            partitions = discover_partitions(s)
+            marks = _last_watermarks(s) if mode == "incremental" else {}
+        if settings.reconciliation_sync_bank:
+            with _timed(stages, "fetch_bank"):
+                for p in partitions:
+                    sync_feed(p.asset, p.account_name)
+        progress(10)
+        results = _reconcile_partitions(partitions, mode, marks, progress)
+        for r in results:
+            for stage, seconds in r.stages.items():
+                stages[stage] = stages.get(stage, 0.0) + seconds
+
+        with _timed(stages, "persist"), db_session() as s:
+            run = s.get(ReconciliationRun, run_id)
+            assert run
+            if mode == "incremental":
+                run.watermark_json = json.dumps(_apply_incremental(s, run, results, marks))
+            summary = _merge(results, mode)
             run.status = "SUCCEEDED"
+            run.progress = 100
             run.finished_at = datetime.now(UTC)
             run.summary_json = json.dumps(summary.model_dump())
-            s.add(run)
-            return summary
-        except Exception as e:
-            LOG.error(f"reconciliation failed: {e}", exc_info=True)
-            run.status = "FAILED"
-            run.finished_at = datetime.now(UTC)
-            run.summary_json = json.dumps({"error": str(e)})
-            s.add(run)
-            raise
+        _observe_stages(run_id, stages)
+        return summary
+    except Exception as e:
+        LOG.error(f"reconciliation failed: {e}", exc_info=True)
+        # The work session rolled back; record the failure separately so it sticks.
+        _update_run(
+            run_id,
+            status="FAILED",
+            finished_at=datetime.now(UTC),
+            summary_json=json.dumps({"error": str(e)}),
+        )
+        raise
@@ -0,0 +1,36 @@
+"""Async reconciliation run lookups and enqueueing for the ``async`` API stack.
+
+Runs themselves stay on the background executor (CPU-bound matching, optional process
+pool); only the request-path reads go through the async engine.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import select
+
+from app.db.async_session import async_db_session
+from app.models import ReconciliationRun
+from app.schemas import ReconciliationRunOut
+from app.services import jobs
+
+
+async def enqueue_reconciliation(mode: str = "full") -> ReconciliationRunOut:
+    """See ``jobs.enqueue_reconciliation``; the short insert runs off the event loop."""
+    return await asyncio.to_thread(jobs.enqueue_reconciliation, mode)
+
+
+async def get_run(run_id: int) -> ReconciliationRunOut | None:
+    async with async_db_session() as s:
+        run = await s.get(ReconciliationRun, run_id)
+        return jobs._run_out(run) if run else None
+
+
+async def list_runs(limit: int = 20) -> list[ReconciliationRunOut]:
+    limit = max(1, min(limit, 200))
+    async with async_db_session() as s:
+        runs = await s.scalars(
+            select(ReconciliationRun).order_by(ReconciliationRun.id.desc()).limit(limit)
+        )
+        return [jobs._run_out(r) for r in runs]
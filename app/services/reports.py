@@ -0,0 +1,288 @@
+"""Trial balance and per-account-type rollups, aggregated in SQL and cached per ledger version.
+
+Without a date filter the per-account totals come from ``account_balances`` (maintained on
+every write), so a report reads one row per account. With ``created_from``/``created_to``
+(inclusive/exclusive, on the transaction's ``created_at``) postings are grouped by account
+in the database, including those archived to ``archived_postings`` when the range reaches
+closed periods. Either way only one row per account (or per asset and type) leaves it. With
+``report_engine = "columnar"`` a ranged report instead loads the range into compact
+columns (``app.services.columnar``) and sums them in-process.
+
+Results are cached under a ledger version: the highest transaction id, the total posting
+count from ``account_balances`` and the highest account id. The first two only grow and
+change with every committed entry (the count also catches an older id committing late).
+The account id changes when an account is opened: reports list every account, even one
+without postings, so a new account makes a cached report incomplete. An unchanged version
+therefore means the cached report is still exact.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from prometheus_client import Counter
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import read_session
+from app.models import Account, AccountBalance, Transaction
+from app.schemas import (
+    AccountBalanceOut,
+    AccountTypeRollupOut,
+    AccountTypeTotal,
+    AssetTotal,
+    TrialBalanceOut,
+)
+from app.services.balances import ZERO, _balance_out
+from app.services.checkpoints import as_utc, posting_source
+from app.services.columnar import account_totals, from_micro, load_postings
+
+REPORT_CACHE_LOOKUPS = Counter("report_cache_lookups_total", "Report cache lookups", ["result"])
+
+_QUANT = Decimal("0.000001")  # scale of Posting.amount
+
+
+class ReportCache:
+    """Process-local LRU of report parameters -> (ledger version, result)."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: OrderedDict[tuple, tuple[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, version: str) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] != version:
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def put(self, key: tuple, version: str, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (version, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+REPORT_CACHE = ReportCache(settings.report_cache_size)
+
+
+def ledger_version(s: Session) -> str:
+    """Changes whenever a transaction, posting or account is added (accounts are never
+    deleted, so the highest id tracks them)."""
+    max_id = s.scalar(select(func.max(Transaction.id))) or 0
+    postings = s.scalar(select(func.sum(AccountBalance.posting_count))) or 0
+    max_account_id = s.scalar(select(func.max(Account.id))) or 0
+    return f"{max_id}:{postings}:{max_account_id}"
+
+
+def _account_totals(s: Session, created_from: datetime | None, created_to: datetime | None):
+    """Subquery of (account_id, debits, credits, posting_count)."""
+    if created_from is None and created_to is None:
+        return select(
+            AccountBalance.account_id,
+            AccountBalance.debits.label("debits"),
+            AccountBalance.credits.label("credits"),
+            AccountBalance.posting_count.label("posting_count"),
+        ).subquery()
+    p = posting_source(s, created_from, created_to).c
+    stmt = select(
+        p.account_id,
+        func.sum(case((p.direction == "DEBIT", p.amount), else_=ZERO)).label("debits"),
+        func.sum(case((p.direction == "CREDIT", p.amount), else_=ZERO)).label("credits"),
+        func.count().label("posting_count"),
+    ).join(Transaction, Transaction.id == p.transaction_id)
+    if created_from is not None:
+        stmt = stmt.where(Transaction.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Transaction.created_at < created_to)
+    return stmt.group_by(p.account_id).subquery()
+
+
+def _columnar(created_from: datetime | None, created_to: datetime | None) -> bool:
+    ranged = created_from is not None or created_to is not None
+    return ranged and settings.report_engine == "columnar"
+
+
+def _account_rows(
+    s: Session, asset: str | None, created_from: datetime | None, created_to: datetime | None
+) -> Iterator[tuple]:
+    """(id, name, asset, type, debits, credits, posting_count) per account."""
+    if _columnar(created_from, created_to):
+        cols = load_postings(s, asset, created_from, created_to)
+        totals = account_totals(cols)
+        accounts = cols.accounts
+        for code in sorted(range(len(accounts)), key=lambda c: (accounts.assets[c], c)):
+            if asset and accounts.assets[code] != asset:
+                continue
+            acc_id = accounts.ids[code]
+            debits, credits, count = totals.get(acc_id, (0, 0, 0))
+            yield (
+                acc_id,
+                accounts.names[code],
+                accounts.assets[code],
+                accounts.types[code],
+                from_micro(debits),
+                from_micro(credits),
+                count,
+            )
+        return
+    totals = _account_totals(s, created_from, created_to)
+    stmt = (
+        select(
+            Account.id,
+            Account.name,
+            Account.asset,
+            Account.type,
+            func.coalesce(totals.c.debits, ZERO),
+            func.coalesce(totals.c.credits, ZERO),
+            func.coalesce(totals.c.posting_count, 0),
+        )
+        .select_from(Account)
+        .outerjoin(totals, totals.c.account_id == Account.id)
+        .order_by(Account.asset, Account.id)
+    )
+    if asset:
+        stmt = stmt.where(Account.asset == asset)
+    yield from s.execute(stmt)
+
+
+def _type_rows(
+    s: Session, asset: str | None, created_from: datetime | None, created_to: datetime | None
+) -> Iterator[tuple]:
+    """(asset, type, debits, credits, account_count, posting_count) per asset and type."""
+    if _columnar(created_from, created_to):
+        groups: dict[tuple[str, str], list] = {}
+        for _, _, acc_asset, acc_type, debits, credits, count in _account_rows(
+            s, asset, created_from, created_to
+        ):
+            g = groups.setdefault((acc_asset, acc_type), [ZERO, ZERO, 0, 0])
+            g[0] += debits
+            g[1] += credits
+            g[2] += 1
+            g[3] += count
+        for key in sorted(groups):
+            yield (*key, *groups[key])
+        return
+    totals = _account_totals(s, created_from, created_to)
+    stmt = (
+        select(
+            Account.asset,
+            Account.type,
+            func.sum(func.coalesce(totals.c.debits, ZERO)),
+            func.sum(func.coalesce(totals.c.credits, ZERO)),
+            func.count(Account.id),
+            func.sum(func.coalesce(totals.c.posting_count, 0)),
+        )
+        .select_from(Account)
+        .outerjoin(totals, totals.c.account_id == Account.id)
+        .group_by(Account.asset, Account.type)
+        .order_by(Account.asset, Account.type)
+    )
+    if asset:
+        stmt = stmt.where(Account.asset == asset)
+    yield from s.execute(stmt)
+
+
+def _amount(value) -> Decimal:
+    return Decimal(value).quantize(_QUANT)
+
+
+def _iso(dt: datetime | None) -> str | None:
+    return as_utc(dt).isoformat() if dt else None
+
+
+def _cached(key: tuple, build):
+    with read_session() as s:
+        version = ledger_version(s)
+        hit = REPORT_CACHE.get(key, version)
+        REPORT_CACHE_LOOKUPS.labels(result="miss" if hit is None else "hit").inc()
+        if hit is not None:
+            return hit
+        result = build(s, version)
+    REPORT_CACHE.put(key, version, result)
+    return result
+
+
+def trial_balance(
+    asset: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> TrialBalanceOut:
+    """Debit and credit totals for every account, plus per-asset totals that must agree."""
+
+    def build(s: Session, version: str) -> TrialBalanceOut:
+        lines: list[AccountBalanceOut] = []
+        by_asset: dict[str, list[Decimal]] = {}
+        for acc_id, name, acc_asset, acc_type, debits, credits, count in _account_rows(
+            s, asset, created_from, created_to
+        ):
+            line = _balance_out(
+                (acc_id, name, acc_asset, acc_type, _amount(debits), _amount(credits), count)
+            )
+            lines.append(line)
+            t = by_asset.setdefault(acc_asset, [ZERO, ZERO])
+            t[0] += line.debits
+            t[1] += line.credits
+        return TrialBalanceOut(
+            asset=asset,
+            created_from=_iso(created_from),
+            created_to=_iso(created_to),
+            ledger_version=version,
+            accounts=lines,
+            totals=[
+                AssetTotal(asset=a, debits=d, credits=c, balanced=d == c)
+                for a, (d, c) in by_asset.items()
+            ],
+        )
+
+    return _cached(("trial_balance", asset, created_from, created_to), build)
+
+
+def account_type_rollup(
+    asset: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> AccountTypeRollupOut:
+    """Totals per asset and account type (ASSET, LIABILITY, INCOME, EXPENSE, EQUITY)."""
+
+    def build(s: Session, version: str) -> AccountTypeRollupOut:
+        types = []
+        for acc_asset, acc_type, debits, credits, accounts, postings in _type_rows(
+            s, asset, created_from, created_to
+        ):
+            debits, credits = _amount(debits), _amount(credits)
+            types.append(
+                AccountTypeTotal(
+                    asset=acc_asset,
+                    type=acc_type,
+                    debits=debits,
+                    credits=credits,
+                    balance=debits - credits,
+                    account_count=accounts,
+                    posting_count=postings,
+                )
+            )
+        return AccountTypeRollupOut(
+            asset=asset,
+            created_from=_iso(created_from),
+            created_to=_iso(created_to),
+            ledger_version=version,
+            types=types,
+        )
+
+    return _cached(("account_types", asset, created_from, created_to), build)
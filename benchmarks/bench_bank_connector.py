@@ -0,0 +1,81 @@
+"""Throughput of ``HttpBankConnector`` against the local stand-in bank.
+
+    python benchmarks/bench_bank_connector.py --rows 500000 --page-size 5000 --concurrency 8
+
+Starts the stand-in server on a free local port, streams the whole feed once per
+concurrency level and prints rows/second.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import uvicorn
+
+from app.services.connectors.http_bank import HttpBankConnector
+from app.services.connectors.standin_bank import create_app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(rows: int) -> tuple[uvicorn.Server, str]:
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(rows), host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def _drain(base_url: str, page_size: int, concurrency: int) -> int:
+    n = 0
+    async with HttpBankConnector(
+        base_url, page_size=page_size, concurrency=concurrency
+    ) as connector:
+        async for _ in connector.iter_movements("USD"):
+            n += 1
+    return n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    server, base_url = _serve(args.rows)
+    try:
+        for concurrency in args.concurrency:
+            t0 = time.perf_counter()
+            n = asyncio.run(_drain(base_url, args.page_size, concurrency))
+            elapsed = time.perf_counter() - t0
+            assert n == args.rows, (n, args.rows)
+            print(
+                json.dumps(
+                    {
+                        "rows": n,
+                        "page_size": args.page_size,
+                        "concurrency": concurrency,
+                        "seconds": round(elapsed, 3),
+                        "rows_per_sec": round(n / elapsed),
+                    }
+                )
+            )
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
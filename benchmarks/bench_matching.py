@@ -0,0 +1,67 @@
+"""Compare the pure-Python and NumPy matchers on synthetic amount-only input.
+
+    python benchmarks/bench_matching.py --rows 10000000
+
+Both matchers see the same rows; the script checks their results agree and prints timings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+
+from app.services.matching import MatchItem, match
+from app.services.matching_np import columns, match_arrays
+
+
+def synth(rows: int, seed: int) -> tuple[list, list]:
+    rng = random.Random(seed)
+    ledger = [(f"INV-{i}", rng.randint(-50_000, 50_000), rng.random() * 1e7) for i in range(rows)]
+    # A third of the bank rows carry the ledger reference, the rest only share amounts.
+    bank = [
+        (
+            f"INV-{i}" if i % 3 == 0 else f"BANK-{i}",
+            rng.randint(-50_000, 50_000),
+            rng.random() * 1e7,
+        )
+        for i in range(rows)
+    ]
+    return ledger, bank
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-python", action="store_true", help="Only time the NumPy path")
+    args = parser.parse_args()
+
+    ledger, bank = synth(args.rows, args.seed)
+    out: dict = {"rows": args.rows}
+
+    t0 = time.perf_counter()
+    cols = columns(ledger), columns(bank)
+    out["numpy_columns_s"] = round(time.perf_counter() - t0, 3)
+    t0 = time.perf_counter()
+    np_result = match_arrays(*cols[0], *cols[1])
+    out["numpy_match_s"] = round(time.perf_counter() - t0, 3)
+    out["passes"] = np_result.passes()
+
+    if not args.skip_python:
+        items = (
+            [MatchItem(i, *r) for i, r in enumerate(ledger)],
+            [MatchItem(i, *r) for i, r in enumerate(bank)],
+        )
+        t0 = time.perf_counter()
+        py_result = match(*items, window_seconds=None)
+        out["python_match_s"] = round(time.perf_counter() - t0, 3)
+        assert py_result.passes() == np_result.passes(), "matchers disagree"
+        out["speedup"] = round(out["python_match_s"] / out["numpy_match_s"], 1)
+
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Seeded synthetic ledger and bank feed for benchmarks.
+
+    python benchmarks/synthetic.py --transactions 1000000 --out /tmp/synthetic
+
+writes ``ledger.ndjson`` (the ``fp-ledger import`` format) and ``bank.ndjson`` (one stored
+bank movement per line). ``load()`` puts the same data straight into the configured
+database: the ledger through the bulk importer, the feed into ``bank_movements``.
+
+Every ledger entry moves cash in or out of one ``Bench Cash <asset>`` account. The bank feed
+mirrors those movements with controlled noise (see ``Noise``). Output depends only on the
+seed, the size and the anchor time, and is generated as a stream, so 10M transactions need
+no more memory than 10k.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+ASSETS = ("USD", "EUR", "GBP")
+
+
+@dataclass(frozen=True)
+class Noise:
+    missing: float = 0.02  # ledger cash movements absent from the bank feed
+    duplicates: float = 0.01  # movements the bank books twice (the copy has its own reference)
+    extra: float = 0.01  # bank-only movements with no ledger entry
+    skew_hours: float = 6.0  # std dev of booked_at - created_at
+    own_reference: float = 0.3  # share of bank rows carrying a bank reference, not the ledger's
+
+
+def account_names(asset: str) -> dict[str, str]:
+    return {
+        "cash": f"Bench Cash {asset}",
+        "revenue": f"Bench Revenue {asset}",
+        "expenses": f"Bench Expenses {asset}",
+    }
+
+
+def ledger_entries(n: int, seed: int, anchor: datetime, span_days: float = 13) -> Iterator[dict]:
+    """``n`` balanced entries spread evenly over ``span_days`` before ``anchor``."""
+    rng = random.Random(seed)
+    start = anchor - timedelta(days=span_days)
+    step = timedelta(days=span_days) / max(n, 1)
+    for i in range(n):
+        asset = ASSETS[i % len(ASSETS)]
+        names = account_names(asset)
+        amount = Decimal(rng.randint(100, 5_000_000)).scaleb(-2)
+        if rng.random() < 0.6:
+            debit, credit = names["cash"], names["revenue"]
+        else:
+            debit, credit = names["expenses"], names["cash"]
+        yield {
+            "idempotency_key": f"syn-{seed}-{i}",
+            "reference": f"SYN-{seed}-{i}",
+            "asset": asset,
+            "created_at": (start + step * i).isoformat(),
+            "postings": [
+                {"account_name": debit, "direction": "DEBIT", "amount": str(amount)},
+                {"account_name": credit, "direction": "CREDIT", "amount": str(amount)},
+            ],
+        }
+
+
+def bank_rows(entries: Iterator[dict], seed: int, noise: Noise) -> Iterator[dict]:
+    """Bank movements (``reference, currency, amount, booked_at``) mirroring the cash legs."""
+    rng = random.Random(seed + 1)
+    for i, e in enumerate(entries):
+        cash = account_names(e["asset"])["cash"]
+        debit = e["postings"][0]
+        amount = Decimal(debit["amount"])
+        signed = amount if debit["account_name"] == cash else -amount
+        created_at = datetime.fromisoformat(e["created_at"])
+        if rng.random() >= noise.missing:
+            own = rng.random() < noise.own_reference
+            row = {
+                "reference": f"BNK-{seed}-{i}" if own else e["reference"],
+                "currency": e["asset"],
+                "amount": str(signed),
+                "booked_at": (
+                    created_at + timedelta(hours=rng.gauss(0, noise.skew_hours))
+                ).isoformat(),
+            }
+            yield row
+            if rng.random() < noise.duplicates:
+                yield row | {"reference": f"DUP-{seed}-{i}"}
+        if rng.random() < noise.extra:
+            yield {
+                "reference": f"XTR-{seed}-{i}",
+                "currency": e["asset"],
+                "amount": str(Decimal(rng.randint(-500_000, 500_000) or 1).scaleb(-2)),
+                "booked_at": created_at.isoformat(),
+            }
+
+
+def write_files(
+    out_dir: str, n: int, seed: int, anchor: datetime, noise: Noise | None = None
+) -> tuple[str, str]:
+    noise = noise or Noise()
+    os.makedirs(out_dir, exist_ok=True)
+    ledger_path = os.path.join(out_dir, "ledger.ndjson")
+    bank_path = os.path.join(out_dir, "bank.ndjson")
+    with open(ledger_path, "w", encoding="utf-8") as f:
+        for e in ledger_entries(n, seed, anchor):
+            f.write(json.dumps(e, separators=(",", ":")) + "\n")
+    with open(bank_path, "w", encoding="utf-8") as f:
+        for row in bank_rows(ledger_entries(n, seed, anchor), seed, noise):
+            f.write(json.dumps(row, separators=(",", ":")) + "\n")
+    return ledger_path, bank_path
+
+
+def load(
+    out_dir: str,
+    n: int,
+    seed: int,
+    anchor: datetime,
+    noise: Noise | None = None,
+    batch: int = 5000,
+) -> dict:
+    """Create the bench accounts, bulk-import the ledger and store the bank feed.
+
+    Uses the configured database (``FP_DATABASE_URL``); returns row counts.
+    """
+    from app.db.session import db_session
+    from app.models import utcnow
+    from app.schemas import AccountCreate
+    from app.services.bank_sync import _insert_new, feed_provider
+    from app.services.importer import import_file
+    from app.services.ledger import create_account, list_accounts
+
+    existing = {a.name for a in list_accounts()}
+    for asset in ASSETS:
+        for kind, name in account_names(asset).items():
+            if name not in existing:
+                type_ = {"cash": "ASSET", "revenue": "INCOME", "expenses": "EXPENSE"}[kind]
+                create_account(AccountCreate(name=name, asset=asset, type=type_))
+
+    ledger_path, bank_path = write_files(out_dir, n, seed, anchor, noise)
+    report = import_file(ledger_path, emit_events=False, resume=False)
+
+    stored = 0
+    now = utcnow()
+    with db_session() as s, open(bank_path, encoding="utf-8") as f:
+        rows: list[dict] = []
+        for line in f:
+            m = json.loads(line)
+            rows.append(
+                {
+                    "provider": feed_provider(m["currency"]),
+                    "reference": m["reference"],
+                    "currency": m["currency"],
+                    "amount": Decimal(m["amount"]),
+                    "booked_at": datetime.fromisoformat(m["booked_at"]),
+                    "synced_at": now,
+                }
+            )
+            if len(rows) >= batch:
+                stored += _insert_new(s, rows)
+                rows.clear()
+        if rows:
+            stored += _insert_new(s, rows)
+    return {
+        "transactions": report.created,
+        "import_seconds": report.seconds,
+        "bank_movements": stored,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="./synthetic")
+    parser.add_argument("--anchor", type=datetime.fromisoformat, default=None)
+    args = parser.parse_args()
+    anchor = args.anchor or datetime.now(UTC)
+    print(json.dumps(write_files(args.out, args.transactions, args.seed, anchor)))
+
+
+if __name__ == "__main__":
+    main()
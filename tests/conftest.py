@@ -33,3 +33,20 @@ def _init_db_for_tests():
 
     if DB_PATH.exists():
         DB_PATH.unlink()
+
+
+@pytest.fixture
+def standin_bank():
+    """Factory for an ``HttpBankConnector`` wired in-process to a stand-in bank app."""
+    import httpx
+
+    from app.services.connectors.http_bank import HttpBankConnector
+    from app.services.connectors.standin_bank import create_app
+
+    def make(rows=1000, fail_every=0, anchor=None, **connector_kwargs):
+        transport = httpx.ASGITransport(app=create_app(rows, fail_every, anchor))
+        return HttpBankConnector(
+            "http://bank.test", transport=transport, backoff_seconds=0, **connector_kwargs
+        )
+
+    return make
@@ -0,0 +1,62 @@
+import uuid
+
+import pytest
+
+from app.core.instrumentation import track_queries
+from app.schemas import AccountCreate, TransactionIn
+from app.services.account_cache import ACCOUNT_CACHE, AccountCache, AccountRef
+from app.services.ledger import create_account, create_transaction
+
+
+def _entry(debit: str, credit: str) -> TransactionIn:
+    return TransactionIn(
+        reference=uuid.uuid4().hex[:16],
+        asset="ISK",
+        postings=[
+            {"account_name": debit, "direction": "DEBIT", "amount": "4.00"},
+            {"account_name": credit, "direction": "CREDIT", "amount": "4.00"},
+        ],
+    )
+
+
+def _accounts() -> tuple[str, str]:
+    suffix = uuid.uuid4().hex[:8]
+    cash, sales = f"Cache Cash {suffix}", f"Cache Sales {suffix}"
+    create_account(AccountCreate(name=cash, asset="ISK", type="ASSET"))
+    create_account(AccountCreate(name=sales, asset="ISK", type="INCOME"))
+    return cash, sales
+
+
+def test_lru_eviction_and_stats():
+    cache = AccountCache(maxsize=2)
+    cache.put(AccountRef(id=1, name="a", asset="USD"))
+    cache.put(AccountRef(id=2, name="b", asset="USD"))
+    assert cache.get("a") is not None  # "b" becomes least recently used
+    cache.put(AccountRef(id=3, name="c", asset="USD"))
+
+    assert cache.get("b") is None
+    assert cache.get("c").id == 3
+    cache.invalidate("c")
+    assert cache.get("c") is None
+    assert cache.stats() == {"size": 1, "maxsize": 2, "hits": 2, "misses": 2, "evictions": 1}
+
+
+def test_warm_cache_skips_the_account_query():
+    cash, sales = _accounts()
+    with track_queries() as cold:
+        create_transaction(_entry(cash, sales), idempotency_key=uuid.uuid4().hex)
+    with track_queries() as warm:
+        create_transaction(_entry(cash, sales), idempotency_key=uuid.uuid4().hex)
+    assert warm.count == cold.count - 1
+
+
+def test_new_account_can_be_posted_to_immediately():
+    cash, sales = _accounts()
+    late = f"Cache Float {uuid.uuid4().hex[:8]}"
+    with pytest.raises(ValueError):
+        create_transaction(_entry(late, sales), idempotency_key=uuid.uuid4().hex)
+
+    create_account(AccountCreate(name=late, asset="ISK", type="ASSET"))
+    out = create_transaction(_entry(late, cash), idempotency_key=uuid.uuid4().hex)
+    assert {p.account_name for p in out.postings} == {late, cash}
+    assert ACCOUNT_CACHE.get(late).asset == "ISK"
@@ -0,0 +1,67 @@
+import uuid
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.db.session import db_session
+from app.main import app
+from app.models import AccountBalance
+from app.services.balances import verify_balances
+
+client = TestClient(app)
+
+
+def _accounts():
+    suffix = uuid.uuid4().hex[:8]
+    cash = client.post(
+        "/accounts", json={"name": f"Cash {suffix}", "asset": "EUR", "type": "ASSET"}
+    ).json()
+    sales = client.post(
+        "/accounts", json={"name": f"Sales {suffix}", "asset": "EUR", "type": "INCOME"}
+    ).json()
+    return cash, sales
+
+
+def _post(cash, sales, amount, key):
+    payload = {
+        "reference": key,
+        "asset": "EUR",
+        "postings": [
+            {"account_name": cash["name"], "direction": "DEBIT", "amount": amount},
+            {"account_name": sales["name"], "direction": "CREDIT", "amount": amount},
+        ],
+    }
+    r = client.post("/transactions", json=payload, headers={"Idempotency-Key": key})
+    assert r.status_code == 200
+
+
+def test_balance_updated_with_postings():
+    cash, sales = _accounts()
+    assert Decimal(client.get(f"/accounts/{cash['id']}/balance").json()["balance"]) == 0
+
+    _post(cash, sales, "12.50", uuid.uuid4().hex)
+    _post(cash, sales, "7.50", uuid.uuid4().hex)
+
+    body = client.get(f"/accounts/{cash['id']}/balance").json()
+    assert Decimal(body["balance"]) == Decimal("20.00")
+    assert body["posting_count"] == 2
+    by_id = {b["account_id"]: b for b in client.get("/balances?asset=EUR").json()}
+    assert Decimal(by_id[sales["id"]]["balance"]) == Decimal("-20.00")
+    assert client.get("/accounts/999999/balance").status_code == 404
+
+
+def test_verify_detects_and_repairs_drift():
+    cash, sales = _accounts()
+    _post(cash, sales, "3.00", uuid.uuid4().hex)
+    assert verify_balances(chunk_size=2).drift == []
+
+    with db_session() as s:
+        s.execute(
+            update(AccountBalance)
+            .where(AccountBalance.account_id == cash["id"])
+            .values(debits=Decimal("99"))
+        )
+    report = verify_balances(repair=True, chunk_size=2)
+    assert [d.account_id for d in report.drift] == [cash["id"]]
+    assert verify_balances().drift == []
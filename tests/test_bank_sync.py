@@ -0,0 +1,19 @@
+from sqlalchemy import func, select
+
+from app.db.session import db_session
+from app.models import BankSyncCursor, StoredBankMovement
+from app.services.bank_sync import feed_provider, stored_movements, sync_feed
+
+
+def test_sync_is_incremental_and_deduplicated():
+    assert sync_feed("SEK") == 15
+    assert sync_feed("SEK") == 0  # overlap re-read, nothing new stored
+
+    provider = feed_provider("SEK")
+    with db_session() as s:
+        stored = s.scalar(select(func.count()).where(StoredBankMovement.provider == provider))
+        cursor = s.get(BankSyncCursor, provider)
+        assert stored == 15
+        assert cursor is not None
+        newest = list(stored_movements(s, "SEK"))[-1]
+        assert [m.id for m in stored_movements(s, "SEK", after_id=newest.id)] == []
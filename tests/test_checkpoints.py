@@ -0,0 +1,63 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.db.session import db_session
+from app.main import app
+from app.models import BalanceCheckpoint, Transaction, utcnow
+from app.services.checkpoints import build_checkpoints
+
+client = TestClient(app)
+
+
+def _post(cash, sales, amount, days_ago):
+    key = uuid.uuid4().hex
+    payload = {
+        "reference": key[:16],
+        "asset": "GBP",
+        "postings": [
+            {"account_name": cash, "direction": "DEBIT", "amount": amount},
+            {"account_name": sales, "direction": "CREDIT", "amount": amount},
+        ],
+    }
+    tx = client.post("/transactions", json=payload, headers={"Idempotency-Key": key}).json()
+    with db_session() as s:
+        s.execute(
+            update(Transaction)
+            .where(Transaction.id == tx["id"])
+            .values(created_at=utcnow() - timedelta(days=days_ago))
+        )
+
+
+def test_as_of_balance_uses_checkpoints():
+    suffix = uuid.uuid4().hex[:8]
+    cash = client.post(
+        "/accounts", json={"name": f"Till {suffix}", "asset": "GBP", "type": "ASSET"}
+    ).json()
+    sales = f"Fees {suffix}"
+    client.post("/accounts", json={"name": sales, "asset": "GBP", "type": "INCOME"})
+
+    _post(cash["name"], sales, "10.00", days_ago=3)
+    _post(cash["name"], sales, "5.00", days_ago=1)
+    now = utcnow()
+    assert build_checkpoints(until=now) > 0
+    with db_session() as s:
+        assert s.scalars(
+            select(BalanceCheckpoint).where(BalanceCheckpoint.account_id == cash["id"])
+        ).all()
+
+    _post(cash["name"], sales, "1.00", days_ago=0)
+
+    def balance_at(dt):
+        r = client.get(f"/accounts/{cash['id']}/balance", params={"as_of": dt.isoformat()})
+        assert r.status_code == 200
+        return Decimal(r.json()["balance"])
+
+    assert balance_at(now - timedelta(days=4)) == 0
+    assert balance_at(now - timedelta(days=2)) == Decimal("10.00")
+    assert balance_at(now + timedelta(minutes=1)) == Decimal("16.00")
+    # A second pass only picks up intervals after the last checkpoint.
+    assert build_checkpoints(until=now) == 0
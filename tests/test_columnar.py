@@ -0,0 +1,99 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.session import db_session
+from app.main import app
+from app.services.columnar import MovementColumns, account_totals, from_micro, load_postings
+from app.services.matching import match_columns
+from app.services.reports import REPORT_CACHE
+
+client = TestClient(app)
+
+
+def _post(asset: str, debit: str, credit: str, amount: str) -> None:
+    payload = {
+        "reference": f"COL-{uuid.uuid4().hex[:6]}",
+        "asset": asset,
+        "postings": [
+            {"account_name": debit, "direction": "DEBIT", "amount": amount},
+            {"account_name": credit, "direction": "CREDIT", "amount": amount},
+        ],
+    }
+    r = client.post("/transactions", json=payload, headers={"Idempotency-Key": uuid.uuid4().hex})
+    assert r.status_code == 200
+
+
+def _ledger() -> str:
+    asset = f"C{uuid.uuid4().hex[:5].upper()}"
+    for name, type_ in (("Cash", "ASSET"), ("Sales", "INCOME"), ("Fees", "EXPENSE")):
+        client.post("/accounts", json={"name": f"{asset} {name}", "asset": asset, "type": type_})
+    _post(asset, f"{asset} Cash", f"{asset} Sales", "100.00")
+    _post(asset, f"{asset} Fees", f"{asset} Cash", "0.123456")
+    _post(asset, f"{asset} Cash", f"{asset} Sales", "7.25")
+    return asset
+
+
+def test_posting_columns_are_compact_and_exact():
+    asset = _ledger()
+    with db_session() as s:
+        cols = load_postings(s, asset=asset, chunk_size=2)
+    assert len(cols) == 6
+    assert cols.nbytes == 28 * len(cols)  # 8 + 4 + 8 + 8 bytes per posting
+    assert int(cols.numpy()["amount"].sum()) == 0  # every entry balances
+
+    totals = account_totals(cols)
+    balances = {b["account_id"]: b for b in client.get("/balances", params={"asset": asset}).json()}
+    assert set(totals) == set(balances)
+    for account_id, (debits, credits, count) in totals.items():
+        b = balances[account_id]
+        assert (from_micro(debits), from_micro(credits)) == (
+            Decimal(b["debits"]),
+            Decimal(b["credits"]),
+        )
+        assert count == b["posting_count"]
+
+
+def test_columnar_report_engine_matches_sql(monkeypatch):
+    asset = _ledger()
+    window = {
+        "asset": asset,
+        "created_from": (datetime.now(UTC) - timedelta(hours=1)).isoformat(),
+        "created_to": (datetime.now(UTC) + timedelta(hours=1)).isoformat(),
+    }
+    sql = [
+        client.get(f"/reports/{r}", params=window).json()
+        for r in ("trial-balance", "account-types")
+    ]
+
+    monkeypatch.setattr(settings, "report_engine", "columnar")
+    REPORT_CACHE.clear()
+    columnar = [
+        client.get(f"/reports/{r}", params=window).json()
+        for r in ("trial-balance", "account-types")
+    ]
+    assert columnar == sql
+    fees = next(a for a in sql[0]["accounts"] if a["account_name"] == f"{asset} Fees")
+    assert fees["debits"] == "0.123456"
+
+
+def test_movement_columns_feed_both_matchers():
+    cols = MovementColumns()
+    now = datetime.now(UTC)
+    cols.extend([("INV-1", Decimal("12.345"), now), ("INV-2", Decimal("-3.0000005"), now)])
+    assert list(cols.amount_minor) == [12_345_000, -3_000_000]  # half-even, like to_minor
+    refs, amounts, ts = cols.numpy()
+    assert refs is cols.references  # no fixed-width string copy
+    assert [(r, int(a), float(t)) for r, a, t in zip(refs, amounts, ts, strict=True)] == list(
+        cols.rows()
+    )
+
+    bank = MovementColumns()
+    bank.extend([("BANK-9", Decimal("-3.0000005"), now)])
+    result = match_columns(
+        cols.references, cols.amount_minor, cols.ts, bank.references, bank.amount_minor, bank.ts, 60
+    )
+    assert (result.by_amount, result.unmatched_ledger, result.unmatched_bank) == (1, [0], [])
@@ -0,0 +1,49 @@
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import pytest
+
+from app.services.connectors import http_bank
+
+ANCHOR = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+async def test_concurrent_pages_yield_whole_feed(standin_bank):
+    async with standin_bank(rows=2500, page_size=100, concurrency=4, anchor=ANCHOR) as bank:
+        rows = [m async for m in bank.iter_movements("USD")]
+    assert sorted(m.reference for m in rows) == [f"BANK-{i:09d}" for i in range(2500)]
+    assert {m.currency for m in rows} == {"USD"}
+
+
+async def test_since_filter_and_retries(standin_bank):
+    since = ANCHOR + timedelta(seconds=899.5)
+    async with standin_bank(
+        rows=1000, fail_every=3, page_size=30, concurrency=2, max_retries=3, anchor=ANCHOR
+    ) as bank:
+        rows = [m async for m in bank.iter_movements("EUR", since=since)]
+    assert len(rows) == 100
+    assert min(m.booked_at for m in rows) == ANCHOR + timedelta(seconds=900)
+
+
+async def test_gives_up_after_max_retries(standin_bank):
+    async with standin_bank(rows=10, fail_every=1, max_retries=1) as bank:
+        with pytest.raises(httpx.HTTPError):
+            [m async for m in bank.iter_movements("USD")]
+
+
+def test_sync_fetches_reuse_one_connector(standin_bank, monkeypatch):
+    made = []
+
+    async def new_connector():
+        made.append(standin_bank(rows=50, anchor=ANCHOR))
+        return made[-1]
+
+    http_bank.close_shared_connector()
+    monkeypatch.setattr(http_bank, "_new_connector", new_connector)
+    try:
+        for _ in range(2):
+            rows = list(http_bank.fetch_bank_feed("USD", since=ANCHOR - timedelta(days=1)))
+            assert len(rows) == 50
+        assert len(made) == 1
+    finally:
+        http_bank.close_shared_connector()
@@ -0,0 +1,71 @@
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.importer import import_file
+
+client = TestClient(app)
+
+
+def test_import_csv_and_ndjson_with_resume(tmp_path):
+    suffix = uuid.uuid4().hex[:8]
+    cash, income = f"Import Cash {suffix}", f"Import Revenue {suffix}"
+    acct = client.post("/accounts", json={"name": cash, "asset": "DKK", "type": "ASSET"}).json()
+    client.post("/accounts", json={"name": income, "asset": "DKK", "type": "INCOME"})
+
+    csv_path = tmp_path / "legacy.csv"
+    lines = ["idempotency_key,reference,description,asset,created_at,account_name,direction,amount"]
+    for i in range(5):
+        credit = "9.00" if i == 3 else "10.00"  # entry 3 is unbalanced
+        lines += [
+            f"{suffix}-c{i},L-{i},,DKK,2025-01-0{i + 1}T00:00:00+00:00,{cash},DEBIT,10.00",
+            f"{suffix}-c{i},L-{i},,DKK,2025-01-0{i + 1}T00:00:00+00:00,{income},CREDIT,{credit}",
+        ]
+    csv_path.write_text("\n".join(lines) + "\n")
+
+    report = import_file(str(csv_path), chunk_size=2)
+    assert (report.created, report.replayed, report.rejected) == (4, 0, 1)
+    assert "not balanced" in report.errors[0]
+
+    # Saved progress skips everything; a restart replays the keys instead of duplicating them.
+    assert import_file(str(csv_path)).created == 0
+    again = import_file(str(csv_path), resume=False)
+    assert (again.created, again.replayed) == (0, 4)
+
+    nd_path = tmp_path / "legacy.ndjson"
+    entry = {
+        "idempotency_key": f"{suffix}-n0",
+        "reference": "N-0",
+        "asset": "DKK",
+        "postings": [
+            {"account_name": cash, "direction": "DEBIT", "amount": "5.00"},
+            {"account_name": income, "direction": "CREDIT", "amount": "5.00"},
+        ],
+    }
+    nd_path.write_text(
+        json.dumps(entry) + "\n" + '{"reference": "N-1",\n' + json.dumps(entry) + "\n"
+    )
+    report = import_file(str(nd_path))
+    assert (report.created, report.replayed, report.rejected) == (1, 1, 1)
+    assert report.errors[0].startswith("line 2: ")
+
+    # Reusing a key for a different entry is a conflict, in the file and against the ledger.
+    changed = entry | {"reference": "N-0b"}
+    nd_path.write_text(json.dumps(changed) + "\n")
+    report = import_file(str(nd_path), resume=False)
+    assert (report.created, report.replayed, report.rejected) == (0, 0, 1)
+    assert "already used with another payload" in report.errors[0]
+
+    # A repeat of an entry that is rejected is rejected too, not counted as replayed.
+    unknown = entry | {"idempotency_key": f"{suffix}-n1", "reference": "N-1"}
+    unknown["postings"] = [dict(p, account_name=f"Nope {suffix}") for p in entry["postings"]]
+    nd_path.write_text(json.dumps(unknown) + "\n" + json.dumps(unknown) + "\n")
+    report = import_file(str(nd_path), resume=False)
+    assert (report.created, report.replayed, report.rejected) == (0, 0, 2)
+    assert "was rejected" in report.errors[1]
+
+    balance = client.get(f"/accounts/{acct['id']}/balance").json()
+    assert balance["posting_count"] == 5
+    assert balance["balance"] == "45.000000"
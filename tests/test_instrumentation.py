@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_route_template_labels_and_query_counts(monkeypatch):
+    monkeypatch.setattr(settings, "server_timing", True)
+    acct = client.post("/accounts", json={"name": "Timing Cash", "asset": "USD", "type": "ASSET"})
+    account_id = acct.json()["id"] if acct.status_code == 200 else 1
+    labels = {"method": "GET", "route": "/accounts/{account_id}/balance"}
+    before = REGISTRY.get_sample_value("http_request_db_queries_count", labels) or 0
+
+    r = client.get(f"/accounts/{account_id}/balance")
+    assert r.status_code == 200
+    db, app_timing = r.headers["server-timing"].split(", ")
+    assert db.startswith("db;dur=") and 'desc="' in db and not db.endswith('"0 queries"')
+    assert app_timing.startswith("app;dur=")
+
+    assert REGISTRY.get_sample_value("http_request_db_queries_count", labels) == before + 1
+    path_labels = {"method": "GET", "path": "/accounts/{account_id}/balance", "status": "200"}
+    assert REGISTRY.get_sample_value("http_requests_total", path_labels) >= 1
+
+    client.get("/definitely/not/a/route")
+    unmatched = {"method": "GET", "path": "unmatched", "status": "404"}
+    assert REGISTRY.get_sample_value("http_requests_total", unmatched) >= 1
+
+
+def test_reconciliation_stage_timers():
+    from app.services.reconciliation import run_reconciliation
+
+    before = REGISTRY.get_sample_value("reconciliation_stage_seconds_count", {"stage": "persist"})
+    run_reconciliation(mode="full")
+    after = REGISTRY.get_sample_value("reconciliation_stage_seconds_count", {"stage": "persist"})
+    assert after == (before or 0) + 1
+    assert REGISTRY.get_sample_value("reconciliation_stage_seconds_count", {"stage": "match"})
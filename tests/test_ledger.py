@@ -1,5 +1,9 @@
+import io
+import json
+import uuid
 from decimal import Decimal
 
+import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -46,3 +50,261 @@ def test_unbalanced_rejected():
     }
     r = client.post("/transactions", json=payload, headers={"Idempotency-Key": "k2"})
     assert r.status_code == 400
+
+
+def test_batch_ingest_reports_each_entry():
+    client.post("/accounts", json={"name": "Operating Cash", "asset": "USD", "type": "ASSET"})
+    client.post("/accounts", json={"name": "Revenue", "asset": "USD", "type": "INCOME"})
+    prefix = uuid.uuid4().hex[:8]
+
+    def entry(key, credit="5.00", account="Revenue"):
+        return {
+            "idempotency_key": f"{prefix}-{key}",
+            "reference": f"B-{key}",
+            "asset": "USD",
+            "postings": [
+                {"account_name": "Operating Cash", "direction": "DEBIT", "amount": "5.00"},
+                {"account_name": account, "direction": "CREDIT", "amount": credit},
+            ],
+        }
+
+    batch = [entry("a"), entry("b"), entry("c", credit="4.00"), entry("d", account="Nope")]
+    r = client.post("/transactions/batch", json={"transactions": batch})
+    assert r.status_code == 200
+    body = r.json()
+    assert [x["status"] for x in body["results"]] == ["created", "created", "rejected", "rejected"]
+    assert "not balanced" in body["results"][2]["error"]
+    assert "Unknown account" in body["results"][3]["error"]
+    created = body["results"][0]["transaction"]
+
+    r = client.post("/transactions/batch", json={"transactions": [entry("a"), entry("a")]})
+    body = r.json()
+    assert [x["status"] for x in body["results"]] == ["replayed", "replayed"]
+    assert body["results"][0]["transaction"] == created
+
+    # The same key with another payload is a conflict, within one batch as across requests.
+    changed = entry("e") | {"reference": "B-e2"}
+    r = client.post("/transactions/batch", json={"transactions": [entry("e"), changed]})
+    body = r.json()
+    assert [x["status"] for x in body["results"]] == ["created", "rejected"]
+    assert "already used with another payload" in body["results"][1]["error"]
+    assert body["rejected"] == 1
+
+    key_b = f"{prefix}-b"
+    single = client.post("/transactions", json=entry("b"), headers={"Idempotency-Key": key_b})
+    assert single.status_code == 200
+    assert single.json()["postings"] == created["postings"]
+
+
+def test_batch_loses_key_race_per_entry(monkeypatch):
+    from app.services import ledger
+
+    suffix = uuid.uuid4().hex[:8]
+    cash = client.post(
+        "/accounts", json={"name": f"Race Cash {suffix}", "asset": "GBP", "type": "ASSET"}
+    ).json()
+    client.post(
+        "/accounts", json={"name": f"Race Sales {suffix}", "asset": "GBP", "type": "INCOME"}
+    )
+
+    def entry(key, reference="R"):
+        return {
+            "idempotency_key": f"{suffix}-{key}",
+            "reference": reference,
+            "asset": "GBP",
+            "postings": [
+                {"account_name": f"Race Cash {suffix}", "direction": "DEBIT", "amount": "2.00"},
+                {"account_name": f"Race Sales {suffix}", "direction": "CREDIT", "amount": "2.00"},
+            ],
+        }
+
+    for key in ("won", "clash"):
+        assert client.post("/transactions/batch", json={"transactions": [entry(key)]}).is_success
+
+    # Pretend both keys were committed by another request right after the lookup.
+    lookup = ledger._transactions_by_key
+    stale = [{}]
+    monkeypatch.setattr(
+        ledger, "_transactions_by_key", lambda s, k: stale.pop() if stale else lookup(s, k)
+    )
+    monkeypatch.setattr(ledger, "cached_replay", lambda key, digest: None)
+    batch = [entry("new"), entry("won"), entry("clash", reference="R2")]
+    r = client.post("/transactions/batch", json={"transactions": batch})
+    assert r.status_code == 200
+    assert [x["status"] for x in r.json()["results"]] == ["created", "replayed", "rejected"]
+    balance = client.get(f"/accounts/{cash['id']}/balance").json()
+    assert balance["posting_count"] == 3
+
+
+def test_keyset_pagination_walks_filtered_ledger():
+    client.post("/accounts", json={"name": "Page Cash", "asset": "JPY", "type": "ASSET"})
+    client.post("/accounts", json={"name": "Page Revenue", "asset": "JPY", "type": "INCOME"})
+    prefix = uuid.uuid4().hex[:8]
+    entries = [
+        {
+            "idempotency_key": f"{prefix}-{i}",
+            "reference": f"PG-{prefix}" if i % 2 else f"PG-{i}",
+            "asset": "JPY",
+            "postings": [
+                {"account_name": "Page Cash", "direction": "DEBIT", "amount": "1"},
+                {"account_name": "Page Revenue", "direction": "CREDIT", "amount": "1"},
+            ],
+        }
+        for i in range(11)
+    ]
+    created = client.post("/transactions/batch", json={"transactions": entries}).json()
+    jpy_ids = sorted((r["transaction"]["id"] for r in created["results"]), reverse=True)
+
+    seen, cursor = [], None
+    while True:
+        params = {"asset": "JPY", "limit": 4} | ({"cursor": cursor} if cursor else {})
+        r = client.get("/transactions", params=params)
+        assert r.status_code == 200
+        seen += [tx["id"] for tx in r.json()]
+        cursor = r.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+    assert seen[: len(jpy_ids)] == jpy_ids  # newest first, no gaps or repeats
+    assert len(seen) == len(set(seen))
+
+    r = client.get("/transactions", params={"reference": f"PG-{prefix}"})
+    assert len(r.json()) == 5
+    assert client.get("/transactions", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_export_streams_filtered_postings():
+    client.post("/accounts", json={"name": "Export Cash", "asset": "NOK", "type": "ASSET"})
+    client.post("/accounts", json={"name": "Export Revenue", "asset": "NOK", "type": "INCOME"})
+    prefix = uuid.uuid4().hex[:8]
+    entries = [
+        {
+            "idempotency_key": f"{prefix}-{i}",
+            "reference": f"EX-{i}",
+            "asset": "NOK",
+            "postings": [
+                {"account_name": "Export Cash", "direction": "DEBIT", "amount": "2.50"},
+                {"account_name": "Export Revenue", "direction": "CREDIT", "amount": "2.50"},
+            ],
+        }
+        for i in range(3)
+    ]
+    client.post("/transactions/batch", json={"transactions": entries})
+
+    r = client.get("/export/postings", params={"asset": "NOK"})
+    assert r.status_code == 200
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert len(rows) == 6
+    assert {row["asset"] for row in rows} == {"NOK"}
+    assert Decimal(rows[0]["amount"]) == Decimal("2.50")
+
+    r = client.get("/export/postings", params={"asset": "NOK", "format": "csv"})
+    lines = r.text.splitlines()
+    assert lines[0].startswith("posting_id,transaction_id") and len(lines) == 7
+
+    pq = pytest.importorskip("pyarrow.parquet")
+    r = client.get("/export/postings", params={"asset": "NOK", "format": "parquet"})
+    table = pq.read_table(io.BytesIO(r.content))
+    assert table.num_rows == 6
+    assert sum(table.column("amount").to_pylist()) == Decimal("15")
+
+
+def test_replay_served_from_cache_and_conflicts_rejected(monkeypatch):
+    from app.services import ledger
+    from app.services.idempotency import REPLAY_CACHE
+
+    client.post("/accounts", json={"name": "Operating Cash", "asset": "USD", "type": "ASSET"})
+    client.post("/accounts", json={"name": "Revenue", "asset": "USD", "type": "INCOME"})
+    key = uuid.uuid4().hex
+    payload = {
+        "reference": "RPL-1",
+        "asset": "USD",
+        "postings": [
+            {"account_name": "Operating Cash", "direction": "DEBIT", "amount": "3.10"},
+            {"account_name": "Revenue", "direction": "CREDIT", "amount": "3.1"},
+        ],
+    }
+    first = client.post("/transactions", json=payload, headers={"Idempotency-Key": key}).json()
+
+    def no_db():
+        raise AssertionError("replay should not touch the database")
+
+    with monkeypatch.context() as m:
+        m.setattr(ledger, "db_session", no_db)
+        replay = client.post("/transactions", json=payload, headers={"Idempotency-Key": key})
+    assert replay.json() == first
+
+    changed = payload | {"reference": "RPL-2"}
+    r = client.post("/transactions", json=changed, headers={"Idempotency-Key": key})
+    assert r.status_code == 409
+
+    REPLAY_CACHE.clear()  # the stored hash catches it on the database path too
+    r = client.post("/transactions", json=changed, headers={"Idempotency-Key": key})
+    assert r.status_code == 409
+    replay = client.post("/transactions", json=payload, headers={"Idempotency-Key": key})
+    assert replay.json() == first
+
+
+async def test_async_stack_matches_sync_routes():
+    import httpx
+    from fastapi import FastAPI
+
+    from app.api.routes_async import router as async_router
+    from app.db.async_session import dispose_async_engine
+
+    async_app = FastAPI()
+    async_app.include_router(async_router)
+    client.post("/accounts", json={"name": "Async Cash", "asset": "SEK", "type": "ASSET"})
+    key = uuid.uuid4().hex
+    payload = {
+        "reference": "ASYNC-1",
+        "asset": "SEK",
+        "postings": [
+            {"account_name": "Async Cash", "direction": "DEBIT", "amount": "7.25"},
+            {"account_name": "Async Revenue", "direction": "CREDIT", "amount": "7.25"},
+        ],
+    }
+    transport = httpx.ASGITransport(app=async_app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            r = await ac.post(
+                "/accounts", json={"name": "Async Revenue", "asset": "SEK", "type": "INCOME"}
+            )
+            assert r.status_code in (200, 400)
+            created = await ac.post("/transactions", json=payload, headers={"Idempotency-Key": key})
+            assert created.status_code == 200
+            conflict = payload | {"reference": "ASYNC-2"}
+            r = await ac.post("/transactions", json=conflict, headers={"Idempotency-Key": key})
+            assert r.status_code == 409
+            page = await ac.get("/transactions", params={"asset": "SEK", "limit": 1})
+            assert page.json()[0] == created.json()
+            assert (await ac.get("/reconciliation/runs/999999")).status_code == 404
+    finally:
+        await dispose_async_engine()
+
+    # Written through the async engine, read back identically by the sync stack.
+    r = client.get("/transactions", params={"asset": "SEK", "limit": 1})
+    assert r.json()[0] == created.json()
+    balance = client.get("/balances", params={"asset": "SEK"}).json()
+    assert any(b["account_name"] == "Async Cash" for b in balance)
+
+
+def test_encoded_transactions_match_response_model():
+    from app.services.ledger import list_transactions, list_transactions_json
+
+    client.post("/accounts", json={"name": "Operating Cash", "asset": "USD", "type": "ASSET"})
+    client.post("/accounts", json={"name": "Revenue", "asset": "USD", "type": "INCOME"})
+    payload = {
+        "reference": "ENC-1",
+        "description": "Zahlung ü",
+        "asset": "USD",
+        "postings": [
+            {"account_name": "Operating Cash", "direction": "DEBIT", "amount": "1.5"},
+            {"account_name": "Revenue", "direction": "CREDIT", "amount": "1.50"},
+        ],
+    }
+    client.post("/transactions", json=payload, headers={"Idempotency-Key": uuid.uuid4().hex})
+
+    page = list_transactions(limit=20)
+    body, next_cursor = list_transactions_json(limit=20)
+    assert json.loads(body) == [tx.model_dump(mode="json") for tx in page.items]
+    assert next_cursor == page.next_cursor
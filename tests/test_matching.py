@@ -0,0 +1,80 @@
+import random
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.services.matching import MatchItem, match
+
+DAY = 86_400.0
+
+
+def _item(key, ref, amount_minor, day):
+    return MatchItem(key, ref, amount_minor, day * DAY)
+
+
+def test_reference_pass_then_amount_window():
+    ledger = [
+        _item("l1", "INV-1", 1000, 0),  # same reference and amount
+        _item("l2", "INV-2", 500, 0),  # same reference, different amount
+        _item("l3", "INV-3", 700, 10),  # amount match within window
+        _item("l4", "INV-4", 700, 20),  # amount exists but too far away
+        _item("l5", "INV-5", 999, 0),
+    ]
+    bank = [
+        _item("b1", "INV-1", 1000, 1),
+        _item("b2", "INV-2", 550, 0),
+        _item("b3", "BANK-3", 700, 11),
+        _item("b4", "BANK-4", 700, 30),
+    ]
+    result = match(ledger, bank, window_seconds=3 * DAY)
+
+    assert result.passes() == {"reference": 1, "reference_amount_mismatch": 1, "amount_window": 1}
+    assert sorted(m.key for m in result.unmatched_ledger) == ["l4", "l5"]
+    assert [m.key for m in result.unmatched_bank] == ["b4"]
+
+
+def test_without_window_matches_amount_multiset():
+    ledger = [_item(i, f"L{i}", 700, i) for i in range(3)]
+    bank = [_item(i, f"B{i}", 700, 100 + i) for i in range(2)]
+    result = match(ledger, bank, window_seconds=None)
+    assert result.by_amount == 2
+    assert [m.key for m in result.unmatched_ledger] == [2]
+
+
+def test_sub_cent_amounts_stay_distinct():
+    now = datetime.now(UTC)
+    ledger = [MatchItem.of("l1", "L1", Decimal("0.001"), now)]
+    bank = [MatchItem.of("b1", "B1", Decimal("0.002"), now)]
+    result = match(ledger, bank, window_seconds=None)
+    assert result.by_amount == 0
+    assert MatchItem.of("x", "X", Decimal("-0.000001"), now).amount_minor == -1
+
+
+def test_numpy_matcher_agrees_with_python():
+    np = pytest.importorskip("numpy")
+    from app.services.matching_np import columns, match_arrays
+
+    rng = random.Random(7)
+    ledger = [
+        (f"R{rng.randint(0, 40)}", rng.randint(1, 20), float(rng.randint(0, 9))) for _ in range(300)
+    ]
+    bank = [
+        (f"R{rng.randint(20, 60)}", rng.randint(1, 20), float(rng.randint(0, 9)))
+        for _ in range(250)
+    ]
+
+    expected = match(
+        [MatchItem(i, *r) for i, r in enumerate(ledger)],
+        [MatchItem(i, *r) for i, r in enumerate(bank)],
+        window_seconds=None,
+    )
+    got = match_arrays(*columns(ledger), *columns(bank))
+
+    assert got.passes() == expected.passes()
+    assert np.array_equal(
+        np.sort(got.unmatched_ledger), sorted(m.key for m in expected.unmatched_ledger)
+    )
+    assert np.array_equal(
+        np.sort(got.unmatched_bank), sorted(m.key for m in expected.unmatched_bank)
+    )
@@ -0,0 +1,49 @@
+import threading
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.db.session import db_session
+from app.main import app
+from app.models import EventOutbox
+from app.services.outbox import InMemorySink, OutboxRelay
+
+client = TestClient(app)
+
+
+def test_parallel_relays_deliver_each_event_once():
+    for name, kind in (("Outbox Cash", "ASSET"), ("Outbox Revenue", "INCOME")):
+        client.post("/accounts", json={"name": name, "asset": "USD", "type": kind})
+    entries = [
+        {
+            "idempotency_key": uuid.uuid4().hex,
+            "reference": f"OBX-{i}",
+            "asset": "USD",
+            "postings": [
+                {"account_name": "Outbox Cash", "direction": "DEBIT", "amount": "1.00"},
+                {"account_name": "Outbox Revenue", "direction": "CREDIT", "amount": "1.00"},
+            ],
+        }
+        for i in range(120)
+    ]
+    assert client.post("/transactions/batch", json={"transactions": entries}).status_code == 200
+
+    sink = InMemorySink()
+    relays = [OutboxRelay(sink, worker_id=f"w{i}", batch_size=7) for i in range(4)]
+
+    def drain(relay: OutboxRelay) -> None:
+        while relay.run_once():
+            pass
+
+    threads = [threading.Thread(target=drain, args=(r,)) for r in relays]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    ids = [e.id for e in sink.events]
+    assert len(ids) == len(set(ids)) >= 120
+    with db_session() as s:
+        pending = s.scalar(select(func.count()).where(EventOutbox.processed_at.is_(None)))
+    assert pending == 0
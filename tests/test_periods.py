@@ -0,0 +1,147 @@
+import gzip
+import json
+import uuid
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select, update
+
+from app.db.session import db_session
+from app.main import app
+from app.models import ArchivedPosting, PeriodOpeningBalance, Transaction
+from app.services.balances import verify_balances
+from app.services.importer import import_file
+from app.services.periods import archive_period, close_period
+
+client = TestClient(app)
+
+MAR = datetime(2001, 3, 1, tzinfo=UTC)
+MAY = datetime(2001, 5, 1, tzinfo=UTC)
+JUL = datetime(2001, 7, 1, tzinfo=UTC)
+SEP = datetime(2001, 9, 1, tzinfo=UTC)
+JAN = datetime(2002, 1, 1, tzinfo=UTC)
+
+
+def _post(cash, sales, amount, created_at):
+    key = uuid.uuid4().hex
+    payload = {
+        "reference": key[:16],
+        "asset": "SEK",
+        "postings": [
+            {"account_name": cash, "direction": "DEBIT", "amount": amount},
+            {"account_name": sales, "direction": "CREDIT", "amount": amount},
+        ],
+    }
+    tx = client.post("/transactions", json=payload, headers={"Idempotency-Key": key}).json()
+    with db_session() as s:
+        s.execute(
+            update(Transaction).where(Transaction.id == tx["id"]).values(created_at=created_at)
+        )
+    return tx
+
+
+def _balance_at(account_id, dt):
+    return client.get(f"/accounts/{account_id}/balance", params={"as_of": dt.isoformat()})
+
+
+def test_close_archive_and_read_back(tmp_path):
+    suffix = uuid.uuid4().hex[:8]
+    cash = client.post(
+        "/accounts", json={"name": f"Vault Cash {suffix}", "asset": "SEK", "type": "ASSET"}
+    ).json()
+    sales = f"Vault Sales {suffix}"
+    client.post("/accounts", json={"name": sales, "asset": "SEK", "type": "INCOME"})
+
+    march = _post(cash["name"], sales, "10.00", MAR)
+    _post(cash["name"], sales, "5.00", MAY)
+    sept = _post(cash["name"], sales, "2.50", SEP)
+    _post(cash["name"], sales, "1.00", datetime.now(UTC))
+
+    first = close_period(JUL, archive="table")
+    assert first.start is None and first.archive == "table"
+    with db_session() as s:
+        opening = s.get(PeriodOpeningBalance, (first.id, cash["id"]))
+        assert (opening.debits, opening.posting_count) == (Decimal("15.00"), 2)
+        assert s.scalar(
+            select(ArchivedPosting.id).where(ArchivedPosting.transaction_id == march["id"])
+        )
+
+    # As-of balances and ranged reports still see table-archived postings.
+    april = datetime(2001, 4, 1, tzinfo=UTC)
+    assert Decimal(_balance_at(cash["id"], april).json()["balance"]) == 10
+    assert Decimal(_balance_at(cash["id"], JUL).json()["balance"]) == 15
+    report = client.get(
+        "/reports/trial-balance",
+        params={"asset": "SEK", "created_from": MAR.isoformat(), "created_to": JAN.isoformat()},
+    ).json()
+    line = next(a for a in report["accounts"] if a["account_id"] == cash["id"])
+    assert Decimal(line["debits"]) == Decimal("17.50")
+    assert Decimal(client.get(f"/accounts/{cash['id']}/balance").json()["balance"]) == Decimal(
+        "18.50"
+    )
+    # Listings skip archived transactions; the stored balances still verify.
+    listed = client.get("/transactions", params={"reference": march["reference"]}).json()
+    assert listed == []
+    assert client.get("/transactions", params={"reference": sept["reference"]}).json()
+    drifted = {d.account_id for d in verify_balances().drift}
+    assert cash["id"] not in drifted
+
+    with pytest.raises(ValueError):
+        close_period(MAY)  # not after the last close
+    second = close_period(JAN)
+    assert second.start == JUL.isoformat() and second.archive is None
+    with pytest.raises(ValueError):
+        archive_period(first.id, "table")  # already there
+
+    moved = archive_period(first.id, f"file:{tmp_path}")
+    path = moved.archive.removeprefix("file:")
+    with gzip.open(path, "rt") as f:
+        rows = [json.loads(line) for line in f]
+    assert {r["transaction_id"] for r in rows if r["account_id"] == cash["id"]} >= {march["id"]}
+    with db_session() as s:
+        assert not s.scalar(select(ArchivedPosting.id).where(ArchivedPosting.period_id == first.id))
+
+    r = client.get(f"/periods/{first.id}/postings")
+    assert r.status_code == 200
+    streamed = [json.loads(line) for line in r.text.splitlines()]
+    assert streamed == rows
+    assert _balance_at(cash["id"], april).status_code == 400
+    # A balance at a period end comes from its checkpoint without touching the archive.
+    assert Decimal(_balance_at(cash["id"], JAN).json()["balance"]) == Decimal("17.50")
+    assert [p["id"] for p in client.get("/periods").json()][-2:] == [first.id, second.id]
+
+    # An account with no checkpoint starts from the archived opening balances (none here).
+    late = client.post(
+        "/accounts", json={"name": f"Vault Float {suffix}", "asset": "SEK", "type": "ASSET"}
+    ).json()
+    _post(late["name"], sales, "3.00", datetime.now(UTC))
+    r = _balance_at(late["id"], datetime.now(UTC))
+    assert r.status_code == 200
+    assert Decimal(r.json()["balance"]) == Decimal("3.00")
+
+
+def test_import_rejects_closed_period(tmp_path):
+    suffix = uuid.uuid4().hex[:8]
+    cash, sales = f"Import Cash {suffix}", f"Import Sales {suffix}"
+    client.post("/accounts", json={"name": cash, "asset": "SEK", "type": "ASSET"})
+    client.post("/accounts", json={"name": sales, "asset": "SEK", "type": "INCOME"})
+    path = tmp_path / "entries.ndjson"
+    entries = [
+        {
+            "idempotency_key": f"{suffix}-{i}",
+            "reference": f"IMP-{suffix}-{i}",
+            "asset": "SEK",
+            "created_at": created_at.isoformat(),
+            "postings": [
+                {"account_name": cash, "direction": "DEBIT", "amount": "3.00"},
+                {"account_name": sales, "direction": "CREDIT", "amount": "3.00"},
+            ],
+        }
+        for i, created_at in enumerate([MAR, datetime.now(UTC)])
+    ]
+    path.write_text("".join(json.dumps(e) + "\n" for e in entries))
+    report = import_file(str(path), resume=False)
+    assert (report.created, report.rejected) == (1, 1)
+    assert "closed period" in report.errors[0]
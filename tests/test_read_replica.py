@@ -0,0 +1,34 @@
+import shutil
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.db import session as db
+from app.main import app
+from app.schemas import AccountCreate
+from app.services.ledger import create_account, list_accounts
+
+client = TestClient(app)
+
+
+def test_reads_go_to_replica_unless_pinned(tmp_path):
+    create_account(AccountCreate(name=f"Before-{uuid.uuid4().hex[:6]}", asset="USD", type="ASSET"))
+    replica = tmp_path / "replica.db"
+    shutil.copy(db.engine.url.database, replica)  # a frozen replica: lag never catches up
+    db.configure_replicas([f"sqlite:///{replica}", f"sqlite:///{replica}"])
+    try:
+        name = f"After-{uuid.uuid4().hex[:6]}"
+        create_account(AccountCreate(name=name, asset="USD", type="ASSET"))
+
+        assert name not in {a.name for a in list_accounts()}
+        with db.pin_to_primary():
+            assert name in {a.name for a in list_accounts()}
+        assert not db.primary_pinned()
+
+        names = {a["name"] for a in client.get("/accounts").json()}
+        assert name not in names
+        r = client.get("/accounts", headers={"X-Read-Primary": "1"})
+        assert name in {a["name"] for a in r.json()}
+    finally:
+        db.configure_replicas([])
+    assert name in {a.name for a in list_accounts()}
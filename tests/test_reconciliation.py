@@ -1,12 +1,181 @@
+import threading
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
 from fastapi.testclient import TestClient
+from sqlalchemy import select
 
+from app.core.config import settings
+from app.db.session import db_session
 from app.main import app
+from app.models import ReconciliationOpenItem, ReconciliationRun
+from app.services.reconciliation import _cash_movements, run_reconciliation, shutdown_pool
 
 client = TestClient(app)
 
 
+def _run_and_wait(**params):
+    r = client.post("/reconciliation/run", params=params)
+    assert r.status_code == 202
+    run_id = r.json()["id"]
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        run = client.get(f"/reconciliation/runs/{run_id}").json()
+        if run["status"] in ("SUCCEEDED", "FAILED"):
+            return run
+        time.sleep(0.05)
+    raise AssertionError(f"run {run_id} did not finish")
+
+
 def test_reconciliation_runs():
-    r = client.post("/reconciliation/run")
-    assert r.status_code == 200
-    body = r.json()
-    assert "matched" in body
+    run = _run_and_wait()
+    assert run["status"] == "SUCCEEDED"
+    assert run["progress"] == 100
+    assert "matched" in run["summary"]
+    assert run["id"] in [r["id"] for r in client.get("/reconciliation/runs").json()]
+
+
+def test_cash_movements_are_netted_in_sql():
+    suffix = uuid.uuid4().hex[:8]
+    names = {k: f"{k} {suffix}" for k in ("Cash A", "Cash B", "Income")}
+    for key, name in names.items():
+        kind = "INCOME" if key == "Income" else "ASSET"
+        client.post("/accounts", json={"name": name, "asset": "CHF", "type": kind})
+
+    def post(debit, credit, amount):
+        key = uuid.uuid4().hex
+        payload = {
+            "reference": key[:16],
+            "asset": "CHF",
+            "postings": [
+                {"account_name": names[debit], "direction": "DEBIT", "amount": amount},
+                {"account_name": names[credit], "direction": "CREDIT", "amount": amount},
+            ],
+        }
+        return client.post("/transactions", json=payload, headers={"Idempotency-Key": key}).json()
+
+    sale = post("Cash A", "Income", "20.00")
+    refund = post("Income", "Cash B", "7.25")
+    post("Cash B", "Cash A", "3.00")  # internal transfer nets to zero
+
+    with db_session() as s:
+        movements = {m.transaction_id: m.amount for m in _cash_movements(s, "CHF")}
+    assert movements[sale["id"]] == Decimal("20.00")
+    assert movements[refund["id"]] == Decimal("-7.25")
+    assert len([m for m in movements if m >= sale["id"]]) == 2
+
+
+def test_incremental_run_only_processes_new_entries(monkeypatch):
+    monkeypatch.setattr(settings, "checkpoint_settle_seconds", 0)
+    for name, kind in (("Operating Cash", "ASSET"), ("Revenue", "INCOME")):
+        client.post("/accounts", json={"name": name, "asset": "USD", "type": kind})
+    assert _run_and_wait(mode="incremental")["status"] == "SUCCEEDED"
+
+    key = uuid.uuid4().hex
+    payload = {
+        "reference": key[:16],
+        "asset": "USD",
+        "postings": [
+            {"account_name": "Operating Cash", "direction": "DEBIT", "amount": "1234.56"},
+            {"account_name": "Revenue", "direction": "CREDIT", "amount": "1234.56"},
+        ],
+    }
+    tx = client.post("/transactions", json=payload, headers={"Idempotency-Key": key}).json()
+
+    # Entries younger than the settle lag wait for a later run (a lower id may still commit).
+    monkeypatch.setattr(settings, "checkpoint_settle_seconds", 300)
+    usd = _run_and_wait(mode="incremental")["summary"]["partitions"]["USD"]
+    assert "new_ledger=0 " in usd["notes"][0]
+
+    monkeypatch.setattr(settings, "checkpoint_settle_seconds", 0)
+    body = _run_and_wait(mode="incremental")["summary"]
+    usd = body["partitions"]["USD"]
+    assert "new_ledger=1 " in usd["notes"][0]
+    assert usd["missing_in_bank"] >= 1  # nothing in the feed matches 1234.56
+
+    with db_session() as s:
+        open_ledger = s.scalars(
+            select(ReconciliationOpenItem.source_id).where(ReconciliationOpenItem.side == "LEDGER")
+        ).all()
+    assert open_ledger.count(str(tx["id"])) == 1
+
+
+def test_partitions_run_in_process_pool(monkeypatch):
+    client.post("/accounts", json={"name": "Operating Cash", "asset": "USD", "type": "ASSET"})
+    client.post("/accounts", json={"name": "Petty Cash", "asset": "USD", "type": "ASSET"})
+    monkeypatch.setattr(settings, "reconciliation_partition_by", "account")
+    monkeypatch.setattr(settings, "reconciliation_workers", 2)
+    try:
+        summary = run_reconciliation()
+    finally:
+        shutdown_pool()
+
+    assert len(summary.partitions) >= 2
+    assert all(":" in key for key in summary.partitions)
+    assert summary.matched == sum(p.matched for p in summary.partitions.values())
+    assert summary.missing_in_ledger == sum(
+        p.missing_in_ledger for p in summary.partitions.values()
+    )
+
+
+def test_jobs_never_leave_runs_open(monkeypatch):
+    from app.services import jobs
+
+    jobs.shutdown(wait=True)
+    monkeypatch.setattr(settings, "reconciliation_max_concurrent_runs", 1)
+
+    def broken(mode, run_id):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(jobs, "run_reconciliation", broken)
+    failed = jobs.enqueue_reconciliation()
+    jobs.shutdown(wait=True)
+    run = jobs.get_run(failed.id)
+    assert (run.status, run.error) == ("FAILED", "database went away")
+
+    started, release = threading.Event(), threading.Event()
+
+    def blocked(mode, run_id):
+        started.set()
+        release.wait(5)
+
+    monkeypatch.setattr(jobs, "run_reconciliation", blocked)
+    busy = jobs.enqueue_reconciliation()
+    assert started.wait(5)
+    queued = jobs.enqueue_reconciliation()
+    jobs.shutdown()
+    release.set()
+    run = jobs.get_run(queued.id)
+    assert (run.status, run.error) == ("FAILED", "cancelled at shutdown")
+
+    # The blocked run never finished; a restart long after it started fails it.
+    with db_session() as s:
+        s.get(ReconciliationRun, busy.id).started_at = datetime.now(UTC) - timedelta(days=1)
+    assert jobs.fail_stale_runs() >= 1
+    assert jobs.get_run(busy.id).status == "FAILED"
+
+
+def test_incremental_run_waiting_for_the_guard_stays_queued(monkeypatch):
+    from app.services import reconciliation
+
+    monkeypatch.setattr(settings, "reconciliation_sync_bank", False)
+
+    def latest():
+        runs = client.get("/reconciliation/runs", params={"limit": 1}).json()
+        return runs[0] if runs else {"id": 0}
+
+    last_id = latest()["id"]
+    with reconciliation._INCREMENTAL_LOCK:
+        worker = threading.Thread(target=run_reconciliation, kwargs={"mode": "incremental"})
+        worker.start()
+        deadline = time.monotonic() + 5
+        while (waiting := latest())["id"] == last_id:
+            assert time.monotonic() < deadline
+        time.sleep(0.2)
+        assert client.get(f"/reconciliation/runs/{waiting['id']}").json()["status"] == "QUEUED"
+    worker.join(10)
+    run = client.get(f"/reconciliation/runs/{waiting['id']}").json()
+    assert run["status"] == "SUCCEEDED"
+    assert run["started_at"] > waiting["started_at"]
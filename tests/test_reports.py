@@ -0,0 +1,73 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def _post(asset: str, debit: str, credit: str, amount: str) -> None:
+    payload = {
+        "reference": f"RPT-{uuid.uuid4().hex[:6]}",
+        "asset": asset,
+        "postings": [
+            {"account_name": debit, "direction": "DEBIT", "amount": amount},
+            {"account_name": credit, "direction": "CREDIT", "amount": amount},
+        ],
+    }
+    r = client.post("/transactions", json=payload, headers={"Idempotency-Key": uuid.uuid4().hex})
+    assert r.status_code == 200
+
+
+def test_trial_balance_and_type_rollup_are_cached_per_ledger_version():
+    asset = f"R{uuid.uuid4().hex[:5].upper()}"
+    for name, type_ in (("Bank", "ASSET"), ("Sales", "INCOME"), ("Rent", "EXPENSE")):
+        client.post("/accounts", json={"name": f"{asset} {name}", "asset": asset, "type": type_})
+    _post(asset, f"{asset} Bank", f"{asset} Sales", "100.00")
+    _post(asset, f"{asset} Rent", f"{asset} Bank", "30.50")
+
+    r = client.get("/reports/trial-balance", params={"asset": asset})
+    assert r.status_code == 200
+    tb = r.json()
+    by_name = {a["account_name"]: a for a in tb["accounts"]}
+    assert Decimal(by_name[f"{asset} Bank"]["balance"]) == Decimal("69.50")
+    assert tb["totals"] == [
+        {"asset": asset, "debits": "130.500000", "credits": "130.500000", "balanced": True}
+    ]
+
+    # The posting-level aggregation agrees with the running balances.
+    window = {
+        "asset": asset,
+        "created_from": (datetime.now(UTC) - timedelta(hours=1)).isoformat(),
+        "created_to": (datetime.now(UTC) + timedelta(hours=1)).isoformat(),
+    }
+    ranged = client.get("/reports/trial-balance", params=window).json()
+    assert ranged["accounts"] == tb["accounts"]
+    past = window | {"created_to": window["created_from"]}
+    empty = client.get("/reports/trial-balance", params=past).json()
+    assert all(a["posting_count"] == 0 for a in empty["accounts"])
+
+    hits = REGISTRY.get_sample_value("report_cache_lookups_total", {"result": "hit"}) or 0
+    assert client.get("/reports/trial-balance", params={"asset": asset}).json() == tb
+    assert REGISTRY.get_sample_value("report_cache_lookups_total", {"result": "hit"}) == hits + 1
+
+    _post(asset, f"{asset} Bank", f"{asset} Sales", "0.50")
+    fresh = client.get("/reports/trial-balance", params={"asset": asset}).json()
+    assert fresh["ledger_version"] != tb["ledger_version"]
+    assert fresh["totals"][0]["debits"] == "131.000000"
+
+    rollup = client.get("/reports/account-types", params={"asset": asset}).json()
+    types = {t["type"]: t for t in rollup["types"]}
+    assert set(types) == {"ASSET", "INCOME", "EXPENSE"}
+    assert Decimal(types["INCOME"]["balance"]) == Decimal("-100.50")
+    assert types["ASSET"]["posting_count"] == 3 and types["ASSET"]["account_count"] == 1
+
+    # A new account has no postings yet but must still show up.
+    client.post("/accounts", json={"name": f"{asset} Petty", "asset": asset, "type": "ASSET"})
+    opened = client.get("/reports/trial-balance", params={"asset": asset}).json()
+    assert opened["ledger_version"] != fresh["ledger_version"]
+    assert f"{asset} Petty" in [a["account_name"] for a in opened["accounts"]]